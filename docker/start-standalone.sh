@@ -38,4 +38,4 @@ cd /app/docker
 
 echo "Starting CodeForge FastAPI server..."
 cd /app
-exec python3 src/main.py
+exec python3 src/server.py
@@ -3,23 +3,81 @@ Docker Container Manager for Code Execution
 
 This module handles Docker container lifecycle for secure code execution.
 Each user session gets a dedicated container for isolation.
+
+Container ownership is recorded in the state backend, so that with a shared
+backend any worker can use a session container created by another worker.
+
+Containers are labelled with their session, language and creation time. On
+startup the manager adopts the running containers of a previous process
+instead of destroying them, and only removes those idle for too long.
+
+Idle containers are hibernated in two tiers: they are paused after a short
+idle period (so that they take no CPU time) and removed after a longer one.
+A paused container is resumed transparently on its next use. The workspace
+of a removed container is snapshotted and restored into the session's next
+container.
+
+The number of containers and the sum of their memory limits are bounded by a
+global budget; the least recently used idle containers are evicted to admit
+new ones.
+
+Resource profiles (CPU, memory, pids, tmpfs) come from languages.json. While
+a compile command runs, the container's CPU quota is raised to the profile's
+compile quota and lowered again for running user programs.
 """
 
+import hashlib
 import io
+import json
 import logging
+import math
+import os
 import signal
 import tarfile
 import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 import docker
 
+from config_manager import get_config_manager
+from state_backend import get_state_backend
+from workspace_snapshots import get_workspace_snapshots
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Labels of session containers
+SESSION_LABEL = "codeforge.session_id"
+LANGUAGE_LABEL = "codeforge.language"
+CREATED_AT_LABEL = "codeforge.created_at"
+PINNED_LABEL = "codeforge.pinned"
+RESOURCES_LABEL = "codeforge.resources"
+
+# State backend namespace of the commands running in session containers,
+# keyed by "<session_id>/<marker>"
+_COMMANDS_NAMESPACE = "container_commands"
+
+# State backend namespace of the compile commands running in session
+# containers, keyed like _COMMANDS_NAMESPACE
+_COMPILES_NAMESPACE = "container_compiles"
+
+_MEMORY_UNITS = {"b": 1, "k": 1024, "m": 1024**2, "g": 1024**3}
+
+
+def parse_memory(value) -> int:
+    """Bytes of a Docker memory size (an int, or a string such as "512m")."""
+    if isinstance(value, int):
+        return value
+    value = str(value).strip().lower()
+    if value and value[-1] in _MEMORY_UNITS:
+        return int(float(value[:-1]) * _MEMORY_UNITS[value[-1]])
+    return int(value)
+
 
 class ContainerManager:
     """Manages Docker containers for code execution."""
@@ -85,6 +143,8 @@ class ContainerManager:
             raise RuntimeError(f"Docker is not available: {e}") from e
 
         self.active_containers: Dict[str, dict] = {}
+        # session_id -> container record, shared with the other workers
+        self.state_backend = get_state_backend()
         # Language-specific Docker images
         self.language_images = {
             "python": "code-executor-python:latest",
@@ -95,12 +155,57 @@ class ContainerManager:
         }
         # Fallback image name for backward compatibility
         self.image_name = "code-executor:latest"
-
-        # Clean up any existing containers on startup
-        logger.info("Cleaning up existing code execution containers on startup...")
-        cleanup_count = self.cleanup_all_code_containers()
-        if cleanup_count > 0:
-            logger.info("Cleaned up %d existing containers", cleanup_count)
+        self._image_digests: Dict[str, str] = {}
+        config = get_config_manager().languages_config
+        settings = config.get("container_settings", {})
+        # Container resource profiles; CPU quota is expressed in microseconds
+        # per cpu_period, so cpu_quota / cpu_period is the number of cores.
+        # compile_cpu_quota applies while compile commands run.
+        self.default_resource_profile = {
+            "mem_limit": "512m",
+            "cpu_period": 100000,
+            "cpu_quota": 100000,
+            "compile_cpu_quota": 100000,
+            "pids_limit": 256,
+            "tmpfs_size": "64m",
+            **settings.get("default_resources", {}),
+        }
+        self.language_resource_profiles = {
+            language: language_config["resources"]
+            for language, language_config in config.get("supported_languages", {}).items()
+            if "resources" in language_config
+        }
+        # Containers idle this long are paused, and unpinned ones removed
+        self.pause_after_seconds = settings.get("pause_after_seconds", 120)
+        self.remove_after_seconds = settings.get("remove_after_seconds", 1800)
+        # How often idle containers are looked for
+        self.idle_check_interval = settings.get("check_interval_seconds", 30)
+        # Containers removed at the same time during cleanups
+        self.teardown_concurrency = 16
+        # Global budget of containers and of their summed memory limits
+        self.max_containers = settings.get("max_containers", 200)
+        self.max_memory = parse_memory(settings.get("max_memory", "64g"))
+        self.budget_evictions = 0
+        # session_id -> memory of containers admitted but not yet created
+        self._reservations: Dict[str, int] = {}
+        self._budget_lock = threading.Lock()
+        # Guards the counters (last_used, busy, compiles) and marker lists of
+        # the container infos; Docker calls on a container hold its own "lock"
+        self._activity_lock = threading.Lock()
+        # session_id -> created_at of the containers adopted on startup
+        self.adopted_sessions: Dict[str, float] = {}
+
+        # Adopt the containers of a previous run and remove the stale ones on
+        # startup (the production launcher does this once before starting the
+        # workers)
+        if os.environ.get("CONTAINER_STARTUP_CLEANUP", "1") != "0":
+            logger.info("Adopting existing code execution containers on startup...")
+            adopted_count, cleanup_count = self.adopt_existing_containers()
+            logger.info(
+                "Adopted %d and cleaned up %d existing containers",
+                adopted_count,
+                cleanup_count,
+            )
 
         # Set up shutdown handlers
         self._setup_shutdown_handler()
@@ -137,6 +242,36 @@ class ContainerManager:
         """Get the appropriate Docker image for a language."""
         return self.language_images.get(language, self.image_name)
 
+    def get_image_digest(self, language: str) -> Optional[str]:
+        """Get the ID of the image used for a language, or None if unavailable."""
+        image_name = self.get_image_for_language(language)
+        if image_name not in self._image_digests:
+            try:
+                self._image_digests[image_name] = self.client.images.get(image_name).id
+            except docker.errors.DockerException as e:
+                logger.error("Error looking up image %s: %s", image_name, e)
+                return None
+        return self._image_digests[image_name]
+
+    def get_resource_profile(self, language: str) -> dict:
+        """Get the container resource profile for a language."""
+        profile = dict(self.default_resource_profile)
+        profile.update(self.language_resource_profiles.get(language, {}))
+        return profile
+
+    def get_cpu_count(self, session_id: str) -> int:
+        """
+        Get the number of CPU cores allotted to a session's container while
+        it compiles (or verifies).
+        """
+        container_info = self._get_container_info(session_id)
+        if container_info is not None:
+            profile = {**self.default_resource_profile, **container_info["resources"]}
+        else:
+            profile = self.default_resource_profile
+        quota = max(profile["cpu_quota"], profile["compile_cpu_quota"])
+        return max(1, math.ceil(quota / profile["cpu_period"]))
+
     def ensure_image_exists(self, language: str) -> bool:
         """Ensure the execution image exists, build if necessary."""
         try:
@@ -162,9 +297,17 @@ class ContainerManager:
             return False
 
     def create_session_container(
-        self, session_id: str, language: str = "python"
+        self,
+        session_id: str,
+        language: str = "python",
+        pinned: bool = False,
+        resources: Optional[dict] = None,
     ) -> Optional[str]:
-        """Create a new container for a user session."""
+        """
+        Create a new container for a user session.
+        Pinned containers (shared service containers) are never reaped by age,
+        and resources overrides entries of the language's resource profile.
+        """
         try:
             image_name = self.get_image_for_language(language)
             if not self.ensure_image_exists(language):
@@ -175,25 +318,61 @@ class ContainerManager:
             # Remove existing container if it exists
             self.cleanup_session_container(session_id)
 
+            resources = {**self.get_resource_profile(language), **(resources or {})}
+            victims = self._admit(session_id, resources)
+            if victims is None:
+                logger.warning(
+                    "Container budget exhausted, cannot create container for session %s",
+                    session_id,
+                )
+                return None
+            self._in_parallel(self._evict_session_container, victims)
+
+            created_at = time.time()
             container = self.client.containers.run(
                 image_name,
                 name=container_name,
                 detach=True,
                 remove=False,  # We'll remove manually for cleanup control
                 working_dir="/workspace",
-                mem_limit="512m",  # Memory limit for security
-                cpu_quota=100000,  # CPU limit (50% of one core)
+                mem_limit=resources["mem_limit"],  # Memory limit for security
+                cpu_period=resources["cpu_period"],
+                cpu_quota=resources["cpu_quota"],  # CPU limit
+                pids_limit=resources["pids_limit"],  # No fork bombs
+                tmpfs={"/tmp": f"rw,nosuid,size={resources['tmpfs_size']}"},
                 network_disabled=True,  # Disable network for security
                 user="coderunner",
                 command="sleep infinity",  # Keep container running
+                labels={
+                    SESSION_LABEL: session_id,
+                    LANGUAGE_LABEL: language,
+                    CREATED_AT_LABEL: str(created_at),
+                    PINNED_LABEL: "1" if pinned else "0",
+                    RESOURCES_LABEL: json.dumps(resources),
+                },
             )
 
             self.active_containers[session_id] = {
                 "container": container,
                 "container_id": container.id,
-                "created_at": time.time(),
+                "created_at": created_at,
                 "name": container_name,
+                "language": language,
+                "resources": resources,
+                "pinned": pinned,
+                # filename -> content hash of files put into /workspace
+                "workspace": {},
+                "last_used": created_at,
+                # commands running in the container
+                "busy": 0,
+                # state backend markers of the commands running here
+                "markers": [],
+                "compile_markers": [],
+                "paused": False,
+                "lock": threading.Lock(),
             }
+            self._register_container(session_id)
+            self._restore_workspace(session_id)
 
             logger.info(
                 "Created container %s for session %s", container_name, session_id
@@ -203,8 +382,582 @@ class ContainerManager:
         except docker.errors.DockerException as e:
             logger.error("Failed to create container for session %s: %s", session_id, e)
             return None
+        finally:
+            with self._budget_lock:
+                self._reservations.pop(session_id, None)
+
+    def _admit(self, session_id: str, resources: dict) -> Optional[List[str]]:
+        """
+        Reserve budget for a new container. Returns the sessions whose idle
+        containers must be evicted to make room (least recently used first),
+        or None if the budget cannot be met. With a shared state backend the
+        idle containers of every worker are candidates.
+        """
+        memory_needed = parse_memory(resources["mem_limit"])
+
+        def over_budget(count: int, memory: int) -> bool:
+            return count + 1 > self.max_containers or memory + memory_needed > self.max_memory
+
+        with self._budget_lock:
+            usage = self._budget_usage()
+            if not over_budget(len(usage), sum(usage.values())):
+                self._reservations[session_id] = memory_needed
+                return []
+
+        # Candidates are looked up without the budget lock, since that may
+        # take Docker calls; the budget is checked again once they are known
+        candidates = self._eviction_candidates(usage)
+
+        with self._budget_lock:
+            usage = self._budget_usage()
+            count = len(usage)
+            memory = sum(usage.values())
+            victims = []
+            for candidate_id in candidates:
+                if not over_budget(count, memory):
+                    break
+                container_info = self.active_containers.get(candidate_id)
+                if (
+                    candidate_id not in usage
+                    or container_info is None
+                    or container_info.get("evicting")
+                ):
+                    continue
+                with self._activity_lock:
+                    if container_info["busy"]:
+                        continue
+                container_info["evicting"] = True
+                victims.append(candidate_id)
+                count -= 1
+                memory -= usage[candidate_id]
+            if over_budget(count, memory):
+                for victim_id in victims:
+                    self.active_containers[victim_id]["evicting"] = False
+                return None
+            self._reservations[session_id] = memory_needed
+            self.budget_evictions += len(victims)
+        return victims
+
+    def _eviction_candidates(self, usage: Dict[str, int]) -> List[str]:
+        """
+        Sessions whose containers can be evicted: unpinned, not running a
+        command in any worker, least recently used first.
+        """
+        if self.state_backend.shared:
+            # Containers of the other workers become evictable here
+            for candidate_id in usage:
+                if candidate_id not in self._reservations:
+                    self._get_container_info(candidate_id)
+        busy_sessions = self._busy_sessions()
+        candidates = []
+        for candidate_id, info in list(self.active_containers.items()):
+            if candidate_id not in usage or candidate_id in busy_sessions:
+                continue
+            self._refresh_last_used(candidate_id, info)
+            with self._activity_lock:
+                if not info["pinned"] and not info["busy"] and not info.get("evicting"):
+                    candidates.append((info["last_used"], candidate_id))
+        return [candidate_id for _, candidate_id in sorted(candidates)]
+
+    def _budget_usage(self) -> Dict[str, int]:
+        """
+        Memory limit of every container counted against the budget, by
+        session; called with the budget lock held.
+        """
+        if self.state_backend.shared:
+            usage = {
+                session_id: parse_memory(json.loads(value)["resources"]["mem_limit"])
+                for session_id, value in self.state_backend.items("containers")
+            }
+        else:
+            usage = {
+                session_id: parse_memory(info["resources"]["mem_limit"])
+                for session_id, info in list(self.active_containers.items())
+            }
+        for session_id, info in list(self.active_containers.items()):
+            if info.get("evicting"):
+                usage.pop(session_id, None)
+        usage.update(self._reservations)
+        return usage
+
+    def budget_status(self) -> Dict[str, int]:
+        """Current use of the global container budget."""
+        with self._budget_lock:
+            usage = self._budget_usage()
+        return {
+            "containers": len(usage),
+            "max_containers": self.max_containers,
+            "memory_bytes": sum(usage.values()),
+            "max_memory_bytes": self.max_memory,
+            "evictions": self.budget_evictions,
+        }
+
+    def has_session_container(self, session_id: str) -> bool:
+        """Whether the session has a container (possibly created by another worker)."""
+        return self._get_container_info(session_id) is not None
+
+    def _register_container(self, session_id: str) -> None:
+        container_info = self.active_containers.get(session_id)
+        if container_info is None:
+            # Removed meanwhile
+            return
+        record = {
+            key: container_info[key]
+            for key in (
+                "container_id",
+                "created_at",
+                "name",
+                "language",
+                "resources",
+                "pinned",
+                "last_used",
+            )
+        }
+        container_info["registered_at"] = time.time()
+        self.state_backend.set("containers", session_id, json.dumps(record))
+
+    def _get_container_info(self, session_id: str) -> Optional[dict]:
+        """
+        Get the container info of a session. A container another worker
+        registered in a shared state backend is adopted on first use.
+        """
+        container_info = self.active_containers.get(session_id)
+        if not self.state_backend.shared:
+            return container_info
+        value = self.state_backend.get("containers", session_id)
+        if value is None:
+            if container_info is not None and "registered_at" in container_info:
+                # Removed by another worker (reaped or evicted)
+                self.active_containers.pop(session_id, None)
+                return None
+            return container_info
+        record = json.loads(value)
+        if container_info is not None:
+            if container_info["container_id"] == record["container_id"]:
+                return container_info
+            # Replaced by another worker: adopt the new container
+            self.active_containers.pop(session_id, None)
+        try:
+            container = self.client.containers.get(record["container_id"])
+        except docker.errors.NotFound:
+            self.state_backend.delete("containers", session_id)
+            return None
+        except docker.errors.DockerException as e:
+            logger.error("Failed to adopt container for session %s: %s", session_id, e)
+            return None
+        container_info = {
+            "last_used": time.time(),
+            **record,
+            "container": container,
+            "workspace": {},
+            "busy": 0,
+            "markers": [],
+            "compile_markers": [],
+            "paused": container.status == "paused",
+            "lock": threading.Lock(),
+            "registered_at": time.time(),
+        }
+        self.active_containers[session_id] = container_info
+        logger.info("Adopted container %s for session %s", record["name"], session_id)
+        return container_info
+
+    def _use_container(
+        self, session_id: str, busy: bool = False, timeout: int = 0
+    ) -> Optional[dict]:
+        """
+        Get the container info of a session for running something in it:
+        records the activity and resumes the container if it is paused.
+        With busy, the container is marked busy until _release_container;
+        with a shared state backend the other workers see the mark too (for
+        up to timeout plus remove_after_seconds, should this worker die).
+        """
+        container_info = self._get_container_info(session_id)
+        if container_info is None:
+            return None
+        now = time.time()
+        with self._activity_lock:
+            container_info["last_used"] = now
+            container_info["busy"] += int(busy)
+        if self.state_backend.shared:
+            # Publish the activity before resuming: a worker that pauses the
+            # container meanwhile then sees it and resumes the container
+            if busy:
+                marker = f"{session_id}/{uuid.uuid4().hex}"
+                self.state_backend.set(
+                    _COMMANDS_NAMESPACE,
+                    marker,
+                    str(now),
+                    ttl=timeout + self.remove_after_seconds,
+                )
+                with self._activity_lock:
+                    container_info["markers"].append(marker)
+            if busy or now - container_info.get("registered_at", 0) > 30:
+                self._register_container(session_id)
+        with container_info["lock"]:
+            if self.state_backend.shared:
+                # Another worker may have paused it
+                try:
+                    container_info["container"].reload()
+                    container_info["paused"] = container_info["container"].status == "paused"
+                except docker.errors.DockerException:
+                    pass
+            if container_info["paused"]:
+                self._resume_container(session_id, container_info)
+        return container_info
+
+    def _resume_container(self, session_id: str, container_info: dict) -> None:
+        """Unpause a container; called with the container's lock held."""
+        try:
+            container_info["container"].unpause()
+            logger.info("Resumed container for session %s", session_id)
+        except docker.errors.DockerException as e:
+            logger.warning("Failed to resume container for session %s: %s", session_id, e)
+        container_info["paused"] = False
+
+    def _set_compile_phase(
+        self, session_id: str, container_info: dict, compiling: bool, timeout: int = 0
+    ) -> None:
+        """
+        Enter (compiling) or leave a compile phase: the CPU quota is raised to
+        the compile quota while any compile command runs in the container.
+        With a shared state backend the compiles of every worker count; a
+        phase is kept for at most timeout plus a minute should its worker
+        die. The quota applies to the whole container, so a program running
+        beside a compile also gets the compile quota meanwhile.
+        """
+        resources = {**self.default_resource_profile, **container_info["resources"]}
+        if resources["compile_cpu_quota"] == resources["cpu_quota"]:
+            return
+        marker = None
+        if self.state_backend.shared and compiling:
+            marker = f"{session_id}/{uuid.uuid4().hex}"
+            self.state_backend.set(
+                _COMPILES_NAMESPACE, marker, str(time.time()), ttl=timeout + 60
+            )
+        with self._activity_lock:
+            container_info["compiles"] = container_info.get("compiles", 0) + (
+                1 if compiling else -1
+            )
+            if marker is not None:
+                container_info["compile_markers"].append(marker)
+            elif not compiling and container_info["compile_markers"]:
+                marker = container_info["compile_markers"].pop()
+        if marker is not None and not compiling:
+            self.state_backend.delete(_COMPILES_NAMESPACE, marker)
+        with container_info["lock"]:
+            # Decided under the container's lock, so that concurrent phase
+            # changes cannot apply their updates out of order; another
+            # worker may change the phase meanwhile, hence the recount
+            quota = None
+            while True:
+                compiles = self._compile_count(session_id, container_info)
+                wanted = resources["compile_cpu_quota"] if compiles else resources["cpu_quota"]
+                if wanted == quota:
+                    return
+                quota = wanted
+                applied = container_info.get("cpu_quota", resources["cpu_quota"])
+                if applied == quota and not self.state_backend.shared:
+                    return
+                try:
+                    container_info["container"].update(cpu_quota=quota)
+                    container_info["cpu_quota"] = quota
+                except docker.errors.DockerException as e:
+                    logger.warning(
+                        "Failed to set the CPU quota of %s: %s", container_info["name"], e
+                    )
+                    return
+
+    def _compile_count(self, session_id: str, container_info: dict) -> int:
+        """Number of compile commands running in a container, in any worker."""
+        if not self.state_backend.shared:
+            with self._activity_lock:
+                return container_info["compiles"]
+        prefix = f"{session_id}/"
+        return sum(
+            1
+            for marker, _ in self.state_backend.items(_COMPILES_NAMESPACE)
+            if marker.startswith(prefix)
+        )
+
+    def _release_container(self, session_id: str, container_info: dict) -> None:
+        """End a busy period started with _use_container(busy=True)."""
+        with self._activity_lock:
+            container_info["busy"] -= 1
+            container_info["last_used"] = time.time()
+            marker = container_info["markers"].pop() if container_info["markers"] else None
+        if marker is not None:
+            self.state_backend.delete(_COMMANDS_NAMESPACE, marker)
+            self._register_container(session_id)
+
+    def _busy_sessions(self) -> set:
+        """Sessions whose containers run a command of any worker (shared backend)."""
+        if not self.state_backend.shared:
+            return set()
+        return {
+            marker.rsplit("/", 1)[0]
+            for marker, _ in self.state_backend.items(_COMMANDS_NAMESPACE)
+        }
+
+    def _used_since(self, session_id: str, container_info: dict, since: float) -> bool:
+        """Whether a container was used or runs a command since a point in time."""
+        self._refresh_last_used(session_id, container_info)
+        with self._activity_lock:
+            if container_info["busy"] or container_info["last_used"] >= since:
+                return True
+        return session_id in self._busy_sessions()
+
+    def reap_idle_containers(self) -> Tuple[int, int]:
+        """
+        Pause the containers idle for pause_after_seconds and remove the
+        unpinned ones idle for remove_after_seconds. Containers running a
+        command in any worker are never touched. With a shared state
+        backend, one worker at a time reaps every registered container,
+        including those no live worker uses. Returns the number of paused
+        and removed containers.
+        """
+        if self.state_backend.shared:
+            if not self.state_backend.add(
+                "reaper", "lease", str(os.getpid()), ttl=self.idle_check_interval / 2
+            ):
+                # Another worker reaps this round
+                return 0, 0
+            for session_id, _ in self.state_backend.items("containers"):
+                self._get_container_info(session_id)
+
+        now = time.time()
+        busy_sessions = self._busy_sessions()
+        to_pause = []
+        to_remove = []
+        for session_id, container_info in list(self.active_containers.items()):
+            self._refresh_last_used(session_id, container_info)
+            with self._activity_lock:
+                if (
+                    container_info["busy"]
+                    or container_info.get("evicting")
+                    or session_id in busy_sessions
+                ):
+                    continue
+                idle = now - container_info["last_used"]
+                if not container_info["pinned"] and idle > self.remove_after_seconds:
+                    to_remove.append(session_id)
+                elif idle > self.pause_after_seconds and not container_info["paused"]:
+                    to_pause.append(session_id)
+
+        paused_count = self._in_parallel(
+            lambda session_id: self._pause_idle_container(session_id, now), to_pause
+        )
+        removed_count = self._in_parallel(
+            lambda session_id: self._remove_idle_container(session_id, now), to_remove
+        )
+        if paused_count or removed_count:
+            logger.info(
+                "Paused %d and removed %d idle containers", paused_count, removed_count
+            )
+        return paused_count, removed_count
+
+    def _pause_idle_container(self, session_id: str, idle_since: float) -> bool:
+        """Pause a container idle since idle_since, unless it was used meanwhile."""
+        container_info = self.active_containers.get(session_id)
+        if container_info is None:
+            return False
+        with container_info["lock"]:
+            container = container_info["container"]
+            try:
+                if self.state_backend.shared:
+                    container.reload()
+                    if container.status == "paused":
+                        # Paused by another worker
+                        container_info["paused"] = True
+                        return False
+                container.pause()
+                container_info["paused"] = True
+            except docker.errors.DockerException as e:
+                logger.warning("Failed to pause container for session %s: %s", session_id, e)
+                return False
+            # A command may have started while the container was being paused
+            if self._used_since(session_id, container_info, idle_since):
+                self._resume_container(session_id, container_info)
+                return False
+        return True
+
+    def _remove_idle_container(self, session_id: str, idle_since: float) -> bool:
+        container_info = self.active_containers.get(session_id)
+        if container_info is None or self._used_since(session_id, container_info, idle_since):
+            return False
+        return self._evict_session_container(session_id)
+
+    def _evict_session_container(self, session_id: str) -> bool:
+        """Remove an idle session container, keeping a snapshot of its workspace."""
+        self.snapshot_workspace(session_id)
+        return self.cleanup_session_container(session_id)
+
+    def snapshot_workspace(self, session_id: str) -> bool:
+        """Archive the /workspace of a session container to the snapshot store."""
+        container_info = self._use_container(session_id)
+        if container_info is None or container_info["pinned"]:
+            return False
+        try:
+            stream, _ = container_info["container"].get_archive("/workspace")
+            saved = get_workspace_snapshots().save(
+                session_id,
+                container_info["language"],
+                dict(container_info["workspace"]),
+                stream,
+            )
+        except docker.errors.DockerException as e:
+            logger.warning("Failed to snapshot workspace of session %s: %s", session_id, e)
+            return False
+        if saved:
+            logger.info("Saved workspace snapshot of session %s", session_id)
+        return saved
+
+    def _restore_workspace(self, session_id: str) -> None:
+        """Restore the workspace snapshot of a session into its new container."""
+        container_info = self.active_containers[session_id]
+        snapshot = get_workspace_snapshots().take(session_id, container_info["language"])
+        if snapshot is None:
+            return
+        data, workspace = snapshot
+        try:
+            # The archive holds the workspace directory itself
+            if container_info["container"].put_archive("/", data):
+                container_info["workspace"] = workspace
+                logger.info("Restored workspace snapshot of session %s", session_id)
+        except docker.errors.DockerException as e:
+            logger.warning("Failed to restore workspace of session %s: %s", session_id, e)
+
+    def _refresh_last_used(self, session_id: str, container_info: dict) -> None:
+        """Pick up activity another worker recorded for a container."""
+        if not self.state_backend.shared:
+            return
+        value = self.state_backend.get("containers", session_id)
+        if value is not None:
+            last_used = json.loads(value).get("last_used", 0)
+            with self._activity_lock:
+                container_info["last_used"] = max(container_info["last_used"], last_used)
+
+    def adopt_existing_containers(self) -> Tuple[int, int]:
+        """
+        Rebuild active_containers from the running, labelled session
+        containers left by a previous process. Unlabelled and stopped
+        containers are removed, as are unpinned ones idle for
+        remove_after_seconds according to the container registry; without a
+        registry record the idle time counts from the adoption.
+        Returns the number of adopted and removed containers.
+        """
+        adopted_count = 0
+        now = time.time()
+        try:
+            all_containers = self._list_session_containers()
+        except docker.errors.DockerException as e:
+            logger.error("Error listing containers for adoption: %s", e)
+            return adopted_count, 0
 
-    def _execute_with_timeout(self, container, cmd: str, timeout: int):
+        stale_containers = []
+        for container in all_containers:
+            labels = container.labels or {}
+            session_id = labels.get(SESSION_LABEL)
+            try:
+                created_at = float(labels.get(CREATED_AT_LABEL, 0))
+                pinned = labels.get(PINNED_LABEL) == "1"
+                resources = json.loads(labels[RESOURCES_LABEL])
+                last_used = self._recorded_last_used(session_id, container.id, now)
+                expired = not pinned and now - last_used > self.remove_after_seconds
+            except (KeyError, ValueError):
+                session_id = None
+            alive = container.status in ("running", "paused")
+            if session_id and alive and not expired:
+                self.active_containers[session_id] = {
+                    "container": container,
+                    "container_id": container.id,
+                    "created_at": created_at,
+                    "name": container.name,
+                    "language": labels.get(LANGUAGE_LABEL, ""),
+                    "resources": resources,
+                    "pinned": pinned,
+                    # The workspace content is unknown, so files are sent again
+                    "workspace": {},
+                    "last_used": last_used,
+                    "busy": 0,
+                    "markers": [],
+                    "compile_markers": [],
+                    "paused": container.status == "paused",
+                    "lock": threading.Lock(),
+                }
+                self._register_container(session_id)
+                if not pinned:
+                    self.adopted_sessions[session_id] = created_at
+                adopted_count += 1
+            else:
+                if session_id:
+                    self.state_backend.delete("containers", session_id)
+                stale_containers.append(container)
+        return adopted_count, self._remove_containers(stale_containers)
+
+    def _recorded_last_used(self, session_id: str, container_id: str, default: float) -> float:
+        """Last use of a container recorded in the container registry, if any."""
+        value = self.state_backend.get("containers", session_id) if session_id else None
+        try:
+            record = json.loads(value) if value is not None else {}
+        except ValueError:
+            return default
+        if record.get("container_id") != container_id:
+            return default
+        return record.get("last_used", default)
+
+    def _list_session_containers(self) -> list:
+        """
+        All session containers, filtered on the Docker side: the labelled
+        ones, and the unlabelled code-session-* containers created before
+        containers were labelled.
+        """
+        containers = {
+            container.id: container
+            for container in self.client.containers.list(
+                all=True, filters={"label": SESSION_LABEL}
+            )
+        }
+        for container in self.client.containers.list(
+            all=True, filters={"name": "code-session-"}
+        ):
+            if container.name.startswith("code-session-"):
+                containers.setdefault(container.id, container)
+        return list(containers.values())
+
+    def _in_parallel(self, task: Callable[[object], bool], items: Iterable) -> int:
+        """Run task on items with bounded concurrency. Returns the number of successes."""
+        items = list(items)
+        if not items:
+            return 0
+        with ThreadPoolExecutor(
+            max_workers=min(self.teardown_concurrency, len(items))
+        ) as pool:
+            return sum(1 for done in pool.map(task, items) if done)
+
+    def _remove_containers(self, containers: Iterable) -> int:
+        """Kill and remove containers in parallel. Returns the number removed."""
+
+        def remove(container) -> bool:
+            try:
+                logger.info("Cleaning up container: %s", container.name)
+                # Sandboxes hold no state worth a graceful stop
+                container.remove(force=True)
+                return True
+            except docker.errors.NotFound:
+                return False
+            except Exception as e:
+                logger.warning("Error cleaning up container %s: %s", container.name, e)
+                return False
+
+        return self._in_parallel(remove, containers)
+
+    def _execute_with_timeout(
+        self,
+        container,
+        cmd: str,
+        timeout: int,
+        environment: Optional[Dict[str, str]] = None,
+    ):
         """Execute command with timeout using container.exec_run."""
         # Execute the command
         logger.info("Executing command in container %s: %s", container, cmd)
@@ -215,16 +968,18 @@ class ContainerManager:
             stream=False,
             demux=True,
             user="coderunner",  # Run as coderunner user, not root
+            environment=environment,
         )
         return exec_result
 
     def cancel_execution(self, session_id: str) -> bool:
         """Cancel running execution in the session container."""
         try:
-            if session_id not in self.active_containers:
+            container_info = self._use_container(session_id)
+            if container_info is None:
                 return False
 
-            container = self.active_containers[session_id]["container"]
+            container = container_info["container"]
 
             # Kill all processes in the container (Alpine compatible)
             try:
@@ -247,13 +1002,13 @@ class ContainerManager:
     def cleanup_session_container(self, session_id: str) -> bool:
         """Clean up the container for a session."""
         try:
+            self.state_backend.delete("containers", session_id)
             if session_id in self.active_containers:
                 container_info = self.active_containers[session_id]
                 container = container_info["container"]
 
                 try:
-                    container.stop(timeout=5)
-                    container.remove()
+                    container.remove(force=True)
                     logger.info("Cleaned up container for session %s", session_id)
                 except Exception as e:
                     logger.warning(
@@ -262,15 +1017,14 @@ class ContainerManager:
                         e,
                     )
 
-                del self.active_containers[session_id]
+                self.active_containers.pop(session_id, None)
                 return True
             else:
                 # Try to find and remove container by name
                 container_name = f"code-session-{session_id}"
                 try:
                     container = self.client.containers.get(container_name)
-                    container.stop(timeout=5)
-                    container.remove()
+                    container.remove(force=True)
                     logger.info("Cleaned up orphaned container %s", container_name)
                 except docker.errors.NotFound:
                     pass  # Container doesn't exist, which is fine
@@ -289,28 +1043,32 @@ class ContainerManager:
 
     def cleanup_old_containers(self, max_age_hours: int = 24) -> int:
         """Clean up containers older than specified hours."""
-        cleaned_count = 0
         current_time = time.time()
 
+        containers = {
+            session_id: json.loads(value)
+            for session_id, value in self.state_backend.items("containers")
+        }
+        containers.update(self.active_containers)
         sessions_to_cleanup = []
-        for session_id, container_info in self.active_containers.items():
+        for session_id, container_info in containers.items():
+            if container_info.get("pinned"):
+                continue
             age_hours = (current_time - container_info["created_at"]) / 3600
             if age_hours > max_age_hours:
                 sessions_to_cleanup.append(session_id)
 
-        for session_id in sessions_to_cleanup:
-            if self.cleanup_session_container(session_id):
-                cleaned_count += 1
+        cleaned_count = self._in_parallel(self.cleanup_session_container, sessions_to_cleanup)
 
         logger.info("Cleaned up %s old containers", cleaned_count)
         return cleaned_count
 
     def get_session_info(self, session_id: str) -> Optional[dict]:
         """Get information about a session container."""
-        if session_id not in self.active_containers:
+        container_info = self._get_container_info(session_id)
+        if container_info is None:
             return None
 
-        container_info = self.active_containers[session_id]
         try:
             container = container_info["container"]
             container.reload()
@@ -321,6 +1079,7 @@ class ContainerManager:
                 "status": container.status,
                 "created_at": container_info["created_at"],
                 "age_seconds": time.time() - container_info["created_at"],
+                "idle_seconds": time.time() - container_info["last_used"],
             }
         except Exception as e:
             logger.error("Error getting session info for %s: %s", session_id, e)
@@ -347,15 +1106,23 @@ class ContainerManager:
     def put_file_in_container(self, session_id: str, filename: str, code: str) -> bool:
         """
         Copy a file with the given code into the session's container at
-        /workspace/filename.
+        /workspace/filename. Files whose content the container already has
+        (according to the workspace manifest) are not sent again.
         """
-        if session_id not in self.active_containers:
+        container_info = self._use_container(session_id)
+        if container_info is None:
             return False
-        container = self.active_containers[session_id]["container"]
+        container = container_info["container"]
+        workspace = container_info.setdefault("workspace", {})
+        content_hash = hashlib.sha256(code.encode("utf-8")).hexdigest()
+        if workspace.get(filename) == content_hash:
+            # The container already has this exact file
+            return True
         try:
             container.put_archive(
                 "/workspace", self._create_tar_archive(filename, code)
             )
+            workspace[filename] = content_hash
 
             # Update file metadata to ensure proper ownership and timestamps
             touch_result = container.exec_run(
@@ -376,29 +1143,45 @@ class ContainerManager:
             )
             return False
 
-    def run_command_in_container(self, session_id: str, cmd: str, timeout: int = 30):
+    def run_command_in_container(
+        self,
+        session_id: str,
+        cmd: str,
+        timeout: int = 30,
+        environment: Optional[Dict[str, str]] = None,
+        compile_phase: bool = False,
+    ):
         """
         Run a shell command in the session's container and return the exec
-        result object (with .exit_code, .output).
+        result object (with .exit_code, .output). Compile commands
+        (compile_phase) run with the profile's compile CPU quota.
         """
-        if session_id not in self.active_containers:
+        container_info = self._use_container(session_id, busy=True, timeout=timeout)
+        if container_info is None:
             return None
-        container = self.active_containers[session_id]["container"]
+        container = container_info["container"]
+        if compile_phase:
+            self._set_compile_phase(session_id, container_info, True, timeout)
         try:
-            return self._execute_with_timeout(container, cmd, timeout)
+            return self._execute_with_timeout(container, cmd, timeout, environment)
         except Exception as e:
             logger.error(
                 "Failed to run command in container for session %s: %s", session_id, e
             )
             return None
+        finally:
+            if compile_phase:
+                self._set_compile_phase(session_id, container_info, False)
+            self._release_container(session_id, container_info)
 
     def read_file_from_container(
         self, session_id: str, filename: str, encoding: str = "utf-8"
     ) -> str:
         """Read the content of a file from the container for the given session."""
-        if session_id not in self.active_containers:
+        container_info = self._use_container(session_id)
+        if container_info is None:
             raise RuntimeError(f"No active container for session {session_id}")
-        container = self.active_containers[session_id]["container"]
+        container = container_info["container"]
         # Use 'cat' to read the file content
         exec_result = container.exec_run(
             f"cat {filename}",
@@ -418,16 +1201,35 @@ class ContainerManager:
         stdout = exec_result.output[0].decode(encoding) if exec_result.output[0] else ""
         return stdout
 
+    def get_archive_from_container(self, session_id: str, path: str) -> Optional[bytes]:
+        """Get a tar archive of a path in the session's container."""
+        container_info = self._use_container(session_id)
+        if container_info is None:
+            return None
+        container = container_info["container"]
+        try:
+            stream, _ = container.get_archive(path)
+            return b"".join(stream)
+        except Exception as e:
+            logger.error(
+                "Failed to get %s from container for session %s: %s", path, session_id, e
+            )
+            return None
+
     def remove_files_by_extension(self, session_id: str, extension: str) -> bool:
         """
         Remove all files with the specified extension from the session's container.
         Returns True if the command executed successfully, False otherwise.
         """
-        if session_id not in self.active_containers:
+        container_info = self._use_container(session_id)
+        if container_info is None:
             logger.warning("No active container for session %s", session_id)
             return False
 
-        container = self.active_containers[session_id]["container"]
+        container = container_info["container"]
+        workspace = container_info.setdefault("workspace", {})
+        for filename in [f for f in workspace if f.endswith(f".{extension}")]:
+            del workspace[filename]
 
         try:
             # Use find to remove all files with the specified extension
@@ -477,37 +1279,30 @@ class ContainerManager:
             return False
 
     def cleanup_all_code_containers(self) -> int:
-        """Clean up all code execution containers (startup/shutdown cleanup)."""
+        """
+        Clean up all code execution containers (startup/shutdown cleanup).
+        With a shared state backend, containers registered there belong to
+        the other workers and are kept.
+        """
         cleaned_count = 0
 
         try:
-            # Get all containers with our naming pattern
-            all_containers = self.client.containers.list(all=True)
-
-            for container in all_containers:
-                container_name = container.name
-
-                # Check if this is one of our code execution containers
-                if container_name.startswith("code-session-"):
-                    try:
-                        logger.info("Cleaning up container: %s", container_name)
-
-                        # Stop container if running
-                        if container.status == "running":
-                            container.stop(timeout=5)
-
-                        # Remove container
-                        container.remove()
-                        cleaned_count += 1
-
-                    except Exception as e:
-                        logger.warning(
-                            "Error cleaning up container %s: %s",
-                            container_name,
-                            e,
-                        )
+            registered = set()
+            if self.state_backend.shared:
+                registered = {
+                    json.loads(value)["container_id"]
+                    for _, value in self.state_backend.items("containers")
+                }
+
+            cleaned_count = self._remove_containers(
+                container
+                for container in self._list_session_containers()
+                if container.id not in registered
+            )
 
             # Clear our active containers tracking
+            for session_id in list(self.active_containers):
+                self.state_backend.delete("containers", session_id)
             self.active_containers.clear()
 
             logger.info("Cleaned up %s code execution containers", cleaned_count)
@@ -525,9 +1320,13 @@ class ContainerManager:
             return
 
         def shutdown_handler(signum, frame):
-            logger.info("Received signal %s, cleaning up containers...", signum)
-            self.cleanup_all_code_containers()
-            logger.info("Container cleanup completed")
+            # Session containers are kept: the other workers or the next
+            # process adopt them, and expired ones are reaped on startup
+            logger.info(
+                "Received signal %s, keeping %d session containers",
+                signum,
+                len(self.active_containers),
+            )
             # Let the default handler continue
             signal.default_int_handler(signum, frame)
 
@@ -1,10 +1,15 @@
 import os
 import time
-from fastapi import APIRouter, Form, HTTPException, Depends, status
+from fastapi import APIRouter, Form, HTTPException, Depends, Query, status
 from fastapi.security.api_key import APIKeyHeader
 from container_manager import get_container_manager
-from models import UserSession, CompilerConfig
-from typing import Dict, Optional
+from drain import get_drain_mode
+from example_warmup import get_example_results, get_example_warmup
+from models import CompilerConfig
+from session_store import SessionStore
+from typing import List, Optional
+
+from .shared_utils import get_active_processes
 
 router = APIRouter()
 
@@ -20,7 +25,7 @@ def require_api_key(api_key: str = Depends(api_key_header)):
         )
 
 
-user_sessions: Dict[str, UserSession] = {}
+user_sessions: SessionStore = SessionStore()
 CONFIG: Optional[CompilerConfig] = None
 
 
@@ -43,7 +48,11 @@ async def list_containers():
             container_info = container_mgr.get_session_info(session_id)
             if container_info:
                 containers.append(container_info)
-        return {"containers": containers, "total": len(containers)}
+        return {
+            "containers": containers,
+            "total": len(containers),
+            "budget": container_mgr.budget_status(),
+        }
     except Exception as e:
         return {"error": f"Failed to list containers: {str(e)}"}
 
@@ -64,7 +73,7 @@ async def cleanup_old_containers(max_age_hours: int = Form(24)):
             if age_hours > max_age_hours:
                 old_sessions.append(session_id)
         for session_id in old_sessions:
-            del user_sessions[session_id]
+            user_sessions.remove(session_id)
         return {
             "success": True,
             "cleaned_containers": cleaned_count,
@@ -75,6 +84,63 @@ async def cleanup_old_containers(max_age_hours: int = Form(24)):
         return {"success": False, "message": f"Error during cleanup: {str(e)}"}
 
 
+@router.post(
+    "/admin/warmup",
+    tags=["Admin"],
+    dependencies=[Depends(require_api_key)],
+)
+async def start_example_warmup(
+    languages: Optional[List[str]] = Query(None), clear: bool = False
+):
+    """
+    Compile and run all built-in examples (optionally only some languages)
+    in the background and cache their outcomes.
+    """
+    if clear:
+        get_example_results().clear()
+    if not get_example_warmup().start(languages):
+        raise HTTPException(status_code=409, detail="Example warmup is already running")
+    return {"success": True, "message": "Example warmup started"}
+
+
+@router.get(
+    "/admin/warmup",
+    tags=["Admin"],
+    dependencies=[Depends(require_api_key)],
+)
+async def get_example_warmup_status():
+    """Progress of the example warmup with per-example timings."""
+    return get_example_warmup().status()
+
+
+@router.post(
+    "/admin/drain",
+    tags=["Admin"],
+    dependencies=[Depends(require_api_key)],
+)
+async def start_drain(resume: bool = False):
+    """
+    Refuse new jobs before a deploy while in-flight jobs finish, or accept
+    them again with resume=true.
+    """
+    drain_mode = get_drain_mode()
+    if resume:
+        drain_mode.stop()
+    else:
+        drain_mode.start()
+    return drain_mode.status(get_active_processes())
+
+
+@router.get(
+    "/admin/drain",
+    tags=["Admin"],
+    dependencies=[Depends(require_api_key)],
+)
+async def get_drain_status():
+    """Whether the instance is draining and how many jobs are in flight."""
+    return get_drain_mode().status(get_active_processes())
+
+
 @router.get(
     "/admin/config",
     tags=["Admin"],
@@ -8,6 +8,7 @@ from fastapi import APIRouter
 from . import execution_controller
 from . import session_controller
 from . import examples_controller
+from .editor_controller import router as editor_router
 from .library_controller import router as library_router
 from .shared_utils import set_globals as set_shared_globals
 
@@ -19,12 +20,13 @@ router.include_router(execution_controller.router)
 router.include_router(session_controller.router)
 router.include_router(examples_controller.router)
 router.include_router(library_router)
+router.include_router(editor_router)
 
 
-def set_globals(processes, sessions, config, counter):
+def set_globals(processes, sessions, config):
     """Set global state for all controllers."""
     # Set globals for shared utils
-    set_shared_globals(processes, sessions, config, counter)
+    set_shared_globals(processes, sessions, config)
     # Set globals for execution controller
     execution_controller.set_globals(processes, config)
     # Set globals for session controller
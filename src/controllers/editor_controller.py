@@ -0,0 +1,112 @@
+"""
+Editor controller.
+Serves the outline and syntax errors of the Eiffel file open in the editor,
+parsed in-process and updated incrementally as the user types.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Cookie
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+
+from eiffel_parse_service import DocumentTooLargeError, TextEdit, get_parse_service
+from models import Message, ParseEditRequest, ParseRequest, ParseResult
+from .shared_utils import get_or_create_session_id, update_session_activity
+
+router = APIRouter()
+
+
+def _parse_response(session_id: str, content: dict, status_code: int = 200) -> JSONResponse:
+    response = JSONResponse(content=content, status_code=status_code)
+    response.set_cookie(
+        key="session_id", value=session_id, httponly=True, max_age=86400
+    )
+    return response
+
+
+def _too_large_response(session_id: str, error: DocumentTooLargeError) -> JSONResponse:
+    return _parse_response(session_id, Message(message=str(error)).model_dump(), 413)
+
+
+@router.post(
+    "/eiffel/parse",
+    tags=["Eiffel Editor"],
+    response_model=ParseResult,
+    responses={413: {"model": Message}},
+)
+async def parse_eiffel_file(
+    request_data: ParseRequest,
+    session_id: Optional[str] = Cookie(None),
+):
+    """
+    Parse the full content of an Eiffel file and remember it, so that
+    later changes can be sent as edits to /eiffel/parse/edit.
+    """
+    session_id = get_or_create_session_id(session_id)
+    update_session_activity(session_id)
+
+    try:
+        # Parsed in the thread pool, so that parses run concurrently
+        outline = await run_in_threadpool(
+            get_parse_service().open, session_id, request_data.filename, request_data.content
+        )
+    except DocumentTooLargeError as e:
+        return _too_large_response(session_id, e)
+    result = ParseResult(success=True, filename=request_data.filename, **outline)
+    return _parse_response(session_id, result.model_dump())
+
+
+@router.post(
+    "/eiffel/parse/edit",
+    tags=["Eiffel Editor"],
+    response_model=ParseResult,
+    responses={404: {"model": Message}, 413: {"model": Message}, 422: {"model": Message}},
+)
+async def edit_eiffel_file(
+    request_data: ParseEditRequest,
+    session_id: Optional[str] = Cookie(None),
+):
+    """
+    Apply editor changes to a previously parsed Eiffel file and re-parse it
+    incrementally. Answers 404 if the file has to be sent in full again.
+    """
+    session_id = get_or_create_session_id(session_id)
+    update_session_activity(session_id)
+
+    edits = [
+        TextEdit(
+            edit.start.line, edit.start.column, edit.end.line, edit.end.column, edit.text
+        )
+        for edit in request_data.edits
+    ]
+    try:
+        outline = await run_in_threadpool(
+            get_parse_service().edit, session_id, request_data.filename, edits
+        )
+    except DocumentTooLargeError as e:
+        return _too_large_response(session_id, e)
+    except ValueError as e:
+        return _parse_response(
+            session_id, Message(message=f"Invalid edit: {str(e)}").model_dump(), 422
+        )
+    if outline is None:
+        return _parse_response(
+            session_id,
+            Message(message=f"{request_data.filename} has not been parsed yet").model_dump(),
+            404,
+        )
+    result = ParseResult(success=True, filename=request_data.filename, **outline)
+    return _parse_response(session_id, result.model_dump())
+
+
+@router.delete("/eiffel/parse", tags=["Eiffel Editor"], response_model=Message)
+async def close_eiffel_file(
+    filename: Optional[str] = None,
+    session_id: Optional[str] = Cookie(None),
+):
+    """Forget a parsed file, or all parsed files of the session."""
+    if not session_id:
+        return Message(message="No documents to close")
+    closed = get_parse_service().close(session_id, filename)
+    return Message(message=f"Closed {closed} documents")
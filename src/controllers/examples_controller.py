@@ -3,12 +3,10 @@ Examples controller.
 Handles loading and serving code examples.
 """
 
-import json
-import os
-import csv
 from typing import Optional
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Header
+from fastapi.responses import JSONResponse, Response
+from examples_catalog import CatalogResponse, get_examples_catalog
 from models import CodeExamples, Message, ProgrammingLanguages, SingleExample
 
 router = APIRouter()
@@ -23,45 +21,32 @@ def set_globals(config):
     CONFIG = config
 
 
-def get_example_data() -> CodeExamples:
-    # Try relative to project root
-    examples_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "examples")
-    if not os.path.exists(examples_path):
-        # Try absolute path from workspace root
-        abs_path = os.path.abspath(
-            os.path.join(os.path.dirname(__file__), "../../examples/")
-        )
-        print(f"Trying fallback abs_path: {abs_path}")
-        examples_path = abs_path
-
-    examples = []
-    for file_name in os.listdir(examples_path):
-        file_path = os.path.join(examples_path, file_name)
-        if os.path.isfile(file_path) and file_name.endswith(".csv"):
-            examples.append(file_name)
-
-    result = dict()
-    for example in examples:
-        with open(os.path.join(examples_path, example), "r", encoding="utf-8") as f:
-            language_name = example.removesuffix("_examples.csv")
-            reader = csv.reader(f)
-            data = [x for x in reader][1:]
-            result[language_name] = {row[0]: row[1] for row in data}
-    return CodeExamples(**result)
+def _catalog_response(cached: CatalogResponse, if_none_match: Optional[str]) -> Response:
+    """Serve a pre-serialized catalog response, or 304 if the client has it."""
+    if if_none_match and cached.etag in if_none_match:
+        return Response(status_code=304, headers={"ETag": cached.etag})
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers={"ETag": cached.etag},
+    )
 
 
 @router.get("/examples", tags=["Examples"], response_model=CodeExamples)
-async def get_examples():
+async def get_examples(if_none_match: Optional[str] = Header(None)):
     """Get the list of available code examples."""
-    result = get_example_data()
-    return result
+    return _catalog_response(get_examples_catalog().all_examples, if_none_match)
 
 
-@router.get("/examples/{language}", tags=["Examples"])
-async def get_examples_by_language(language: ProgrammingLanguages) -> list[str]:
+@router.get("/examples/{language}", tags=["Examples"], response_model=list[str])
+async def get_examples_by_language(
+    language: ProgrammingLanguages, if_none_match: Optional[str] = Header(None)
+):
     """Get the list of available code examples for a specific language."""
-    result = getattr(get_example_data(), language.value).keys()
-    return result
+    cached = get_examples_catalog().language_response(language.value)
+    if cached is None:
+        return []
+    return _catalog_response(cached, if_none_match)
 
 
 @router.get(
@@ -70,19 +55,18 @@ async def get_examples_by_language(language: ProgrammingLanguages) -> list[str]:
     response_model=SingleExample,
     responses={404: {"model": Message}},
 )
-async def get_example_code(language: ProgrammingLanguages, name: str):
+async def get_example_code(
+    language: ProgrammingLanguages, name: str, if_none_match: Optional[str] = Header(None)
+):
     """Get the source code of a specific example file."""
-    examples = getattr(get_example_data(), language.value)
-    if name not in examples:
+    catalog = get_examples_catalog()
+    cached = catalog.example_response(language.value, name)
+    if cached is None:
+        examples = catalog.examples.get(language.value, {})
         return JSONResponse(
             status_code=404,
             content=Message(
                 message=f"Example '{name}' not found. Available examples are: {list(examples.keys())}"
-            ),
+            ).model_dump(),
         )
-
-    return SingleExample(
-        url=examples[name],
-        language=language.value,
-        filename=name,
-    )
+    return _catalog_response(cached, if_none_match)
@@ -7,7 +7,7 @@ import threading
 import time
 import sys
 import os
-from typing import Optional, Dict
+from typing import Optional
 
 # Add src to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -17,6 +17,9 @@ from fastapi.responses import JSONResponse
 
 from container_manager import get_container_manager
 from language_executor.factory import get_executor_by_name
+from execution_store import ExecutionStore
+from example_warmup import ExampleResultCache, get_example_results
+from preflight import check_syntax, format_syntax_errors, is_advisory
 from models import (
     ActiveProcess,
     CompileRequest,
@@ -30,6 +33,7 @@ from models import (
     ProcessFinishedResponse,
     ProcessStatusResponse,
     RunningInformation,
+    SyntaxErrorInfo,
 )
 from .shared_utils import (
     get_or_create_session_id,
@@ -41,7 +45,7 @@ from .shared_utils import (
 router = APIRouter()
 
 # These will be set by main.py through set_globals
-active_processes: Dict[str, ActiveProcess] = {}
+active_processes: ExecutionStore = ExecutionStore()
 CONFIG: Optional[CompilerConfig] = None
 
 
@@ -52,6 +56,24 @@ def set_globals(processes, config):
     CONFIG = config
 
 
+def _syntax_error_response(session_id: str, errors) -> JSONResponse:
+    """Reject a run whose code failed the syntax pre-flight."""
+    response_data = ExecutionResult(
+        success=False,
+        message="Syntax error",
+        output=format_syntax_errors(errors),
+        execution_id="",
+        session_id=session_id,
+        started=False,
+        syntax_errors=[SyntaxErrorInfo(**error) for error in errors],
+    )
+    response = JSONResponse(content=response_data.model_dump(), status_code=422)
+    response.set_cookie(
+        key="session_id", value=session_id, httponly=True, max_age=86400
+    )
+    return response
+
+
 @router.post(
     "/compile",
     tags=["Code Execution"],
@@ -71,6 +93,39 @@ async def compile_code(
         session_id = get_or_create_session_id(session_id)
         update_session_activity(session_id)
 
+        # Reject code that does not parse before touching a container
+        errors = check_syntax(language, files)
+        if errors and not is_advisory(language):
+            response_data = CompileResult(
+                success=False,
+                message="Syntax error",
+                output=format_syntax_errors(errors),
+                syntax_errors=[SyntaxErrorInfo(**error) for error in errors],
+            )
+            response = JSONResponse(content=response_data.model_dump(), status_code=422)
+            response.set_cookie(
+                key="session_id", value=session_id, httponly=True, max_age=86400
+            )
+            return response
+
+        # Unmodified built-in examples were compiled by the warmup job
+        cached = get_example_results().get_compile_result(
+            ExampleResultCache.key(language, files, main_file)
+        )
+        if cached is not None:
+            output, output_path = cached
+            response_data = CompileResult(
+                success=True,
+                message="Compilation successful",
+                output=output,
+                output_path=output_path,
+            )
+            response = JSONResponse(content=response_data.model_dump(), status_code=200)
+            response.set_cookie(
+                key="session_id", value=session_id, httponly=True, max_age=86400
+            )
+            return response
+
         # Convert Pydantic FileInfo models to executor FileInfo objects
         from language_executor.base import FileInfo as ExecutorFileInfo
 
@@ -86,6 +141,7 @@ async def compile_code(
             message=("Compilation successful" if success else "Compilation failed"),
             output=output,
             output_path=output_path,
+            syntax_errors=[SyntaxErrorInfo(**error) for error in errors] or None,
         )
 
         response = JSONResponse(
@@ -143,6 +199,10 @@ async def run_code(
     if CONFIG is None or language not in CONFIG["supported_languages"]:
         raise HTTPException(status_code=400, detail=f"Unsupported language: {language}")
 
+    errors = check_syntax(language, files)
+    if errors and not is_advisory(language):
+        return _syntax_error_response(session_id, errors)
+
     active_processes[execution_id] = ActiveProcess(
         session_id=session_id,
         start_time=time.time(),
@@ -154,6 +214,16 @@ async def run_code(
         exit_code=None,
     )
 
+    # Unmodified built-in examples were run by the warmup job
+    cached = get_example_results().get_run_result(
+        ExampleResultCache.key(language, files, main_file)
+    )
+    if cached is not None:
+        output, exit_code = cached
+        active_processes.complete(
+            execution_id, True, output, exit_code, "Execution complete"
+        )
+
     def run_in_container():
         try:
             executor = get_executor_by_name(language, version)
@@ -166,25 +236,22 @@ async def run_code(
                 file_objects, session_id, timeout, main_file
             )
 
-            if execution_id in active_processes:
-                proc = active_processes[execution_id]
-                proc.completed = True
-                proc.success = success
-                proc.output = output
-                proc.exit_code = exit_code
-                proc.message = "Execution complete" if success else "Execution failed"
+            active_processes.complete(
+                execution_id,
+                success,
+                output,
+                exit_code,
+                "Execution complete" if success else "Execution failed",
+            )
         except Exception as e:
-            if execution_id in active_processes:
-                proc = active_processes[execution_id]
-                proc.completed = True
-                proc.success = False
-                proc.output = str(e)
-                proc.exit_code = -1
-                proc.message = f"Error during execution: {str(e)}"
-
-    thread = threading.Thread(target=run_in_container)
-    thread.daemon = True
-    thread.start()
+            active_processes.complete(
+                execution_id, False, str(e), -1, f"Error during execution: {str(e)}"
+            )
+
+    if cached is None:
+        thread = threading.Thread(target=run_in_container)
+        thread.daemon = True
+        thread.start()
 
     response_data = ExecutionResult(
         success=True,
@@ -193,6 +260,7 @@ async def run_code(
         execution_id=execution_id,
         session_id=session_id,
         started=True,
+        syntax_errors=[SyntaxErrorInfo(**error) for error in errors] or None,
     )
 
     response = JSONResponse(content=response_data.model_dump(), status_code=200)
@@ -222,6 +290,9 @@ async def verify_code(
     files = request_data["files"]
     main_file = request_data["main_file"]
     timeout = request_data.get("timeout", 30)
+    shards = request_data.get("shards")
+    prover_cores = request_data.get("prover_cores")
+    vc_timeout = request_data.get("vc_timeout")
 
     # Find the main file content
     main_file_content = None
@@ -235,8 +306,6 @@ async def verify_code(
             status_code=400, detail=f"Main file '{main_file}' not found"
         )
 
-    code = main_file_content
-
     session_id = get_or_create_session_id(session_id)
     execution_id = increment_process_counter()
     update_session_activity(session_id)
@@ -251,6 +320,9 @@ async def verify_code(
     if CONFIG is None or language not in CONFIG["supported_languages"]:
         raise HTTPException(status_code=400, detail=f"Unsupported language: {language}")
 
+    # Advisory only: the prover reports the errors that matter
+    errors = check_syntax(language, files)
+
     active_processes[execution_id] = ActiveProcess(
         session_id=session_id,
         start_time=time.time(),
@@ -269,25 +341,30 @@ async def verify_code(
                 raise Exception(f"Verification not supported for {language}")
 
             # Use the verify method instead of execute
-            success, output, exit_code = executor.verify(code, session_id, timeout)
-            if execution_id in active_processes:
-                proc = active_processes[execution_id]
-                proc.completed = True
-                proc.success = success
-                proc.output = output
-                proc.exit_code = exit_code
-                proc.message = (
-                    "Verification complete" if success else "Verification failed"
-                )
+            from language_executor.base import FileInfo as ExecutorFileInfo
+
+            file_objects = [ExecutorFileInfo(f.name, f.content) for f in files]
+            success, output, exit_code = executor.verify(
+                file_objects,
+                session_id,
+                timeout,
+                main_file,
+                shards=shards,
+                prover_cores=prover_cores,
+                vc_timeout=vc_timeout,
+            )
+            active_processes.complete(
+                execution_id,
+                success,
+                output,
+                exit_code,
+                "Verification complete" if success else "Verification failed",
+            )
         except Exception as e:
             print(e)
-            if execution_id in active_processes:
-                proc = active_processes[execution_id]
-                proc.completed = True
-                proc.success = False
-                proc.output = str(e)
-                proc.exit_code = -1
-                proc.message = f"Error during verification: {str(e)}"
+            active_processes.complete(
+                execution_id, False, str(e), -1, f"Error during verification: {str(e)}"
+            )
 
     thread = threading.Thread(target=verify_in_container)
     thread.daemon = True
@@ -300,6 +377,7 @@ async def verify_code(
         execution_id=execution_id,
         session_id=session_id,
         started=True,
+        syntax_errors=[SyntaxErrorInfo(**error) for error in errors] or None,
     )
 
     response = JSONResponse(content=response_data.model_dump(), status_code=200)
@@ -317,24 +395,26 @@ async def verify_code(
 )
 async def cancel_execution(execution_id: str = Form(...)):
     """Cancel a running execution."""
-    if execution_id not in active_processes:
+    proc = active_processes.get(execution_id)
+    if proc is None:
         return JSONResponse(
             content=SuccessMessage(
                 success=False, message="Execution not found"
             ).model_dump(),
             status_code=404,
         )
-    proc = active_processes[execution_id]
     session_id = proc.session_id
     try:
+        message = "Execution cancelled by user"
+        # Mark the execution as finished first, so that the outcome of the
+        # killed process does not overwrite the cancellation
+        active_processes.complete(
+            execution_id, False, proc.output or "", None, message, cancelled=True
+        )
         container_mgr = get_container_manager()
         cancelled = container_mgr.cancel_execution(session_id)
-        proc.cancelled = True
-        proc.completed = True
-        proc.success = False
-        proc.message = "Execution cancelled by user"
         return JSONResponse(
-            content=SuccessMessage(success=cancelled, message=proc.message).model_dump()
+            content=SuccessMessage(success=cancelled, message=message).model_dump()
         )
     except Exception as e:
         return JSONResponse(
@@ -352,17 +432,20 @@ async def cancel_execution(execution_id: str = Form(...)):
     responses={404: {"model": RunningInformation}},
 )
 async def get_execution_status(execution_id: str):
-    """Get the status of a running execution."""
-    if execution_id not in active_processes:
+    """
+    Get the status of an execution. Finished results can be read again
+    until they expire.
+    """
+    process_info = active_processes.get(execution_id)
+    if process_info is None:
         return JSONResponse(
             content=RunningInformation(
-                running=False, message="Execution not found or completed"
+                running=False, message="Execution not found or expired"
             ).model_dump(),
             status_code=404,
         )
 
-    process_info = active_processes[execution_id]
-    elapsed_time = time.time() - process_info.start_time
+    elapsed_time = (process_info.end_time or time.time()) - process_info.start_time
 
     if process_info.completed:
         final_result = ProcessFinishedResponse(
@@ -378,7 +461,6 @@ async def get_execution_status(execution_id: str):
             cancelled=process_info.cancelled,
             operation_type=process_info.operation_type,
         )
-        del active_processes[execution_id]
         return final_result
 
     return ProcessStatusResponse(
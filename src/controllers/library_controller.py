@@ -3,21 +3,89 @@ Library browser controller.
 Handles Eiffel library class browsing functionality.
 """
 
-from fastapi import APIRouter, Cookie, HTTPException
-from fastapi.responses import JSONResponse
+from typing import Optional
+
+from fastapi import APIRouter, Cookie, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
 
 from language_executor.factory import get_executor_by_name
 from src.models import (
     EiffelLibraryNameMapping,
     EiffelLibraryNameMappingBase,
+    LibraryAutocompleteResult,
+    LibraryClassMatch,
+    LibraryFeatureMatch,
     LibraryInformation,
+    LibrarySearchResult,
+    Message,
 )
 from .shared_utils import get_or_create_session_id, update_session_activity
 from eiffel_mapping_manager import get_mapping_manager
+from library_cache import LibraryClassCache, get_library_cache, is_valid_class_name
+from library_index import get_library_index_manager
 
 router = APIRouter()
 
 
+def _library_index_unavailable() -> JSONResponse:
+    return JSONResponse(
+        content=Message(message="The library index is still being built").model_dump(),
+        status_code=503,
+        headers={"Retry-After": "30"},
+    )
+
+
+@router.get(
+    "/eiffel/library/search",
+    tags=["Eiffel Library"],
+    response_model=LibrarySearchResult,
+    responses={503: {"model": Message}},
+)
+async def search_eiffel_library(q: str, limit: int = 20):
+    """
+    Search library classes (prefix, substring and fuzzy match, including
+    legacy class names) and features (prefix, optionally as CLASS.feature).
+    """
+    index = get_library_index_manager().index
+    if index is None:
+        return _library_index_unavailable()
+    limit = max(1, min(limit, 100))
+
+    classes = [
+        LibraryClassMatch(name=name, alias_of=alias_of)
+        for name, alias_of in index.search_classes(q.split(".", 1)[0], limit)
+    ]
+    features = [
+        LibraryFeatureMatch(class_name=class_name, name=name, signature=signature)
+        for class_name, name, signature in index.search_features(q, limit)
+    ]
+    return LibrarySearchResult(
+        success=True,
+        query=q,
+        classes=classes,
+        features=features,
+        message=f"Found {len(classes)} classes and {len(features)} features",
+    )
+
+
+@router.get(
+    "/eiffel/library/autocomplete",
+    tags=["Eiffel Library"],
+    response_model=LibraryAutocompleteResult,
+    responses={503: {"model": Message}},
+)
+async def autocomplete_eiffel_library(prefix: str, limit: int = 10):
+    """Complete a library class name prefix."""
+    index = get_library_index_manager().index
+    if index is None:
+        return _library_index_unavailable()
+    limit = max(1, min(limit, 100))
+    return LibraryAutocompleteResult(
+        success=True, prefix=prefix, suggestions=index.complete(prefix, limit)
+    )
+
+
 @router.get(
     "/eiffel/library/{class_name}",
     tags=["Eiffel Library"],
@@ -26,11 +94,13 @@ router = APIRouter()
 async def get_eiffel_library_class(
     class_name: str,
     session_id: str = Cookie(None),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Fetch the source code of an Eiffel library class using apb -short.
     Automatically applies class name mappings for legacy/deprecated names.
     Only available for Eiffel language.
+    Responses carry an ETag; a matching If-None-Match yields 304 Not Modified.
     """
     session_id = get_or_create_session_id(session_id)
     update_session_activity(session_id)
@@ -39,6 +109,8 @@ async def get_eiffel_library_class(
     mapping_manager = get_mapping_manager()
     original_class_name = class_name
     mapped_class_name = mapping_manager.apply_mapping(class_name)
+    if not is_valid_class_name(mapped_class_name):
+        raise HTTPException(status_code=400, detail=f"Invalid class name: {class_name}")
 
     # Get Eiffel executor
     executor = get_executor_by_name("eiffel", "")
@@ -50,8 +122,14 @@ async def get_eiffel_library_class(
             detail="Library class browsing not supported for this language",
         )
 
-    # Use the mapped class name for fetching
-    success, source_code = executor.get_library_class(mapped_class_name, session_id)
+    # Use the mapped class name for fetching; the lookup may wait for a
+    # library browser container, so it runs off the event loop
+    success, source_code = await run_in_threadpool(
+        executor.get_library_class, mapped_class_name, session_id
+    )
+    if success:
+        # Only existing classes are worth prewarming
+        get_library_cache().record_request(mapped_class_name)
 
     # Prepare response message
     message = "Library class fetched successfully"
@@ -67,9 +145,15 @@ async def get_eiffel_library_class(
         message=message if success else source_code,
     )
 
-    response = JSONResponse(
-        content=response_data.model_dump(), status_code=200 if success else 404
-    )
+    etag = LibraryClassCache.etag(source_code) if success else None
+    if etag and if_none_match and etag in if_none_match:
+        response = Response(status_code=304, headers={"ETag": etag})
+    else:
+        response = JSONResponse(
+            content=response_data.model_dump(), status_code=200 if success else 404
+        )
+        if etag:
+            response.headers["ETag"] = etag
     response.set_cookie(
         key="session_id", value=session_id, httponly=True, max_age=86400
     )
@@ -102,6 +186,7 @@ async def reload_eiffel_mappings():
     try:
         mapping_manager = get_mapping_manager()
         mapping_manager.reload_mappings()
+        get_library_index_manager().reload_aliases()
         mappings = mapping_manager.get_all_mappings()
 
         response_data = EiffelLibraryNameMappingBase(
@@ -3,17 +3,19 @@ Session management controller.
 Handles session info, cleanup, and related operations.
 """
 
-from typing import Dict
 from fastapi import APIRouter, Cookie
 from fastapi.responses import JSONResponse
 
 from container_manager import get_container_manager
-from models import Message, SessionInformation, UserSession, SuccessMessage
+from language_executor.eiffel_executor import EiffelExecutor
+from models import Message, SessionInformation, SuccessMessage
+from session_store import SessionStore
+from workspace_snapshots import get_workspace_snapshots
 
 router = APIRouter()
 
 # These will be set by main.py through set_globals
-user_sessions: Dict[str, UserSession] = {}
+user_sessions: SessionStore = SessionStore()
 
 
 def set_globals(sessions):
@@ -30,7 +32,8 @@ def set_globals(sessions):
 )
 async def get_session_info(session_id: str = Cookie(None)):
     """Get information about the current session."""
-    if not session_id or session_id not in user_sessions:
+    session_info = user_sessions.get(session_id)
+    if session_info is None:
         return JSONResponse(
             content=Message(
                 message=f"No active session with id: {session_id}"
@@ -40,7 +43,6 @@ async def get_session_info(session_id: str = Cookie(None)):
     try:
         container_mgr = get_container_manager()
         container_info = container_mgr.get_session_info(session_id)
-        session_info = user_sessions[session_id]
         return SessionInformation(
             session_id=session_id,
             session_created=session_info.created_at,
@@ -69,8 +71,12 @@ async def cleanup_session(session_id: str = Cookie(None)):
     try:
         container_mgr = get_container_manager()
         success = container_mgr.cleanup_session_container(session_id)
-        if session_id in user_sessions:
-            del user_sessions[session_id]
+        for helper_id in EiffelExecutor.verification_helper_ids(session_id):
+            if container_mgr.has_session_container(helper_id):
+                container_mgr.cleanup_session_container(helper_id)
+            get_workspace_snapshots().discard(helper_id)
+        get_workspace_snapshots().discard(session_id)
+        user_sessions.remove(session_id)
         return JSONResponse(
             content=SuccessMessage(
                 success=success,
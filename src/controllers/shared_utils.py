@@ -2,31 +2,30 @@
 Shared utilities for controllers.
 """
 
-import uuid
-import time
 import base64
 import gzip
-from typing import Dict, Optional
+from typing import Optional
 from fastapi import Request, HTTPException
 from pydantic import ValidationError
 
-from models import UserSession, MultiFileRequest
+from models import MultiFileRequest
+from execution_store import ExecutionStore
+from session_store import SessionStore
+from state_backend import get_state_backend
 
 
 # Global state - will be set by main.py
-active_processes: Dict[str, any] = {}
-user_sessions: Dict[str, UserSession] = {}
+active_processes: ExecutionStore = ExecutionStore()
+user_sessions: SessionStore = SessionStore()
 CONFIG: Optional[any] = None
-PROCESS_COUNTER = 0
 
 
-def set_globals(processes, sessions, config, counter):
+def set_globals(processes, sessions, config):
     """Set global state variables."""
-    global active_processes, user_sessions, CONFIG, PROCESS_COUNTER
+    global active_processes, user_sessions, CONFIG
     active_processes = processes
     user_sessions = sessions
     CONFIG = config
-    PROCESS_COUNTER = counter
 
 
 def get_config():
@@ -35,7 +34,7 @@ def get_config():
 
 
 def get_active_processes():
-    """Get the active_processes dictionary."""
+    """Get the execution store."""
     return active_processes
 
 
@@ -48,18 +47,12 @@ def get_or_create_session_id(session_id: Optional[str] = None) -> str:
     """Get existing session ID or create a new one."""
     if session_id and session_id in user_sessions:
         return session_id
-    new_session_id = str(uuid.uuid4())
-    user_sessions[new_session_id] = UserSession(
-        created_at=time.time(),
-        last_used=time.time(),
-    )
-    return new_session_id
+    return user_sessions.create()
 
 
 def update_session_activity(session_id: str):
     """Update the last used time for a session."""
-    if session_id in user_sessions:
-        user_sessions[session_id].last_used = time.time()
+    user_sessions.touch(session_id)
 
 
 def safe_decode(val):
@@ -83,16 +76,20 @@ async def parse_request_data(request: Request) -> dict:
             "timeout": getattr(multi_file_request, "timeout", 30),
             "file_path": getattr(multi_file_request, "file_path", None),
             "output_path": getattr(multi_file_request, "output_path", None),
+            "shards": getattr(multi_file_request, "shards", None),
+            "prover_cores": getattr(multi_file_request, "prover_cores", None),
+            "vc_timeout": getattr(multi_file_request, "vc_timeout", None),
         }
     except (ValidationError, ValueError) as e:
         raise HTTPException(status_code=400, detail=f"Invalid JSON request: {str(e)}")
 
 
 def increment_process_counter() -> str:
-    """Increment and return the next process counter value."""
-    global PROCESS_COUNTER
-    PROCESS_COUNTER += 1
-    return str(PROCESS_COUNTER)
+    """
+    Increment and return the next process counter value. The counter lives
+    in the state backend so that ids stay unique across workers.
+    """
+    return str(get_state_backend().incr("execution_id"))
 
 
 def urlsafe_b64_to_bytes(s: str) -> bytes:
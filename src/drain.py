@@ -0,0 +1,131 @@
+"""
+Drain Mode
+Lets a server instance be taken out of service without failing in-flight
+student runs. While draining, new compile/run/verify jobs are refused with
+503 and a Retry-After header (so that a load balancer or the client retries
+against another instance), while status polls and cancels keep working.
+
+Draining starts on shutdown or through POST /admin/drain before a deploy.
+On shutdown the server waits up to a grace period for running jobs; jobs
+still running after it are recorded as interrupted, so that their status
+does not stay pending forever.
+
+A drain started through the admin endpoint is kept in the state backend,
+so that it applies to every worker sharing it; the production launcher
+clears it when it starts a new set of workers. A shutdown only drains the
+worker that shuts down.
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+from config_manager import get_config_manager
+from execution_store import ExecutionStore
+from state_backend import StateBackend, get_state_backend
+
+# Endpoints that start new jobs
+JOB_PATHS = frozenset({"/compile", "/run", "/verify"})
+
+
+class DrainMode:
+    """Whether this instance is draining, and the wait for in-flight jobs."""
+
+    def __init__(
+        self,
+        grace_seconds: float = 60,
+        retry_after_seconds: int = 10,
+        backend: Optional[StateBackend] = None,
+    ):
+        self.grace_seconds = grace_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self.backend = backend
+        # Start of a drain of this process only (on shutdown)
+        self._local_started_at: Optional[float] = None
+
+    @property
+    def started_at(self) -> Optional[float]:
+        if self._local_started_at is not None:
+            return self._local_started_at
+        if self.backend is not None:
+            value = self.backend.get("drain", "started_at")
+            if value is not None:
+                return float(value)
+        return None
+
+    @property
+    def draining(self) -> bool:
+        return self.started_at is not None
+
+    def start(self, shared: bool = True) -> bool:
+        """
+        Start draining every worker sharing the state backend, or only this
+        process without shared. Returns False if already draining.
+        """
+        if self.draining:
+            return False
+        now = time.time()
+        if shared and self.backend is not None:
+            if not self.backend.add("drain", "started_at", str(now)):
+                return False
+        else:
+            self._local_started_at = now
+        print("[Drain] Refusing new jobs")
+        return True
+
+    def stop(self) -> None:
+        """Accept new jobs again (e.g. after an aborted deploy)."""
+        self._local_started_at = None
+        if self.backend is not None:
+            self.backend.delete("drain", "started_at")
+
+    def refuses(self, method: str, path: str) -> bool:
+        """Whether a request would start a job that is refused while draining."""
+        return method == "POST" and path in JOB_PATHS and self.draining
+
+    def status(self, executions: ExecutionStore) -> Dict[str, object]:
+        return {
+            "draining": self.draining,
+            "started_at": self.started_at,
+            "in_flight": len(executions.running_ids()),
+            "grace_seconds": self.grace_seconds,
+        }
+
+    async def wait(self, executions: ExecutionStore) -> int:
+        """
+        Wait up to the grace period for the in-flight jobs, then record the
+        remaining ones as interrupted. Returns the number of interrupted jobs.
+        """
+        deadline = time.time() + self.grace_seconds
+        running = executions.running_ids()
+        while running and time.time() < deadline:
+            print(f"[Drain] Waiting for {len(running)} in-flight jobs")
+            await asyncio.sleep(1)
+            running = executions.running_ids()
+        for execution_id in running:
+            executions.complete(
+                execution_id,
+                False,
+                "",
+                -1,
+                "Interrupted by a server restart, please try again",
+                cancelled=True,
+            )
+        return len(running)
+
+
+# Global instance for easy access
+_drain_mode: Optional[DrainMode] = None
+
+
+def get_drain_mode() -> DrainMode:
+    """Get the global drain mode instance."""
+    global _drain_mode
+    if _drain_mode is None:
+        settings = get_config_manager().languages_config.get("drain", {})
+        _drain_mode = DrainMode(
+            grace_seconds=settings.get("grace_seconds", 60),
+            retry_after_seconds=settings.get("retry_after_seconds", 10),
+            backend=get_state_backend(),
+        )
+    return _drain_mode
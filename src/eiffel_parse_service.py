@@ -0,0 +1,207 @@
+"""
+Eiffel Parse Service
+Keeps the tree-sitter tree of every Eiffel file a session has open in the
+editor, applies text edits incrementally and answers with the file outline
+and syntax errors, without a container round trip.
+
+Documents are parsed concurrently, each thread with its own parser; only
+edits of the same document wait for each other. Documents larger than
+max_document_bytes are refused.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from tree_sitter import Parser
+
+from eiffel_syntax import EIFFEL_LANGUAGE, analyze_tree, syntax_errors
+
+DocumentKey = Tuple[str, str]  # (session_id, filename)
+
+
+class DocumentTooLargeError(Exception):
+    """A document (or a document after edits) exceeds max_document_bytes."""
+
+
+class TextEdit:
+    """Replacement of a range of text; lines and columns are 0-based characters."""
+
+    def __init__(
+        self,
+        start_line: int,
+        start_column: int,
+        end_line: int,
+        end_column: int,
+        text: str,
+    ):
+        self.start_line = start_line
+        self.start_column = start_column
+        self.end_line = end_line
+        self.end_column = end_column
+        self.text = text
+
+
+class ParsedDocument:
+    """Source text of an open file together with its parse tree."""
+
+    def __init__(self, text: str, tree):
+        self.text = text
+        self.tree = tree
+        # Held while the document is edited and described
+        self.lock = threading.Lock()
+
+    def apply(self, edit: TextEdit, parser: Parser, max_bytes: int) -> None:
+        """Apply an edit to the text and re-parse incrementally."""
+        lines = self.text.split("\n")
+        start = self._offset(lines, edit.start_line, edit.start_column)
+        end = self._offset(lines, edit.end_line, edit.end_column)
+        if end < start:
+            raise ValueError("Edit range ends before it starts")
+
+        start_byte = len(self.text[:start].encode("utf8"))
+        old_end_byte = start_byte + len(self.text[start:end].encode("utf8"))
+        new_end_byte = start_byte + len(edit.text.encode("utf8"))
+        start_point = self._point(self.text, start)
+        old_end_point = self._point(self.text, end)
+
+        text = self.text[:start] + edit.text + self.text[end:]
+        if len(text.encode("utf8")) > max_bytes:
+            raise DocumentTooLargeError(f"Documents are limited to {max_bytes} bytes")
+        self.text = text
+        new_end_point = self._point(self.text, start + len(edit.text))
+
+        self.tree.edit(
+            start_byte=start_byte,
+            old_end_byte=old_end_byte,
+            new_end_byte=new_end_byte,
+            start_point=start_point,
+            old_end_point=old_end_point,
+            new_end_point=new_end_point,
+        )
+        self.tree = parser.parse(bytes(self.text, "utf8"), self.tree)
+
+    @staticmethod
+    def _offset(lines: List[str], line: int, column: int) -> int:
+        if line < 0 or line >= len(lines):
+            raise ValueError(f"Line {line} is outside the document")
+        column = max(0, min(column, len(lines[line])))
+        return sum(len(text) + 1 for text in lines[:line]) + column
+
+    @staticmethod
+    def _point(text: str, offset: int) -> Tuple[int, int]:
+        """tree-sitter point (row, byte column) of a character offset."""
+        before = text[:offset]
+        row = before.count("\n")
+        line_start = before.rfind("\n") + 1
+        return row, len(before[line_start:].encode("utf8"))
+
+
+class EiffelParseService:
+    """Session-scoped store of parsed editor documents."""
+
+    def __init__(self, max_documents: int = 1024, max_document_bytes: int = 1024 * 1024):
+        self.max_documents = max_documents
+        self.max_document_bytes = max_document_bytes
+        self._documents: "OrderedDict[DocumentKey, ParsedDocument]" = OrderedDict()
+        # Guards _documents only; parsing happens outside of it
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _parser(self) -> Parser:
+        """The parser of the current thread (parsers are not thread-safe)."""
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = self._local.parser = Parser(EIFFEL_LANGUAGE)
+        return parser
+
+    def open(self, session_id: str, filename: str, text: str) -> Dict[str, object]:
+        """Parse a file from scratch and remember it for later edits."""
+        text = text.lstrip("\ufeff")
+        data = bytes(text, "utf8")
+        if len(data) > self.max_document_bytes:
+            raise DocumentTooLargeError(
+                f"Documents are limited to {self.max_document_bytes} bytes"
+            )
+        document = ParsedDocument(text, self._parser().parse(data))
+        outline = self._describe(document)
+        with self._lock:
+            self._documents[(session_id, filename)] = document
+            self._documents.move_to_end((session_id, filename))
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+        return outline
+
+    def edit(
+        self, session_id: str, filename: str, edits: List[TextEdit]
+    ) -> Optional[Dict[str, object]]:
+        """
+        Apply edits to an open file. Returns None if the file is not open
+        (the client should then send its full content again).
+        """
+        key = (session_id, filename)
+        with self._lock:
+            document = self._documents.get(key)
+            if document is None:
+                return None
+            self._documents.move_to_end(key)
+        with document.lock:
+            try:
+                for text_edit in edits:
+                    document.apply(text_edit, self._parser(), self.max_document_bytes)
+            except (ValueError, DocumentTooLargeError):
+                # The client is out of sync (or over the limit); make it
+                # resend the whole file
+                with self._lock:
+                    if self._documents.get(key) is document:
+                        del self._documents[key]
+                raise
+            return self._describe(document)
+
+    def close(self, session_id: str, filename: Optional[str] = None) -> int:
+        """Forget one file, or every file of a session. Returns the count."""
+        with self._lock:
+            keys = [
+                key
+                for key in self._documents
+                if key[0] == session_id and filename in (None, key[1])
+            ]
+            for key in keys:
+                del self._documents[key]
+        return len(keys)
+
+    @staticmethod
+    def _describe(document: ParsedDocument) -> Dict[str, object]:
+        start_time = time.perf_counter()
+        info = analyze_tree(document.tree, document.text)
+        features = []
+        if info is not None:
+            features = [
+                {
+                    "names": feature.names,
+                    "signature": feature.signature,
+                    "start_line": feature.start_line,
+                    "end_line": feature.end_line,
+                }
+                for feature in info.features
+            ]
+        return {
+            "class_name": info.name if info else None,
+            "creation_procedures": info.creation_procedures if info else [],
+            "features": features,
+            "errors": syntax_errors(document.tree),
+            "analysis_time_ms": round((time.perf_counter() - start_time) * 1000, 3),
+        }
+
+
+# Global instance for easy access
+_parse_service: Optional[EiffelParseService] = None
+
+
+def get_parse_service() -> EiffelParseService:
+    """Get the global Eiffel parse service instance."""
+    global _parse_service
+    if _parse_service is None:
+        _parse_service = EiffelParseService()
+    return _parse_service
@@ -0,0 +1,232 @@
+"""
+Eiffel Source Analysis
+Tree-sitter based helpers for extracting classes, features and class
+references from Eiffel source code.
+"""
+
+import hashlib
+import re
+from typing import Dict, Iterator, List, Optional, Set
+
+import tree_sitter_eiffel as eiffel
+from tree_sitter import Language, Parser
+
+EIFFEL_LANGUAGE = Language(eiffel.language())
+
+# Keywords that end the signature part of a feature declaration
+_SIGNATURE_END = re.compile(
+    r"^\s*(--|note\b|obsolete\b|require\b|local\b|do\b|once\b|deferred\b|"
+    r"external\b|attribute\b|ensure\b|end\b)",
+    re.IGNORECASE,
+)
+
+
+class FeatureInfo:
+    """A feature declaration (possibly declaring several names)."""
+
+    def __init__(
+        self,
+        names: List[str],
+        text: str,
+        start_line: int,
+        end_line: int,
+        identifiers: Set[str],
+    ):
+        self.names = names
+        self.text = text
+        self.start_line = start_line
+        self.end_line = end_line
+        self.identifiers = identifiers
+
+    @property
+    def signature(self) -> str:
+        """The declaration part of the feature, up to its contracts or body."""
+        lines = []
+        for line in self.text.splitlines():
+            if lines and _SIGNATURE_END.match(line):
+                break
+            lines.append(line.strip())
+        return " ".join(part for part in lines if part)
+
+
+class ClassInfo:
+    """Structural summary of a single Eiffel class."""
+
+    def __init__(
+        self,
+        name: str,
+        text: str,
+        context: str,
+        features: List[FeatureInfo],
+        suppliers: Set[str],
+        creation_procedures: Optional[List[str]] = None,
+    ):
+        self.name = name
+        self.text = text
+        # Class text with all feature declarations removed (header,
+        # inheritance, creation clauses, invariant)
+        self.context = context
+        self.features = features
+        self.suppliers = suppliers
+        self.creation_procedures = creation_procedures or []
+
+
+def parse(code: str):
+    """Parse Eiffel source code and return the tree-sitter tree."""
+    parser = Parser(EIFFEL_LANGUAGE)
+    return parser.parse(bytes(code, "utf8"))
+
+
+def walk(node) -> Iterator:
+    """Iterate over a node and all of its descendants in document order."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(reversed(current.children))
+
+
+def node_text(node) -> str:
+    """Decode the source text of a node."""
+    return node.text.decode("utf8") if node.text else ""
+
+
+def content_hash(*parts: str) -> str:
+    """Stable hash over one or more pieces of source text."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _find_class_declaration(tree):
+    for node in walk(tree.root_node):
+        if node.type == "class_declaration":
+            return node
+    return None
+
+
+def _declared_class_name(class_node) -> Optional[str]:
+    for child in class_node.children:
+        if child.type == "class_name":
+            return node_text(child).upper()
+    return None
+
+
+def _feature_names(feature_node) -> List[str]:
+    names = []
+    for child in feature_node.children:
+        if child.type != "new_feature":
+            continue
+        for node in walk(child):
+            if node.type == "identifier":
+                names.append(node_text(node).lower())
+                break
+    return names
+
+
+def analyze_class(code: str) -> Optional[ClassInfo]:
+    """
+    Extract the class name, features and referenced classes from source code.
+    Returns None if the code does not contain a class declaration.
+    """
+    code = code.lstrip("\ufeff")
+    return analyze_tree(parse(code), code)
+
+
+def analyze_tree(tree, code: str) -> Optional[ClassInfo]:
+    """Like analyze_class, for source code that has already been parsed."""
+    class_node = _find_class_declaration(tree)
+    if class_node is None:
+        return None
+    name = _declared_class_name(class_node)
+    if not name:
+        return None
+
+    source = bytes(code, "utf8")
+    features = []
+    suppliers = set()
+    creation_procedures = []
+    context_parts = []
+    context_start = 0
+    for node in walk(class_node):
+        if node.type == "class_name":
+            referenced = node_text(node).upper()
+            if referenced != name:
+                suppliers.add(referenced)
+        elif node.type == "creation_clause":
+            creation_procedures.extend(
+                node_text(child).lower()
+                for child in node.children
+                if child.type == "identifier"
+            )
+        elif node.type == "feature_declaration":
+            names = _feature_names(node)
+            if not names:
+                continue
+            identifiers = {
+                node_text(n).lower() for n in walk(node) if n.type == "identifier"
+            }
+            features.append(
+                FeatureInfo(
+                    names=names,
+                    text=node_text(node),
+                    start_line=node.start_point[0] + 1,
+                    end_line=node.end_point[0] + 1,
+                    identifiers=identifiers,
+                )
+            )
+            context_parts.append(source[context_start:node.start_byte])
+            context_start = node.end_byte
+    context_parts.append(source[context_start:])
+    context = b"".join(context_parts).decode("utf8", errors="replace")
+
+    return ClassInfo(
+        name=name,
+        text=code,
+        context=context,
+        features=features,
+        suppliers=suppliers,
+        creation_procedures=creation_procedures,
+    )
+
+
+def reachable_classes(classes: Dict[str, ClassInfo], root: str) -> Set[str]:
+    """
+    Names of the given classes reachable from the root class through
+    inheritance, supplier and creation references (including the root).
+    """
+    reachable = set()
+    pending = [root.upper()]
+    while pending:
+        name = pending.pop()
+        if name in reachable or name not in classes:
+            continue
+        reachable.add(name)
+        pending.extend(classes[name].suppliers - reachable)
+    return reachable
+
+
+def syntax_errors(tree, limit: int = 50) -> List[Dict[str, object]]:
+    """
+    Locate syntax errors in a parse tree. Returns dicts with 1-based line
+    and column numbers and a message.
+    """
+    errors = []
+    stack = [tree.root_node]
+    while stack and len(errors) < limit:
+        node = stack.pop()
+        if node.type == "ERROR" or node.is_missing:
+            line, column = node.start_point
+            if node.is_missing:
+                message = f"Missing {node.type}"
+            else:
+                snippet = node_text(node).strip().splitlines()
+                near = f" near '{snippet[0][:40]}'" if snippet else ""
+                message = f"Syntax error{near}"
+            errors.append({"line": line + 1, "column": column + 1, "message": message})
+            continue
+        if node.has_error:
+            stack.extend(reversed(node.children))
+    return errors
@@ -0,0 +1,201 @@
+"""
+Example Warmup
+Compiles and runs every built-in example through the normal executors and
+remembers the outcomes. A student's first run of an unmodified example is
+then answered from the result cache instead of a cold container.
+
+Only clean outcomes (successful compile, exit code 0 within the timeout)
+are cached; examples that loop, fail or time out always run for real.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from eiffel_syntax import content_hash
+from examples_catalog import get_examples_catalog
+
+
+class ExampleResultCache:
+    """Compile and run outcomes of the warmed-up examples, by file content."""
+
+    def __init__(self):
+        self._compile_results: Dict[str, Tuple[str, Optional[str]]] = {}
+        self._run_results: Dict[str, Tuple[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(language: str, files, main_file: Optional[str]) -> str:
+        """Key of a submission; files are objects with name and content."""
+        parts = [language, main_file or ""]
+        for file_info in sorted(files, key=lambda f: f.name):
+            parts.extend([file_info.name, file_info.content.lstrip("\ufeff")])
+        return content_hash(*parts)
+
+    def get_compile_result(self, key: str) -> Optional[Tuple[str, Optional[str]]]:
+        """(output, output_path) of a successful compile, if cached."""
+        with self._lock:
+            return self._compile_results.get(key)
+
+    def get_run_result(self, key: str) -> Optional[Tuple[str, int]]:
+        """(output, exit_code) of a clean run, if cached."""
+        with self._lock:
+            return self._run_results.get(key)
+
+    def store(
+        self,
+        key: str,
+        compile_result: Tuple[str, Optional[str]],
+        run_result: Tuple[str, int],
+    ) -> None:
+        with self._lock:
+            self._compile_results[key] = compile_result
+            self._run_results[key] = run_result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._compile_results.clear()
+            self._run_results.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._run_results)
+
+
+def decode_example(url: str):
+    """Decode the files and main file of an example URL (/?c=<token>)."""
+    # Imported here to avoid a circular import with the controllers package
+    from controllers.shared_utils import decompress_token
+    from language_executor.base import FileInfo
+
+    token = url.split("c=", 1)[1] if "c=" in url else url
+    data = json.loads(decompress_token(token))
+    files = [FileInfo(f["name"], f["content"]) for f in data["files"]]
+    main_file = data.get("activeFile") or (files[0].name if files else None)
+    return files, main_file
+
+
+class ExampleWarmup:
+    """Background job warming up all examples, with per-example timings."""
+
+    def __init__(self, timeout: int = 10):
+        self.timeout = timeout
+        self.running = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.results: List[Dict[str, object]] = []
+        self._lock = threading.Lock()
+
+    def start(self, languages: Optional[List[str]] = None) -> bool:
+        """Start warming up in a background thread. False if already running."""
+        with self._lock:
+            if self.running:
+                return False
+            self.running = True
+            self.started_at = time.time()
+            self.finished_at = None
+            self.results = []
+        thread = threading.Thread(target=self._run, args=(languages,), daemon=True)
+        thread.start()
+        return True
+
+    def status(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "running": self.running,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "cached_examples": len(get_example_results()),
+                "results": list(self.results),
+            }
+
+    def _run(self, languages: Optional[List[str]]) -> None:
+        # Imported here to avoid a circular import with the executor package
+        from container_manager import get_container_manager
+        from language_executor.factory import get_executor_by_name
+
+        container_mgr = get_container_manager()
+        try:
+            catalog = get_examples_catalog()
+            for language, examples in catalog.examples.items():
+                if languages and language not in languages:
+                    continue
+                # Unique per worker, as every worker may run a warmup
+                session_id = f"warmup-{os.getpid()}-{language}"
+                try:
+                    executor = get_executor_by_name(language, "")
+                except Exception as e:
+                    print(f"[Warmup] Skipping {language}: {e}")
+                    continue
+                for name, url in examples.items():
+                    result = self._warm_up_example(executor, language, name, url, session_id)
+                    print(f"[Warmup] {language}/{name}: {result['message']}")
+                    with self._lock:
+                        self.results.append(result)
+                container_mgr.cleanup_session_container(session_id)
+        except Exception as e:
+            print(f"[Warmup] Error: {e}")
+        finally:
+            with self._lock:
+                self.running = False
+                self.finished_at = time.time()
+            print(f"[Warmup] Finished: {len(get_example_results())} examples cached")
+
+    def _warm_up_example(
+        self, executor, language: str, name: str, url: str, session_id: str
+    ) -> Dict[str, object]:
+        result = {"language": language, "name": name, "success": False}
+        try:
+            files, main_file = decode_example(url)
+            start_time = time.time()
+            compiled, compile_output, output_path = executor.compile(
+                files, session_id, main_file
+            )
+            result["compile_seconds"] = round(time.time() - start_time, 3)
+            if not compiled:
+                result["message"] = "Compilation failed"
+                return result
+
+            start_time = time.time()
+            success, run_output, exit_code = executor.execute(
+                files, session_id, self.timeout, main_file
+            )
+            result["run_seconds"] = round(time.time() - start_time, 3)
+            result["exit_code"] = exit_code
+            if not success or exit_code != 0:
+                result["message"] = "Execution failed or timed out"
+                return result
+
+            get_example_results().store(
+                ExampleResultCache.key(language, files, main_file),
+                (compile_output, output_path),
+                (run_output, exit_code),
+            )
+            result["success"] = True
+            result["message"] = "Cached"
+        except Exception as e:
+            result["message"] = f"Error: {e}"
+        return result
+
+
+# Global instances for easy access
+_example_results: Optional[ExampleResultCache] = None
+_example_warmup: Optional[ExampleWarmup] = None
+
+
+def get_example_results() -> ExampleResultCache:
+    """Get the global example result cache instance."""
+    global _example_results
+    if _example_results is None:
+        _example_results = ExampleResultCache()
+    return _example_results
+
+
+def get_example_warmup() -> ExampleWarmup:
+    """Get the global example warmup job instance."""
+    global _example_warmup
+    if _example_warmup is None:
+        _example_warmup = ExampleWarmup()
+    return _example_warmup
@@ -0,0 +1,115 @@
+"""
+Examples Catalog
+The code examples (examples/*_examples.csv) loaded into an immutable
+in-memory catalog. The catalog is rebuilt only when a file is added,
+removed or modified; responses are serialized once per build and carry
+strong ETags.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import threading
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+# ((file name, mtime_ns, size), ...) of the files a catalog was built from
+Signature = Tuple[Tuple[str, int, int], ...]
+
+
+class CatalogResponse:
+    """A serialized JSON response and its ETag."""
+
+    def __init__(self, content: object):
+        self.body = json.dumps(content, separators=(",", ":")).encode("utf-8")
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+
+
+class ExamplesCatalog:
+    """Immutable snapshot of the examples directory."""
+
+    def __init__(
+        self,
+        examples: Dict[str, Dict[str, str]],
+        signature: Signature,
+    ):
+        # language -> example name -> example URL
+        self.examples: Mapping[str, Mapping[str, str]] = MappingProxyType(
+            {
+                language: MappingProxyType(dict(entries))
+                for language, entries in examples.items()
+            }
+        )
+        self.signature = signature
+        self.all_examples = CatalogResponse(
+            {language: dict(entries) for language, entries in examples.items()}
+        )
+        self._language_responses = {
+            language: CatalogResponse(list(entries)) for language, entries in examples.items()
+        }
+        self._example_responses = {
+            (language, name): CatalogResponse(
+                {"url": url, "language": language, "filename": name}
+            )
+            for language, entries in examples.items()
+            for name, url in entries.items()
+        }
+
+    def language_response(self, language: str) -> Optional[CatalogResponse]:
+        return self._language_responses.get(language)
+
+    def example_response(self, language: str, name: str) -> Optional[CatalogResponse]:
+        return self._example_responses.get((language, name))
+
+
+def find_examples_path() -> str:
+    # Try relative to project root
+    examples_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "examples")
+    if not os.path.exists(examples_path):
+        # Try absolute path from workspace root
+        examples_path = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "../examples/")
+        )
+    return examples_path
+
+
+def _catalog_signature(examples_path: str) -> Signature:
+    entries = []
+    with os.scandir(examples_path) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.endswith("_examples.csv"):
+                stat = entry.stat()
+                entries.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(entries))
+
+
+def load_examples_catalog(examples_path: str, signature: Signature) -> ExamplesCatalog:
+    examples = {}
+    for file_name, _, _ in signature:
+        file_path = os.path.join(examples_path, file_name)
+        with open(file_path, "r", encoding="utf-8") as f:
+            language_name = file_name.removesuffix("_examples.csv")
+            reader = csv.reader(f)
+            data = [x for x in reader][1:]
+            examples[language_name] = {row[0]: row[1] for row in data}
+    return ExamplesCatalog(examples, signature)
+
+
+_catalog: Optional[ExamplesCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_examples_catalog() -> ExamplesCatalog:
+    """Get the examples catalog, reloading it if an examples file changed."""
+    global _catalog
+    examples_path = find_examples_path()
+    signature = _catalog_signature(examples_path)
+    catalog = _catalog
+    if catalog is not None and catalog.signature == signature:
+        return catalog
+    with _catalog_lock:
+        if _catalog is None or _catalog.signature != signature:
+            _catalog = load_examples_catalog(examples_path, signature)
+            print(f"Loaded examples catalog for {len(_catalog.examples)} languages")
+        return _catalog
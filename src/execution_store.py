@@ -0,0 +1,234 @@
+"""
+Execution Store
+Records of running and finished compile/run/verify executions. Results stay
+readable from /status until they expire, instead of disappearing after the
+first read, and abandoned results no longer accumulate.
+
+Finished results expire a fixed time after completion and are evicted
+oldest-first when their outputs exceed a memory budget. Large outputs are
+kept zlib-compressed and only decompressed when read. An execution still
+running running_grace seconds past its timeout is taken to have lost its
+runner and is finished as abandoned.
+
+With a shared state backend, records are also stored there so that any
+worker can answer /status and /cancel for an execution started by another.
+"""
+
+import base64
+import heapq
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from models import ActiveProcess
+from state_backend import StateBackend
+
+_NAMESPACE = "executions"
+
+
+class ExecutionStore:
+    """Thread-safe store of execution records with TTL and size bounds."""
+
+    def __init__(
+        self,
+        ttl: float = 600,
+        max_bytes: int = 64 * 1024 * 1024,
+        compress_threshold: int = 4096,
+        backend: Optional[StateBackend] = None,
+        running_grace: float = 300,
+    ):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.compress_threshold = compress_threshold
+        self.running_grace = running_grace
+        # Only a backend shared with other workers needs to be kept in sync
+        self.backend = backend if backend is not None and backend.shared else None
+        self._processes: Dict[str, ActiveProcess] = {}
+        # execution id -> (compressed, stored output)
+        self._outputs: Dict[str, Tuple[bool, bytes]] = {}
+        # finished execution ids in completion (and therefore expiry) order
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        # (deadline, execution id) of the running executions
+        self._deadlines: List[Tuple[float, str]] = []
+        self._stored_bytes = 0
+        self._lock = threading.Lock()
+
+    def add(self, execution_id: str, process: ActiveProcess) -> None:
+        """Register a started execution."""
+        with self._lock:
+            self._expire_locked(time.time())
+            self._processes[execution_id] = process
+            if not process.completed:
+                deadline = process.start_time + process.timeout + self.running_grace
+                heapq.heappush(self._deadlines, (deadline, execution_id))
+        self._persist(execution_id, process, None)
+
+    def get(self, execution_id: str) -> Optional[ActiveProcess]:
+        """
+        Get an execution record. Finished records are returned as a copy
+        with their output restored.
+        """
+        with self._lock:
+            self._expire_locked(time.time())
+            process = self._processes.get(execution_id)
+            stored = self._outputs.get(execution_id)
+        if process is None:
+            return self._load(execution_id)
+        if stored is None:
+            # It may have been completed (e.g. cancelled) by another worker
+            shared = self._load(execution_id)
+            return shared if shared is not None and shared.completed else process
+        return process.model_copy(update={"output": self._decode(stored)})
+
+    def complete(
+        self,
+        execution_id: str,
+        success: bool,
+        output: str,
+        exit_code: Optional[int],
+        message: str,
+        cancelled: bool = False,
+    ) -> bool:
+        """
+        Record the outcome of an execution. Returns False if the execution
+        is unknown (expired) or already finished (e.g. cancelled).
+        """
+        data = (output or "").encode("utf-8")
+        compressed = len(data) >= self.compress_threshold
+        if compressed:
+            data = zlib.compress(data, 6)
+        now = time.time()
+        with self._lock:
+            if execution_id in self._finished:
+                return False
+            process = self._processes.get(execution_id)
+            if process is None:
+                # Started by another worker
+                process = self._load(execution_id)
+                if process is None:
+                    return False
+                self._processes[execution_id] = process
+            # The first worker to complete an execution wins
+            if self.backend is not None and not self.backend.add(
+                "completed_executions", execution_id, "", self.ttl
+            ):
+                # The winner's record answers reads; this entry only expires
+                shared = self._load(execution_id)
+                if shared is not None and shared.completed:
+                    process = shared.model_copy(update={"output": None})
+                    self._processes[execution_id] = process
+                self._finish_locked(execution_id, process, now)
+                return False
+            process.cancelled = process.cancelled or cancelled
+            process.success = success
+            process.exit_code = exit_code
+            process.message = message
+            process.output = None
+            self._outputs[execution_id] = (compressed, data)
+            self._stored_bytes += len(data)
+            self._finish_locked(execution_id, process, now)
+        self._persist(execution_id, process, (compressed, data))
+        return True
+
+    def running_ids(self) -> List[str]:
+        """Ids of the executions of this process that have not finished."""
+        with self._lock:
+            return [
+                execution_id
+                for execution_id, process in self._processes.items()
+                if not process.completed
+            ]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "executions": len(self._processes),
+                "finished": len(self._finished),
+                "stored_bytes": self._stored_bytes,
+            }
+
+    @staticmethod
+    def _decode(stored: Tuple[bool, bytes]) -> str:
+        compressed, data = stored
+        return (zlib.decompress(data) if compressed else data).decode("utf-8")
+
+    def _persist(
+        self,
+        execution_id: str,
+        process: ActiveProcess,
+        stored: Optional[Tuple[bool, bytes]],
+    ) -> None:
+        if self.backend is None:
+            return
+        record = process.model_dump(exclude={"output"})
+        if stored is not None:
+            record["output"] = [stored[0], base64.b64encode(stored[1]).decode("ascii")]
+        self.backend.set(_NAMESPACE, execution_id, json.dumps(record), self.ttl)
+
+    def _load(self, execution_id: str) -> Optional[ActiveProcess]:
+        """An execution record stored by another worker."""
+        value = self.backend.get(_NAMESPACE, execution_id) if self.backend else None
+        if not value:
+            return None
+        record = json.loads(value)
+        stored = record.pop("output", None)
+        if stored is not None:
+            record["output"] = self._decode((stored[0], base64.b64decode(stored[1])))
+        return ActiveProcess(**record)
+
+    def _finish_locked(self, execution_id: str, process: ActiveProcess, now: float) -> None:
+        """Mark an execution finished and schedule its expiry."""
+        process.completed = True
+        process.end_time = process.end_time or now
+        self._finished[execution_id] = now + self.ttl
+        self._expire_locked(now)
+
+    def _expire_locked(self, now: float) -> None:
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, execution_id = heapq.heappop(self._deadlines)
+            process = self._processes.get(execution_id)
+            if process is not None and not process.completed:
+                process.completed = True
+                process.success = False
+                process.message = "Execution abandoned: its runner stopped"
+                process.end_time = now
+                self._finished[execution_id] = now + self.ttl
+        while self._finished:
+            execution_id, expires_at = next(iter(self._finished.items()))
+            if expires_at > now and self._stored_bytes <= self.max_bytes:
+                break
+            self._remove_locked(execution_id)
+
+    def _remove_locked(self, execution_id: str) -> None:
+        self._processes.pop(execution_id, None)
+        self._finished.pop(execution_id, None)
+        stored = self._outputs.pop(execution_id, None)
+        if stored is not None:
+            self._stored_bytes -= len(stored[1])
+
+    # Mapping interface used by the controllers
+
+    def __contains__(self, execution_id: object) -> bool:
+        return isinstance(execution_id, str) and self.get(execution_id) is not None
+
+    def __getitem__(self, execution_id: str) -> ActiveProcess:
+        process = self.get(execution_id)
+        if process is None:
+            raise KeyError(execution_id)
+        return process
+
+    def __setitem__(self, execution_id: str, process: ActiveProcess) -> None:
+        self.add(execution_id, process)
+
+    def __delitem__(self, execution_id: str) -> None:
+        with self._lock:
+            if execution_id not in self._processes:
+                raise KeyError(execution_id)
+            self._remove_locked(execution_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._processes)
@@ -61,7 +61,9 @@ class CExecutor(LanguageExecutor):
             return False, "No C source files found", None
 
         cmd = f"gcc {' '.join(c_files)} -o code.out"
-        exec_result = container_mgr.run_command_in_container(session_id, cmd, 30)
+        exec_result = container_mgr.run_command_in_container(
+            session_id, cmd, 30, compile_phase=True
+        )
         if exec_result is None:
             return False, "Failed to compile code in container", None
 
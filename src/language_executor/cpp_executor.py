@@ -60,7 +60,9 @@ class CppExecutor(LanguageExecutor):
             return False, "No C++ source files found", None
 
         cmd = f"g++ {' '.join(cpp_files)} -o code.out"
-        exec_result = container_mgr.run_command_in_container(session_id, cmd, 30)
+        exec_result = container_mgr.run_command_in_container(
+            session_id, cmd, 30, compile_phase=True
+        )
         if exec_result is None:
             return False, "Failed to compile code in container", None
 
@@ -1,11 +1,21 @@
 import os
-from typing import Optional, Tuple, Union, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Union, List
 
-import tree_sitter_eiffel as eiffel
 from jinja2 import Template
-from tree_sitter import Language, Parser, Query, QueryCursor
+from tree_sitter import Parser, Query, QueryCursor
 
+from config_manager import get_config_manager
 from container_manager import get_container_manager
+from eiffel_syntax import EIFFEL_LANGUAGE, analyze_class, reachable_classes
+from library_cache import LibraryClassCache, get_library_cache, is_valid_class_name
+from library_pool import get_library_pool
+from verification_cache import (
+    AutoProofReport,
+    VerificationPlan,
+    get_verification_cache,
+)
 
 from .base import LanguageExecutor, FileInfo
 
@@ -19,7 +29,7 @@ class EiffelExecutor(LanguageExecutor):
     @staticmethod
     def _get_class_name(code: str) -> str:
 
-        e_language = Language(eiffel.language())
+        e_language = EIFFEL_LANGUAGE
         parser = Parser(e_language)
         code_bytes = bytes(code, "utf8")
         tree = parser.parse(code_bytes)
@@ -32,7 +42,7 @@ class EiffelExecutor(LanguageExecutor):
 
     @staticmethod
     def _get_creation_procedure(code: str):
-        e_language = Language(eiffel.language())
+        e_language = EIFFEL_LANGUAGE
         parser = Parser(e_language)
         code_bytes = bytes(code, "utf8")
         tree = parser.parse(code_bytes)
@@ -49,7 +59,19 @@ class EiffelExecutor(LanguageExecutor):
         else:
             return captures["creation_procedure"][0].text.decode("utf8"), True
 
-    def _load_ecf_template(self) -> str:
+    def _c_compile_environment(self, session_id: str) -> Dict[str, str]:
+        """
+        Environment for the C compilation step of a freeze.
+        finish_freezing drives the generated W_code/F_code Makefiles through
+        make, so MAKEFLAGS controls how many C files are compiled in parallel.
+        """
+        jobs = self.container_mgr.get_cpu_count(session_id)
+        return {"MAKEFLAGS": f"-j{jobs}"}
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _load_ecf_template() -> Template:
+        """Read and compile the ECF template; done once per process."""
         # Try to load the ECF template from a file in the examples/eiffel directory
 
         template_path = os.path.join(
@@ -67,7 +89,22 @@ class EiffelExecutor(LanguageExecutor):
         if not os.path.exists(template_path):
             raise FileNotFoundError(f"ECF template not found at {template_path}")
         with open(template_path, "r", encoding="utf-8") as f:
-            return f.read()
+            return Template(f.read())
+
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def render_ecf(
+        class_name: Optional[str] = None, creation_procedure: Optional[str] = None
+    ) -> str:
+        """Render the ECF for a root class, or the all-classes ECF."""
+        template = EiffelExecutor._load_ecf_template()
+        if creation_procedure and class_name:
+            return template.render(
+                USE_SPECIFIC_ROOT=True,
+                ROOT_CLASS=class_name,
+                CREATION_PROCEDURE=creation_procedure,
+            )
+        return template.render(USE_SPECIFIC_ROOT=False)
 
     def _put_ecf_to_container(
         self,
@@ -76,24 +113,13 @@ class EiffelExecutor(LanguageExecutor):
         class_name: Optional[str] = None,
     ):
         # Check if container already exists, create only if needed
-        if session_id not in self.container_mgr.active_containers:
+        if not self.container_mgr.has_session_container(session_id):
             if not self.container_mgr.create_session_container(session_id, "eiffel"):
                 return False, "Failed to create compilation container", None
 
-        # Load and format the ECF template
-        template_content = self._load_ecf_template()
-
-        # Use Jinja2 for template rendering
-        template = Template(template_content)
-        if creation_procedure and class_name:
-            formatted_ecf = template.render(
-                USE_SPECIFIC_ROOT=True,
-                ROOT_CLASS=class_name,
-                CREATION_PROCEDURE=creation_procedure,
-            )
-        else:
-            formatted_ecf = template.render(USE_SPECIFIC_ROOT=False)
+        formatted_ecf = self.render_ecf(class_name, creation_procedure)
 
+        # An identical ECF from an earlier request is not sent again
         if not self.container_mgr.put_file_in_container(
             session_id, "Ace.ecf", formatted_ecf
         ):
@@ -103,7 +129,7 @@ class EiffelExecutor(LanguageExecutor):
 
     def _put_code_to_container(self, session_id: str, code: str):
         # Check if container already exists, create only if needed
-        if session_id not in self.container_mgr.active_containers:
+        if not self.container_mgr.has_session_container(session_id):
             if not self.container_mgr.create_session_container(session_id, "eiffel"):
                 return False, "Failed to create compilation container", None
 
@@ -118,6 +144,59 @@ class EiffelExecutor(LanguageExecutor):
 
         return True, "Code file successfully created", None
 
+    @staticmethod
+    def _get_main_code(
+        code: Union[str, List[FileInfo]],
+        files: List[FileInfo],
+        main_file: Optional[str] = None,
+    ) -> Optional[str]:
+        """Find the source of the main class, or the first .e file."""
+        if main_file:
+            for file_info in files:
+                if file_info.name == main_file:
+                    return file_info.content
+            return None
+        if files:
+            return files[0].content
+        return code if isinstance(code, str) else ""
+
+    @staticmethod
+    def _files_reachable_from(files: List[FileInfo], root_class: str) -> List[FileInfo]:
+        """
+        Keep only the Eiffel classes reachable from the root class; other
+        files are kept as they are. All files are kept if a class cannot be
+        analyzed, since its references are then unknown.
+        """
+        classes = {}
+        class_files = {}
+        for file_info in files:
+            if not file_info.name.lower().endswith(".e"):
+                continue
+            info = analyze_class(file_info.content)
+            if info is None:
+                return files
+            classes[info.name] = info
+            class_files[file_info.name] = info.name
+        reachable = reachable_classes(classes, root_class)
+        if root_class.upper() not in reachable:
+            return files
+        pruned = [
+            f for f in files if f.name not in class_files or class_files[f.name] in reachable
+        ]
+        if len(pruned) < len(files):
+            print(f"Uploading {len(pruned)} of {len(files)} files reachable from {root_class}")
+        return pruned
+
+    def _write_sources(
+        self, code: Union[str, List[FileInfo]], files: List[FileInfo], session_id: str
+    ) -> bool:
+        """Write the submitted sources to the session's container."""
+        if isinstance(code, list):
+            return self._write_files_to_container(files, session_id)
+        # Legacy single file
+        success, _, _ = self._put_code_to_container(session_id, code)
+        return success
+
     def compile(
         self,
         code: Union[str, List[FileInfo]],
@@ -129,22 +208,7 @@ class EiffelExecutor(LanguageExecutor):
 
         # Handle both legacy string and new multi-file formats
         files, normalized_main_file = self._normalize_input(code, main_file)
-
-        # For Eiffel, we need to find the main class or use the first .e file
-        main_code = None
-        if main_file:
-            # Find the main file
-            for file_info in files:
-                if file_info.name == main_file:
-                    main_code = file_info.content
-                    break
-        else:
-            # Use the first .e file or the legacy code
-            if files:
-                main_code = files[0].content
-            else:
-                main_code = code if isinstance(code, str) else ""
-
+        main_code = self._get_main_code(code, files, main_file)
         if not main_code:
             return False, "No Eiffel code found", None
 
@@ -155,6 +219,8 @@ class EiffelExecutor(LanguageExecutor):
             # Format ECF template with extracted information
             if has_creation and creation_procedure:
                 self._put_ecf_to_container(session_id, creation_procedure, class_name)
+                # Classes unreachable from the root are neither uploaded nor compiled
+                files = self._files_reachable_from(files, class_name)
             else:
                 # Use all_classes root if no specific creation procedure found
                 self._put_ecf_to_container(session_id)
@@ -164,16 +230,17 @@ class EiffelExecutor(LanguageExecutor):
             # Fallback to all_classes root
             self._put_ecf_to_container(session_id)
 
-        # Write all files to container
-        if isinstance(code, list):
-            if not self._write_files_to_container(files, session_id):
-                return False, "Failed to copy files to container", None
-        else:
-            # Legacy single file
-            self._put_code_to_container(session_id, code)
+        if not self._write_sources(code, files, session_id):
+            return False, "Failed to copy files to container", None
 
         cmd = "apb -c_compile -batch"
-        exec_result = self.container_mgr.run_command_in_container(session_id, cmd, 60)
+        exec_result = self.container_mgr.run_command_in_container(
+            session_id,
+            cmd,
+            60,
+            environment=self._c_compile_environment(session_id),
+            compile_phase=True,
+        )
         if exec_result is None:
             return False, "Failed to compile code in container", None
         stdout = exec_result.output[0].decode("utf-8") if exec_result.output[0] else ""
@@ -217,57 +284,84 @@ class EiffelExecutor(LanguageExecutor):
         session_id: str,
         timeout: int = 60,
         main_file: Optional[str] = None,
+        shards: Optional[int] = None,
+        prover_cores: Optional[int] = None,
+        vc_timeout: Optional[int] = None,
     ) -> Tuple[bool, str, int]:
-        self.compile(code, session_id, main_file)
+        print(f"Verifying Eiffel code for session {session_id}")
+
         # Handle both legacy string and new multi-file formats
         files, normalized_main_file = self._normalize_input(code, main_file)
+        if not self._get_main_code(code, files, main_file):
+            return False, "No Eiffel code found", -1
 
-        # For Eiffel, we need to find the main class or use the first .e file
-        main_code = None
-        if main_file:
-            # Find the main file
-            for file_info in files:
-                if file_info.name == main_file:
-                    main_code = file_info.content
-                    break
+        # Only routines whose verification inputs changed need the prover
+        cache = get_verification_cache()
+        if isinstance(code, list):
+            sources = [f.content for f in files if f.name.lower().endswith(".e")]
         else:
-            # Use the first .e file or the legacy code
-            if files:
-                main_code = files[0].content
-            else:
-                main_code = code if isinstance(code, str) else ""
-
-        if not main_code:
-            return False, "No Eiffel code found", -1
+            sources = [code]
+        prover_options = self._prover_options(session_id, prover_cores, vc_timeout)
+        plan = cache.plan(sources, prover_options)
+        if plan is not None and not plan.pending:
+            print(f"All routines of session {session_id} verified from cache")
+            return True, cache.render(plan, None), 0
+
+        shard_targets = []
+        if plan is not None and isinstance(code, list):
+            shard_targets = self._split_into_shards(
+                plan, self._verification_shard_limit(shards)
+            )
+        if len(shard_targets) > 1:
+            return self._verify_sharded(
+                files, session_id, timeout, plan, shard_targets, prover_options
+            )
 
-        # Extract class name and creation procedure from the code
-        try:
-            class_name = self._get_class_name(main_code)
-            creation_procedure, has_creation = self._get_creation_procedure(main_code)
+        targets = plan.autoproof_targets() if plan is not None and plan.cached else []
+        success, output, exit_code = self._run_autoproof(
+            code, files, session_id, targets, timeout, prover_options
+        )
+        if not success:
+            return False, output, exit_code
 
-            # Format ECF template with extracted information
-            if has_creation and creation_procedure and False:
-                self._put_ecf_to_container(session_id, creation_procedure, class_name)
-            else:
-                # Use all_classes root if no specific creation procedure found
-                self._put_ecf_to_container(session_id)
+        if plan is not None and exit_code == 0:
+            report = AutoProofReport.parse(output, plan.routines)
+            if report is not None:
+                cache.store(plan, report)
+                output = cache.render(plan, report)
+        return True, output, exit_code
 
-        except Exception as e:
-            print(f"Error parsing Eiffel code: {e}")
-            # Fallback to all_classes root
-            self._put_ecf_to_container(session_id)
+    def _run_autoproof(
+        self,
+        code: Union[str, List[FileInfo]],
+        files: List[FileInfo],
+        session_id: str,
+        targets: List[str],
+        timeout: int,
+        prover_options: str = "",
+    ) -> Tuple[bool, str, int]:
+        """
+        Upload the sources and run AutoProof on the given classes/routines
+        (all classes if none are given). Returns (success, output, exit_code),
+        where success only reports whether AutoProof could be run.
+        """
+        # AutoProof parses and type-checks the system itself, so no C build is
+        # needed first; verify every class rather than a specific root.
+        success, message, _ = self._put_ecf_to_container(session_id)
+        if not success:
+            return False, message, -1
 
-        # Write all files to container
-        if isinstance(code, list):
-            if not self._write_files_to_container(files, session_id):
-                return False, "Failed to copy files to container", -1
-        else:
-            # Legacy single file
-            self._put_code_to_container(session_id, code)
+        if not self._write_sources(code, files, session_id):
+            return False, "Failed to copy files to container", -1
 
         run_cmd = "apb -batch -autoproof -html"
+        if prover_options:
+            run_cmd += " " + prover_options
+        if targets:
+            run_cmd += " " + " ".join(targets)
+        # Verification compiles the classes and runs the provers on all cores
         run_result = self.container_mgr.run_command_in_container(
-            session_id, run_cmd, timeout
+            session_id, run_cmd, timeout, compile_phase=True
         )
         if run_result is None:
             return False, "Failed to execute binary in container", -1
@@ -275,8 +369,131 @@ class EiffelExecutor(LanguageExecutor):
         stderr = run_result.output[1].decode("utf-8") if run_result.output[1] else ""
         exit_code = run_result.exit_code
         output = stdout if exit_code == 0 else stderr
-        success = True  # exit_code == 0
-        return success, output, exit_code
+        return True, output, exit_code
+
+    def _prover_options(
+        self,
+        session_id: str,
+        prover_cores: Optional[int] = None,
+        vc_timeout: Optional[int] = None,
+    ) -> str:
+        """
+        AutoProof options for prover parallelism and the per verification
+        condition timeout. The number of cores defaults to (and is capped by)
+        the CPU allotment of the session's container.
+
+        The options are opt-in: the autoproof.prover_cores_option and
+        vc_timeout_option templates (e.g. "-boogie /vcsCores:{cores}" and
+        "-timeout {vc_timeout}") are empty by default and should only be
+        set for an apb known to accept them.
+        """
+        settings = get_config_manager().get_language_config("eiffel").get("autoproof", {})
+        available = self.container_mgr.get_cpu_count(session_id)
+        cores = prover_cores or settings.get("prover_cores") or available
+        cores = max(1, min(cores, available))
+        vc_timeout = vc_timeout or settings.get("vc_timeout")
+
+        options = []
+        if settings.get("prover_cores_option"):
+            options.append(settings["prover_cores_option"].format(cores=cores))
+        if vc_timeout and settings.get("vc_timeout_option"):
+            options.append(settings["vc_timeout_option"].format(vc_timeout=vc_timeout))
+        return " ".join(options)
+
+    @staticmethod
+    def _verification_shard_limit(requested: Optional[int] = None) -> int:
+        """Number of containers a single verification may use."""
+        settings = get_config_manager().get_language_config("eiffel").get("autoproof", {})
+        limit = settings.get("max_shards", 1)
+        if requested is not None:
+            limit = min(limit, requested)
+        return max(1, limit)
+
+    @staticmethod
+    def verification_helper_ids(session_id: str) -> List[str]:
+        """Session ids of the helper containers of a session's sharded verifications."""
+        shard_limit = EiffelExecutor._verification_shard_limit()
+        return [f"{session_id}-verify-{index}" for index in range(1, shard_limit)]
+
+    @staticmethod
+    def _split_into_shards(plan: VerificationPlan, shard_limit: int) -> List[List[str]]:
+        """
+        Distribute the pending AutoProof targets over at most shard_limit
+        shards, keeping each class in one shard and balancing routine counts.
+        """
+        by_class: Dict[str, List[str]] = {}
+        for target in plan.autoproof_targets():
+            by_class.setdefault(target.split(".", 1)[0], []).append(target)
+        if shard_limit <= 1 or len(by_class) <= 1:
+            return [sum(by_class.values(), [])] if by_class else []
+
+        weights = {name: 0 for name in by_class}
+        for class_name, _ in plan.pending:
+            if class_name in weights:
+                weights[class_name] += 1
+
+        shards: List[List[str]] = [[] for _ in range(min(shard_limit, len(by_class)))]
+        loads = [0] * len(shards)
+        for class_name in sorted(by_class, key=lambda name: -weights[name]):
+            lightest = loads.index(min(loads))
+            shards[lightest].extend(by_class[class_name])
+            loads[lightest] += max(1, weights[class_name])
+        return shards
+
+    def _verify_sharded(
+        self,
+        files: List[FileInfo],
+        session_id: str,
+        timeout: int,
+        plan: VerificationPlan,
+        shard_targets: List[List[str]],
+        prover_options: str = "",
+    ) -> Tuple[bool, str, int]:
+        """
+        Run AutoProof on each shard concurrently, the first shard in the
+        session's own container and the others in per-session helper
+        containers that are kept for later verifications (and released with
+        the session), then merge the per-routine results into a single report.
+        """
+        print(
+            f"Verifying session {session_id} in {len(shard_targets)} shards: "
+            f"{shard_targets}"
+        )
+
+        shard_session_ids = [session_id, *self.verification_helper_ids(session_id)]
+
+        def run_shard(index: int) -> Tuple[bool, str, int]:
+            shard_session_id = shard_session_ids[index]
+            shard_files = [FileInfo(f.name, f.content) for f in files]
+            return self._run_autoproof(
+                shard_files,
+                shard_files,
+                shard_session_id,
+                shard_targets[index],
+                timeout,
+                prover_options,
+            )
+
+        with ThreadPoolExecutor(max_workers=len(shard_targets)) as pool:
+            results = list(pool.map(run_shard, range(len(shard_targets))))
+
+        reports = []
+        for success, output, exit_code in results:
+            if not success:
+                return False, output, exit_code
+            report = AutoProofReport.parse(output, plan.routines) if exit_code == 0 else None
+            if report is None:
+                # Type errors are reported identically by every shard
+                return True, output, exit_code
+            reports.append(report)
+
+        rows = {}
+        for report in reports:
+            rows.update(report.rows)
+        merged = AutoProofReport(reports[0].prefix, rows, reports[0].suffix)
+        cache = get_verification_cache()
+        cache.store(plan, merged)
+        return True, cache.render(plan, merged), 0
 
     def get_library_class(
         self, class_name: str, session_id: str, timeout: int = 30
@@ -286,22 +503,49 @@ class EiffelExecutor(LanguageExecutor):
         Returns (success, source_code)
         """
         print(f"Fetching Eiffel library class {class_name} for session {session_id}")
+        if not is_valid_class_name(class_name):
+            return False, f"Invalid class name {class_name}."
+
+        # Library classes never change for a given image
+        cache = get_library_cache()
+        image_digest = self.container_mgr.get_image_digest("eiffel")
+        if image_digest:
+            hit, cached_source = cache.get(image_digest, class_name)
+            if hit:
+                if cached_source is None:
+                    return False, f"Class {class_name} not found."
+                return True, cached_source
+
+        # Browsing runs in the shared library pool, never in the user's workspace
+        try:
+            with get_library_pool().acquire() as (pool_session_id, fresh):
+                if fresh:
+                    self._put_ecf_to_container(pool_session_id)
+                return self._flat_library_class(
+                    class_name, pool_session_id, timeout, cache, image_digest
+                )
+        except TimeoutError:
+            return False, "The library browser is busy, please try again shortly."
 
-        # Ensure we have a container with Eiffel environment
-        if session_id not in self.container_mgr.active_containers:
-            if not self.container_mgr.create_session_container(session_id, "eiffel"):
-                return False, "Failed to create Eiffel container"
-        self._put_ecf_to_container(session_id)
+    def _flat_library_class(
+        self,
+        class_name: str,
+        pool_session_id: str,
+        timeout: int,
+        cache: LibraryClassCache,
+        image_digest: Optional[str],
+    ) -> Tuple[bool, str]:
+        """Run apb -flat for a class in a library pool container."""
         # Use apb -short to get the class source code
         temp_file = "temp.txt"
         # Remove temp.txt if it exists
         rm_cmd = f"rm -f {temp_file}"
-        self.container_mgr.run_command_in_container(session_id, rm_cmd, timeout)
+        self.container_mgr.run_command_in_container(pool_session_id, rm_cmd, timeout)
 
         # Run apb -flat to write class to temp.txt
         cmd = f"apb -flat {class_name} -batch -file {temp_file}"
         exec_result = self.container_mgr.run_command_in_container(
-            session_id, cmd, timeout
+            pool_session_id, cmd, timeout
         )
         if exec_result is None or exec_result.exit_code != 0:
             return (
@@ -310,9 +554,15 @@ class EiffelExecutor(LanguageExecutor):
             )
 
         # Read the content of temp.txt
-        read_result = self.container_mgr.read_file_from_container(session_id, temp_file)
+        read_result = self.container_mgr.read_file_from_container(
+            pool_session_id, temp_file
+        )
 
         if read_result is None or read_result == "":
+            if image_digest:
+                cache.put(image_digest, class_name, None)
             return False, f"Class {class_name} not found."
 
+        if image_digest:
+            cache.put(image_digest, class_name, read_result)
         return True, read_result
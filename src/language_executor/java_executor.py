@@ -54,7 +54,7 @@ class JavaExecutor(LanguageExecutor):
         # Compile all Java files (*.java)
         compile_cmd = "javac *.java"
         exec_result = container_mgr.run_command_in_container(
-            session_id, compile_cmd, 30
+            session_id, compile_cmd, 30, compile_phase=True
         )
 
         if exec_result is None:
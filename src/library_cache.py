@@ -0,0 +1,297 @@
+"""
+Eiffel Library Class Cache
+Caches the flattened source of Eiffel library classes. The library shipped
+with an image never changes, so entries are keyed by the image digest and
+the (mapped) class name and never expire.
+
+Lookups go through an in-memory LRU first and an on-disk store second.
+Classes the compiler reported as unknown are cached as well, but only for
+missing_ttl seconds, and the disk store keeps at most max_disk_entries
+classes. Only valid Eiffel class names are cached (or looked up at all).
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from config_manager import get_config_manager
+
+# Library classes students look up most often; prewarmed alongside the
+# classes recorded as most requested.
+DEFAULT_PREWARM_CLASSES = [
+    "ANY",
+    "STRING_8",
+    "INTEGER_32",
+    "BOOLEAN",
+    "CHARACTER_8",
+    "REAL_64",
+    "ARRAY",
+    "ARRAYED_LIST",
+    "LINKED_LIST",
+    "HASH_TABLE",
+]
+
+_NOT_FOUND_SUFFIX = ".missing"
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_]")
+_CLASS_NAME = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+
+
+def is_valid_class_name(class_name: str) -> bool:
+    """Whether a name is a valid Eiffel class name."""
+    return bool(_CLASS_NAME.match(class_name))
+
+
+class LibraryClassCache:
+    """Two-tier (memory LRU + disk) cache of library class sources."""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_entries: int = 256,
+        max_tracked: int = 1024,
+        max_disk_entries: int = 4096,
+        missing_ttl: float = 3600,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        # Request counts are kept for at most this many class names
+        self.max_tracked = max_tracked
+        self.max_disk_entries = max_disk_entries
+        # Seconds a "class not found" stays cached
+        self.missing_ttl = missing_ttl
+        # (image digest, class name) -> (source or None, time cached)
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[Optional[str], float]]" = (
+            OrderedDict()
+        )
+        self._disk_entries = self._count_disk_entries()
+        self._request_counts: Counter = Counter()
+        self._unsaved_requests = 0
+        self._lock = threading.Lock()
+        self._load_request_counts()
+
+    def get(self, image_digest: str, class_name: str) -> Tuple[bool, Optional[str]]:
+        """
+        Look up a class. Returns (hit, source) where source is None for a
+        cached "class not found".
+        """
+        if not is_valid_class_name(class_name):
+            return False, None
+        key = (image_digest, class_name.upper())
+        with self._lock:
+            if key in self._memory:
+                source, cached_at = self._memory[key]
+                if source is not None or not self._expired(cached_at):
+                    self._memory.move_to_end(key)
+                    return True, source
+                del self._memory[key]
+
+        hit, source, cached_at = self._read_disk(*key)
+        if hit:
+            self._remember(key, source, cached_at)
+        return hit, source
+
+    def put(self, image_digest: str, class_name: str, source: Optional[str]) -> None:
+        """Store a class source, or None if the class does not exist."""
+        if not is_valid_class_name(class_name):
+            return
+        key = (image_digest, class_name.upper())
+        self._remember(key, source, time.time())
+        try:
+            self._write_disk(*key, source)
+        except OSError as e:
+            print(f"Warning: could not persist library class {class_name}: {e}")
+
+    def record_request(self, class_name: str) -> None:
+        """Count a request for a class, used to pick classes to prewarm."""
+        with self._lock:
+            self._request_counts[class_name.upper()] += 1
+            self._trim_request_counts()
+            self._unsaved_requests += 1
+            should_save = self._unsaved_requests >= 20
+        if should_save:
+            self.save_request_counts()
+
+    def most_requested(self, limit: int) -> List[str]:
+        """Get the most requested class names."""
+        with self._lock:
+            return [name for name, _ in self._request_counts.most_common(limit)]
+
+    def save_request_counts(self) -> None:
+        with self._lock:
+            counts = dict(self._request_counts)
+            self._unsaved_requests = 0
+        try:
+            self._atomic_write(
+                self.cache_dir / "request_counts.json", json.dumps(counts, indent=2)
+            )
+        except OSError as e:
+            print(f"Warning: could not persist library request counts: {e}")
+
+    @staticmethod
+    def etag(source: str) -> str:
+        """Strong ETag for a class source."""
+        return '"' + hashlib.sha256(source.encode("utf-8")).hexdigest()[:32] + '"'
+
+    def _expired(self, cached_at: float) -> bool:
+        """Whether a "class not found" cached at a point in time has expired."""
+        return time.time() - cached_at > self.missing_ttl
+
+    def _remember(
+        self, key: Tuple[str, str], source: Optional[str], cached_at: float
+    ) -> None:
+        with self._lock:
+            self._memory[key] = (source, cached_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _entry_path(self, image_digest: str, class_name: str) -> Path:
+        # Class names are validated, so they are safe as file names
+        digest_dir = _SAFE_NAME.sub("_", image_digest)
+        return self.cache_dir / digest_dir / f"{class_name}.e"
+
+    def _read_disk(
+        self, image_digest: str, class_name: str
+    ) -> Tuple[bool, Optional[str], float]:
+        path = self._entry_path(image_digest, class_name)
+        missing_path = path.with_suffix(_NOT_FOUND_SUFFIX)
+        try:
+            if missing_path.exists():
+                cached_at = missing_path.stat().st_mtime
+                if not self._expired(cached_at):
+                    return True, None, cached_at
+                missing_path.unlink(missing_ok=True)
+                with self._lock:
+                    self._disk_entries -= 1
+            if path.exists():
+                return True, path.read_text(encoding="utf-8"), path.stat().st_mtime
+        except OSError as e:
+            print(f"Warning: could not read cached library class {class_name}: {e}")
+        return False, None, 0
+
+    def _write_disk(
+        self, image_digest: str, class_name: str, source: Optional[str]
+    ) -> None:
+        path = self._entry_path(image_digest, class_name)
+        if source is None:
+            path = path.with_suffix(_NOT_FOUND_SUFFIX)
+        new_entry = not path.exists()
+        self._atomic_write(path, source or "")
+        if new_entry:
+            with self._lock:
+                self._disk_entries += 1
+                should_trim = self._disk_entries > self.max_disk_entries
+            if should_trim:
+                self._trim_disk()
+
+    def _disk_paths(self) -> List[Path]:
+        return [
+            path
+            for pattern in ("*/*.e", f"*/*{_NOT_FOUND_SUFFIX}")
+            for path in self.cache_dir.glob(pattern)
+        ]
+
+    def _count_disk_entries(self) -> int:
+        try:
+            return len(self._disk_paths())
+        except OSError:
+            return 0
+
+    def _trim_disk(self) -> None:
+        """
+        Keep the most recently written half once max_disk_entries classes are
+        stored on disk; "class not found" entries go first.
+        """
+        entries = []
+        for path in self._disk_paths():
+            try:
+                entries.append((path.suffix == ".e", path.stat().st_mtime, path))
+            except OSError:
+                pass
+        entries.sort()
+        excess = len(entries) - self.max_disk_entries // 2
+        removed = 0
+        for _, _, path in entries[: max(excess, 0)]:
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_entries = len(entries) - removed
+
+    @staticmethod
+    def _atomic_write(path: Path, content: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(content, encoding="utf-8")
+        os.replace(temp_path, path)
+
+    def _trim_request_counts(self) -> None:
+        """
+        Keep the most requested half once max_tracked names are counted, so
+        that newly requested classes still get room to accumulate counts.
+        """
+        if len(self._request_counts) > self.max_tracked:
+            self._request_counts = Counter(
+                dict(self._request_counts.most_common(self.max_tracked // 2))
+            )
+
+    def _load_request_counts(self) -> None:
+        path = self.cache_dir / "request_counts.json"
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._request_counts.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not load library request counts: {e}")
+        self._trim_request_counts()
+
+
+def prewarm_library_cache(limit: int = 20) -> int:
+    """
+    Fetch the most requested library classes (and a default set) so that
+    later requests are served from the cache. Returns the number of classes
+    that were fetched.
+    """
+    # Imported here to avoid a circular import with the executor package
+    from eiffel_mapping_manager import get_mapping_manager
+    from language_executor.factory import get_executor_by_name
+
+    cache = get_library_cache()
+    mapping_manager = get_mapping_manager()
+    class_names = []
+    for name in cache.most_requested(limit) + DEFAULT_PREWARM_CLASSES:
+        mapped_name = mapping_manager.apply_mapping(name).upper()
+        if mapped_name not in class_names:
+            class_names.append(mapped_name)
+
+    executor = get_executor_by_name("eiffel", "")
+    fetched = 0
+    for class_name in class_names[:limit]:
+        success, _ = executor.get_library_class(class_name, "library-prewarm")
+        if success:
+            fetched += 1
+    print(f"Prewarmed {fetched} Eiffel library classes")
+    return fetched
+
+
+# Global instance for easy access
+_library_cache: Optional[LibraryClassCache] = None
+
+
+def get_library_cache() -> LibraryClassCache:
+    """Get the global library class cache instance."""
+    global _library_cache
+    if _library_cache is None:
+        settings = get_config_manager().languages_config.get("compiler_settings", {})
+        temp_dir = settings.get("temp_dir", "/tmp/code_execution")
+        _library_cache = LibraryClassCache(Path(temp_dir) / "library_cache")
+    return _library_cache
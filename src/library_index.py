@@ -0,0 +1,238 @@
+"""
+Eiffel Library Index
+A searchable in-memory index of the Eiffel library classes shipped with the
+Eiffel image, their features and feature signatures.
+
+The index is extracted once from the library sources of a library browser
+container and persisted per image, so later startups only load a JSON file.
+Legacy class names from the Eiffel mappings are indexed as aliases.
+"""
+
+import bisect
+import difflib
+import io
+import json
+import os
+import re
+import tarfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config_manager import get_config_manager
+from container_manager import get_container_manager
+from eiffel_mapping_manager import get_mapping_manager
+from eiffel_syntax import analyze_class
+from library_pool import get_library_pool
+
+
+class LibraryIndex:
+    """Immutable index of library classes and features."""
+
+    def __init__(
+        self,
+        classes: Dict[str, List[Tuple[str, str]]],
+        aliases: Optional[Dict[str, str]] = None,
+    ):
+        # class name -> [(feature name, signature)]
+        self.classes = classes
+        # legacy class name -> class name
+        self.aliases = {
+            old: new for old, new in (aliases or {}).items() if new in classes
+        }
+        self._class_names = sorted(set(classes) | set(self.aliases))
+        self._features = sorted(
+            (feature, class_name)
+            for class_name, features in classes.items()
+            for feature, _ in features
+        )
+        self._signatures = {
+            (class_name, feature): signature
+            for class_name, features in classes.items()
+            for feature, signature in features
+        }
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Class names starting with the given prefix."""
+        prefix = prefix.upper()
+        start = bisect.bisect_left(self._class_names, prefix)
+        matches = []
+        for name in self._class_names[start:]:
+            if not name.startswith(prefix) or len(matches) >= limit:
+                break
+            matches.append(name)
+        return matches
+
+    def search_classes(self, query: str, limit: int = 20) -> List[Tuple[str, Optional[str]]]:
+        """
+        Find classes by exact name, prefix, substring and finally fuzzy
+        match. Returns (name, alias_of) pairs, alias_of being the class a
+        legacy name maps to.
+        """
+        query = query.upper()
+        if not query:
+            return []
+        ranked = []
+        if query in self.classes or query in self.aliases:
+            ranked.append(query)
+        ranked.extend(self.complete(query, limit))
+        ranked.extend(name for name in self._class_names if query in name)
+        if len(ranked) < limit:
+            ranked.extend(
+                difflib.get_close_matches(query, self._class_names, n=limit, cutoff=0.6)
+            )
+
+        results = []
+        seen = set()
+        for name in ranked:
+            if name in seen:
+                continue
+            seen.add(name)
+            results.append((name, self.aliases.get(name)))
+            if len(results) >= limit:
+                break
+        return results
+
+    def search_features(self, query: str, limit: int = 20) -> List[Tuple[str, str, str]]:
+        """
+        Find features by name prefix, optionally qualified by a class name
+        ("LIST.ext"). Returns (class name, feature name, signature) triples.
+        """
+        class_name = None
+        if "." in query:
+            class_name, query = query.split(".", 1)
+            class_name = class_name.upper()
+            class_name = self.aliases.get(class_name, class_name)
+        query = query.lower()
+
+        if class_name is not None:
+            features = self.classes.get(class_name, [])
+            return [
+                (class_name, feature, signature)
+                for feature, signature in features
+                if feature.startswith(query)
+            ][:limit]
+
+        if not query:
+            return []
+        start = bisect.bisect_left(self._features, (query, ""))
+        results = []
+        for feature, owner in self._features[start:]:
+            if not feature.startswith(query) or len(results) >= limit:
+                break
+            results.append((owner, feature, self._signatures[(owner, feature)]))
+        return results
+
+    def to_json(self) -> str:
+        return json.dumps({"classes": self.classes})
+
+    @classmethod
+    def from_json(cls, data: str, aliases: Optional[Dict[str, str]] = None) -> "LibraryIndex":
+        classes = json.loads(data)["classes"]
+        return cls(
+            {name: [tuple(f) for f in features] for name, features in classes.items()},
+            aliases,
+        )
+
+
+def index_library_sources(sources: Dict[str, str]) -> Dict[str, List[Tuple[str, str]]]:
+    """Extract class names and feature signatures from library sources."""
+    classes = {}
+    for path, code in sources.items():
+        try:
+            info = analyze_class(code)
+        except Exception as e:
+            print(f"Warning: could not index library file {path}: {e}")
+            continue
+        if info is None:
+            continue
+        features = []
+        for feature in info.features:
+            for name in feature.names:
+                features.append((name, feature.signature))
+        classes[info.name] = features
+    return classes
+
+
+def _read_library_sources(archive: bytes) -> Dict[str, str]:
+    sources = {}
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        for member in tar:
+            if not member.isfile() or not member.name.lower().endswith(".e"):
+                continue
+            data = tar.extractfile(member)
+            if data is not None:
+                sources[member.name] = data.read().decode("utf-8", errors="replace")
+    return sources
+
+
+class LibraryIndexManager:
+    """Loads, builds and persists the library index for the Eiffel image."""
+
+    def __init__(self, index_dir: Path, library_path: str):
+        self.index_dir = Path(index_dir)
+        self.library_path = library_path
+        self.index: Optional[LibraryIndex] = None
+        self._lock = threading.Lock()
+
+    def load_or_build(self) -> Optional[LibraryIndex]:
+        """Load the persisted index for the current image, or build it."""
+        with self._lock:
+            container_mgr = get_container_manager()
+            image_digest = container_mgr.get_image_digest("eiffel")
+            if not image_digest:
+                return None
+            aliases = get_mapping_manager().get_all_mappings()
+            index_name = re.sub(r"[^A-Za-z0-9_]", "_", image_digest)
+            index_path = self.index_dir / f"{index_name}.json"
+
+            if index_path.exists():
+                self.index = LibraryIndex.from_json(
+                    index_path.read_text(encoding="utf-8"), aliases
+                )
+                print(f"Loaded Eiffel library index with {len(self.index.classes)} classes")
+                return self.index
+
+            with get_library_pool().acquire() as (pool_session_id, _):
+                archive = container_mgr.get_archive_from_container(
+                    pool_session_id, self.library_path
+                )
+            if archive is None:
+                return None
+            self.index = LibraryIndex(
+                index_library_sources(_read_library_sources(archive)), aliases
+            )
+
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = index_path.with_name(f".{index_path.name}.{os.getpid()}.tmp")
+            temp_path.write_text(self.index.to_json(), encoding="utf-8")
+            os.replace(temp_path, index_path)
+            print(f"Built Eiffel library index with {len(self.index.classes)} classes")
+            return self.index
+
+    def reload_aliases(self) -> None:
+        """Re-apply the Eiffel class name mappings to the loaded index."""
+        if self.index is not None:
+            self.index = LibraryIndex(
+                self.index.classes, get_mapping_manager().get_all_mappings()
+            )
+
+
+# Global instance for easy access
+_index_manager: Optional[LibraryIndexManager] = None
+
+
+def get_library_index_manager() -> LibraryIndexManager:
+    """Get the global library index manager instance."""
+    global _index_manager
+    if _index_manager is None:
+        config = get_config_manager()
+        temp_dir = config.languages_config.get("compiler_settings", {}).get(
+            "temp_dir", "/tmp/code_execution"
+        )
+        settings = config.get_language_config("eiffel").get("library_index", {})
+        _index_manager = LibraryIndexManager(
+            Path(temp_dir) / "library_index",
+            settings.get("library_path", "/library/base"),
+        )
+    return _index_manager
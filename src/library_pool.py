@@ -0,0 +1,116 @@
+"""
+Eiffel Library Browser Pool
+A small pool of Eiffel containers dedicated to library browsing (apb -flat).
+Browsing never touches a user's workspace, and the pool size bounds how much
+of the host library lookups can use at once.
+
+Pool containers are leased through the state backend, so the workers of a
+host share one pool: a container runs one lookup at a time, whichever
+worker created it. A lease expires after lease_seconds in case its worker
+died while holding it. Waiters are woken by releases in their own worker
+and check for releases of the other workers every second.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from config_manager import get_config_manager
+from container_manager import get_container_manager
+from state_backend import StateBackend, get_state_backend
+
+logger = logging.getLogger(__name__)
+
+_NAMESPACE = "library_pool_leases"
+
+# Longest wait between lease attempts when other workers may release one
+_SHARED_POLL_SECONDS = 1.0
+
+
+class LibraryBrowserPool:
+    """Hands out warm, pinned Eiffel containers for library queries."""
+
+    def __init__(
+        self,
+        size: int = 2,
+        acquire_timeout: float = 30,
+        cpu_quota: int = 50000,
+        lease_seconds: float = 300,
+        backend: Optional[StateBackend] = None,
+    ):
+        self.size = max(1, size)
+        self.acquire_timeout = acquire_timeout
+        self.cpu_quota = cpu_quota
+        self.lease_seconds = lease_seconds
+        self.backend = backend or get_state_backend()
+        # Notified whenever this worker releases a lease
+        self._released = threading.Condition()
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[Tuple[str, bool]]:
+        """
+        Borrow a pool container. Yields (container_session_id, fresh) where
+        fresh tells the caller the container still needs its project set up.
+        Raises TimeoutError if every container stays busy for the timeout.
+        """
+        pool_session_id = self._take(self.acquire_timeout if timeout is None else timeout)
+        fresh = False
+        try:
+            container_mgr = get_container_manager()
+            if not container_mgr.has_session_container(pool_session_id):
+                logger.info("Adding library browser container %s", pool_session_id)
+                if not container_mgr.create_session_container(
+                    pool_session_id,
+                    "eiffel",
+                    pinned=True,
+                    resources={"cpu_quota": self.cpu_quota},
+                ):
+                    raise RuntimeError("Failed to create library browser container")
+                fresh = True
+            yield pool_session_id, fresh
+        finally:
+            with self._released:
+                self.backend.delete(_NAMESPACE, pool_session_id)
+                self._released.notify()
+
+    def _take(self, timeout: float) -> str:
+        """Lease the first free pool container, waiting up to timeout for one."""
+        deadline = time.time() + timeout
+        lease = json.dumps({"pid": os.getpid(), "acquired_at": time.time()})
+        with self._released:
+            while True:
+                for index in range(self.size):
+                    pool_session_id = f"library-pool-{index}"
+                    if self.backend.add(
+                        _NAMESPACE, pool_session_id, lease, ttl=self.lease_seconds
+                    ):
+                        return pool_session_id
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError("All library browser containers are busy")
+                if self.backend.shared:
+                    remaining = min(remaining, _SHARED_POLL_SECONDS)
+                self._released.wait(remaining)
+
+
+# Global instance for easy access
+_library_pool: Optional[LibraryBrowserPool] = None
+
+
+def get_library_pool() -> LibraryBrowserPool:
+    """Get the global library browser pool instance."""
+    global _library_pool
+    if _library_pool is None:
+        eiffel_config = get_config_manager().get_language_config("eiffel")
+        settings = eiffel_config.get("library_pool", {})
+        _library_pool = LibraryBrowserPool(
+            size=settings.get("size", 2),
+            acquire_timeout=settings.get("acquire_timeout", 30),
+            cpu_quota=settings.get("cpu_quota", 50000),
+            lease_seconds=settings.get("lease_seconds", 300),
+        )
+    return _library_pool
@@ -2,8 +2,7 @@ import json
 import os
 import time
 import threading
-import uuid
-from typing import Dict, Optional
+from typing import Optional
 
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
@@ -11,7 +10,7 @@ from fastapi.templating import Jinja2Templates
 
 # Home and favicon endpoints remain in main.py
 from fastapi import Cookie, HTTPException, Request
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -23,17 +22,20 @@ from controllers.code_controller import router as code_router
 from controllers.code_controller import set_globals as set_code_globals
 from controllers.session_controller import router as session_router
 from controllers.session_controller import set_globals as set_session_globals
-from models import ActiveProcess, UserSession
 from container_manager import get_container_manager
+from drain import get_drain_mode
+from eiffel_parse_service import get_parse_service
+from example_warmup import get_example_warmup
+from language_executor.eiffel_executor import EiffelExecutor
+from library_cache import prewarm_library_cache
+from execution_store import ExecutionStore
+from library_index import get_library_index_manager
+from session_store import SessionStore
+from state_backend import get_state_backend
+from workspace_snapshots import get_workspace_snapshots
 from starlette.middleware.sessions import SessionMiddleware
 
 
-# Global variables for process management
-active_processes: Dict[str, ActiveProcess] = {}
-user_sessions: Dict[str, UserSession] = {}
-PROCESS_COUNTER = 0
-
-
 # Load configuration
 def load_config() -> dict:
     config_dir = os.path.join(os.path.dirname(__file__), "config")
@@ -69,6 +71,42 @@ def load_config() -> dict:
 
 CONFIG = load_config()
 
+
+def release_session(session_id: str):
+    """Release the resources of an expired session."""
+    get_parse_service().close(session_id)
+    container_mgr = get_container_manager()
+    # The session's container and the helpers of its sharded verifications
+    for container_session_id in [
+        session_id,
+        *EiffelExecutor.verification_helper_ids(session_id),
+    ]:
+        get_workspace_snapshots().discard(container_session_id)
+        if container_mgr.has_session_container(container_session_id):
+            threading.Thread(
+                target=container_mgr.cleanup_session_container,
+                args=(container_session_id,),
+                daemon=True,
+            ).start()
+
+
+result_settings = CONFIG.get("execution_results", {})
+active_processes = ExecutionStore(
+    ttl=result_settings.get("ttl_seconds", 600),
+    max_bytes=result_settings.get("max_bytes", 64 * 1024 * 1024),
+    compress_threshold=result_settings.get("compress_threshold", 4096),
+    backend=get_state_backend(),
+    running_grace=result_settings.get("running_grace_seconds", 300),
+)
+
+session_settings = CONFIG.get("session_settings", {})
+user_sessions = SessionStore(
+    ttl=session_settings.get("ttl_seconds", 7200),
+    max_sessions=session_settings.get("max_sessions", 10000),
+    on_evict=release_session,
+    backend=get_state_backend(),
+)
+
 app = FastAPI(
     title="CodeForge",
     description="""
@@ -132,11 +170,33 @@ templates_dir = os.path.join(os.path.dirname(__file__), "templates")
 templates = Jinja2Templates(directory=templates_dir)
 
 # Pass global state to controllers
-set_code_globals(active_processes, user_sessions, CONFIG, PROCESS_COUNTER)
+set_code_globals(active_processes, user_sessions, CONFIG)
 set_admin_globals(user_sessions, CONFIG)
 set_session_globals(user_sessions)
 
 
+@app.middleware("http")
+async def refuse_jobs_while_draining(request: Request, call_next):
+    drain_mode = get_drain_mode()
+    if drain_mode.refuses(request.method, request.url.path):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "The server is restarting, please try again shortly"},
+            headers={"Retry-After": str(drain_mode.retry_after_seconds)},
+        )
+    return await call_next(request)
+
+
+@app.on_event("shutdown")
+async def drain_on_shutdown():
+    # Let in-flight jobs finish; containers are kept for the next process
+    drain_mode = get_drain_mode()
+    drain_mode.start(shared=False)
+    interrupted = await drain_mode.wait(active_processes)
+    if interrupted:
+        print(f"[Drain] Interrupted {interrupted} jobs after the grace period")
+
+
 # Include routers
 app.include_router(code_router)
 app.include_router(admin_router)
@@ -145,24 +205,17 @@ app.include_router(session_router)
 
 @app.get("/", response_class=HTMLResponse)
 async def get_home(request: Request, session_id: Optional[str] = Cookie(None)):
+    # Sessions are created on first use by the API, not for page views
     session_id = str(session_id) if session_id else None
-    if session_id not in user_sessions:
-        new_session_id = str(uuid.uuid4())
-        user_sessions[new_session_id] = UserSession(
-            created_at=time.time(),
-            last_used=time.time(),
-        )
-        session_id = new_session_id
-    else:
-        user_sessions[session_id].last_used = time.time()
     languages = CONFIG["supported_languages"]
     response = templates.TemplateResponse(
         "index.html",
         {"request": request, "languages": languages},
     )
-    response.set_cookie(
-        key="session_id", value=session_id, httponly=True, max_age=86400
-    )
+    if user_sessions.touch(session_id):
+        response.set_cookie(
+            key="session_id", value=session_id, httponly=True, max_age=86400
+        )
     return response
 
 
@@ -187,94 +240,82 @@ async def health_check():
         except Exception:
             docker_status = "unavailable"
 
-        return {
+        health = {
             "status": "healthy",
             "timestamp": time.time(),
             "docker": docker_status,
             "active_sessions": len(user_sessions),
             "active_processes": len(active_processes),
+            "container_budget": container_mgr.budget_status(),
             "supported_languages": list(CONFIG["supported_languages"].keys()),
         }
+        if get_drain_mode().draining:
+            # Take the instance out of load balancer rotation
+            health["status"] = "draining"
+            return JSONResponse(status_code=503, content=health)
+        return health
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Service unhealthy: {str(e)}")
 
 
 def background_cleanup():
     container_mgr = get_container_manager()
+    # Sessions whose containers were adopted after a restart stay usable
+    for session_id, created_at in container_mgr.adopted_sessions.items():
+        user_sessions.restore(session_id, created_at)
     while True:
         try:
-            container_mgr.cleanup_old_containers(max_age_hours=1)
+            user_sessions.expire()
+            # Pause idle containers and remove those idle for long
+            container_mgr.reap_idle_containers()
+            get_workspace_snapshots().enforce_limits()
+            get_state_backend().purge_expired()
         except Exception as e:
             print(f"[Cleanup] Error: {e}")
-        time.sleep(600)  # Run every 10 minutes
+        time.sleep(container_mgr.idle_check_interval)
 
 
 # Start background cleanup thread
 cleanup_thread = threading.Thread(target=background_cleanup, daemon=True)
 cleanup_thread.start()
 
+
+def background_library_prewarm():
+    try:
+        EiffelExecutor.render_ecf()
+    except Exception as e:
+        print(f"[ECF template] Error: {e}")
+    try:
+        get_library_index_manager().load_or_build()
+    except Exception as e:
+        print(f"[Library index] Error: {e}")
+    if os.environ.get("LIBRARY_PREWARM", "1") == "0":
+        return
+    try:
+        prewarm_library_cache()
+    except Exception as e:
+        print(f"[Library prewarm] Error: {e}")
+
+
+# Compile the ECF template, load the Eiffel library index and fill the
+# library class cache
+# (set LIBRARY_PREWARM=0 to skip prewarming the class cache)
+prewarm_thread = threading.Thread(target=background_library_prewarm, daemon=True)
+prewarm_thread.start()
+
+# Compile and run the built-in examples so that their first run is served
+# from the result cache (opt-in, as this compiles every example)
+if os.environ.get("EXAMPLE_WARMUP", "0") == "1":
+    get_example_warmup().start()
+
 # If you use SessionMiddleware, add it here:
 app.add_middleware(
     SessionMiddleware, secret_key=os.environ.get("SESSION_SECRET_KEY", "dev-secret")
 )
 
 
-def log_config(uvicorn_log_config):
-    datefmt = "%Y-%m-%d %H:%M:%S"
-    formatters = uvicorn_log_config["formatters"]
-    formatters["default"]["fmt"] = "%(levelprefix)s [%(asctime)s] %(message)s asdf"
-    formatters["default"]["datefmt"] = datefmt
-    formatters["access"][
-        "fmt"
-    ] = '%(levelprefix)s [%(asctime)s] %(client_addr)s - "%(request_line)s" %(status_code)s'
-    formatters["access"]["datefmt"] = datefmt
-    return uvicorn_log_config
-
-
 if __name__ == "__main__":
-    import uvicorn
-    from uvicorn.config import LOGGING_CONFIG
-
-    # Check for Let's Encrypt certificates first, then fallback to custom certs
-    domain = os.environ.get("DOMAIN", "localhost")
-    letsencrypt_cert_path = f"/etc/letsencrypt/live/{domain}/fullchain.pem"
-    letsencrypt_key_path = f"/etc/letsencrypt/live/{domain}/privkey.pem"
-
-    # Fallback to local SSL directory
-    local_cert_path = os.path.join(os.path.dirname(__file__), "ssl", "server.crt")
-    local_key_path = os.path.join(os.path.dirname(__file__), "ssl", "server.key")
-
-    # Check for Let's Encrypt certificates first
-    if os.path.exists(letsencrypt_cert_path) and os.path.exists(letsencrypt_key_path):
-        print(f"🔐 Starting server with Let's Encrypt HTTPS for domain: {domain}")
-        uvicorn.run(
-            "main:app",
-            host="0.0.0.0",
-            port=443,  # Standard HTTPS port
-            ssl_certfile=letsencrypt_cert_path,
-            ssl_keyfile=letsencrypt_key_path,
-            reload=False,
-        )
-    elif os.path.exists(local_cert_path) and os.path.exists(local_key_path):
-        print("🔐 Starting server with local SSL certificates...")
-        uvicorn.run(
-            "main:app",
-            host="0.0.0.0",
-            port=8443,  # Custom HTTPS port for local certs
-            ssl_certfile=local_cert_path,
-            ssl_keyfile=local_key_path,
-            reload=False,
-        )
-    else:
-        print("⚠️  No SSL certificates found. Starting with HTTP...")
-        print(f"   Let's Encrypt: {letsencrypt_cert_path}")
-        print(f"   Local certs:   {local_cert_path}")
-        print("   To setup Let's Encrypt, run: ./scripts/setup_letsencrypt.sh")
-        print("   To generate local certs, run: ./scripts/generate_ssl_certs.sh")
-        uvicorn.run(
-            "main:app",
-            host="0.0.0.0",
-            port=8000,
-            reload=True,
-            log_config=log_config(LOGGING_CONFIG),
-        )
+    # Development and production launch modes live in server.py
+    from server import run
+
+    run()
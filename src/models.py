@@ -21,6 +21,19 @@ class MultiFileRequest(BaseModel):
     timeout: Optional[int] = Field(30, description="Execution timeout in seconds")
     file_path: Optional[str] = Field(None, description="Pre-compiled file path")
     output_path: Optional[str] = Field(None, description="Pre-compiled output path")
+    shards: Optional[int] = Field(
+        None, description="Maximum number of containers to verify in parallel"
+    )
+    prover_cores: Optional[int] = Field(
+        None,
+        description="Verification conditions checked in parallel per prover "
+        "(only if the server configures autoproof.prover_cores_option)",
+    )
+    vc_timeout: Optional[int] = Field(
+        None,
+        description="Prover timeout per verification condition in seconds "
+        "(only if the server configures autoproof.vc_timeout_option)",
+    )
 
 
 class CompileResponse(BaseModel):
@@ -87,6 +100,7 @@ class ActiveProcess(BaseModel):
     output: Optional[str] = None
     exit_code: Optional[int] = None
     message: Optional[str] = None
+    end_time: Optional[float] = None
 
 
 class CompilerConfig(BaseModel):
@@ -116,11 +130,19 @@ class SingleExample(BaseModel):
     filename: str
 
 
+class SyntaxErrorInfo(BaseModel):
+    file: Optional[str] = None
+    line: int
+    column: int
+    message: str
+
+
 class CompileResult(BaseModel):
     success: bool
     message: str
     output: str
     output_path: Optional[str] = None
+    syntax_errors: Optional[List[SyntaxErrorInfo]] = None
 
 
 class Message(BaseModel):
@@ -134,6 +156,7 @@ class ExecutionResult(BaseModel):
     execution_id: str
     session_id: str
     started: bool
+    syntax_errors: Optional[List[SyntaxErrorInfo]] = None
 
 
 class ProcessStatusResponse(BaseModel):
@@ -175,6 +198,69 @@ class LibraryInformation(BaseModel):
     message: str
 
 
+class LibraryClassMatch(BaseModel):
+    name: str
+    alias_of: Optional[str] = None
+
+
+class LibraryFeatureMatch(BaseModel):
+    class_name: str
+    name: str
+    signature: str
+
+
+class LibrarySearchResult(BaseModel):
+    success: bool
+    query: str
+    classes: List[LibraryClassMatch]
+    features: List[LibraryFeatureMatch]
+    message: str
+
+
+class LibraryAutocompleteResult(BaseModel):
+    success: bool
+    prefix: str
+    suggestions: List[str]
+
+
+class TextPosition(BaseModel):
+    line: int = Field(..., ge=0, description="0-based line")
+    column: int = Field(..., ge=0, description="0-based character column")
+
+
+class TextEdit(BaseModel):
+    start: TextPosition
+    end: TextPosition
+    text: str
+
+
+class ParseRequest(BaseModel):
+    filename: str
+    content: str
+
+
+class ParseEditRequest(BaseModel):
+    filename: str
+    edits: List[TextEdit]
+
+
+class OutlineFeature(BaseModel):
+    names: List[str]
+    signature: str
+    start_line: int
+    end_line: int
+
+
+class ParseResult(BaseModel):
+    success: bool
+    filename: str
+    class_name: Optional[str] = None
+    creation_procedures: List[str]
+    features: List[OutlineFeature]
+    errors: List[SyntaxErrorInfo]
+    analysis_time_ms: float
+
+
 class EiffelLibraryNameMappingBase(BaseModel):
     success: bool
     count: int
@@ -0,0 +1,183 @@
+"""
+Server Launcher
+Starts uvicorn in development or production mode.
+
+Development mode (the default) runs a single process, with auto-reload when
+serving plain HTTP. Production mode runs several worker processes with
+uvloop and httptools (when installed) and tuned connection settings.
+
+The mode and its settings come from "server_settings" in languages.json and
+can be overridden with environment variables:
+    SERVER_MODE            development | production
+    WEB_CONCURRENCY        number of workers (default: one per CPU core)
+    SERVER_BACKLOG         listen backlog
+    SERVER_KEEP_ALIVE      keep-alive timeout in seconds
+    SERVER_LIMIT_CONCURRENCY  connections/tasks before answering 503
+
+Run it from the src directory (python server.py) so that the launcher does
+not itself load the application: the containers left over from a previous
+run are then removed once here, instead of by every worker.
+"""
+
+import importlib.util
+import os
+from typing import Any, Dict, Optional
+
+from config_manager import get_config_manager
+
+_DEFAULT_SETTINGS = {
+    "mode": "development",
+    "workers": None,
+    "backlog": 2048,
+    "timeout_keep_alive": 5,
+    "limit_concurrency": None,
+}
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def get_server_settings() -> Dict[str, Any]:
+    """The effective server settings (configuration overridden by environment)."""
+    settings = {
+        **_DEFAULT_SETTINGS,
+        **get_config_manager().languages_config.get("server_settings", {}),
+    }
+    settings["mode"] = os.environ.get("SERVER_MODE", settings["mode"])
+    settings["workers"] = (
+        _env_int("WEB_CONCURRENCY", settings["workers"]) or os.cpu_count() or 1
+    )
+    settings["backlog"] = _env_int("SERVER_BACKLOG", settings["backlog"])
+    settings["timeout_keep_alive"] = _env_int(
+        "SERVER_KEEP_ALIVE", settings["timeout_keep_alive"]
+    )
+    settings["limit_concurrency"] = _env_int(
+        "SERVER_LIMIT_CONCURRENCY", settings["limit_concurrency"]
+    )
+    return settings
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def production_options(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """uvicorn options of the production mode."""
+    return {
+        "workers": settings["workers"],
+        "loop": "uvloop" if _installed("uvloop") else "asyncio",
+        "http": "httptools" if _installed("httptools") else "h11",
+        "backlog": settings["backlog"],
+        "timeout_keep_alive": settings["timeout_keep_alive"],
+        "limit_concurrency": settings["limit_concurrency"],
+        "proxy_headers": True,
+        "reload": False,
+    }
+
+
+def prepare_workers(workers: int) -> None:
+    """
+    Prepare the environment inherited by the worker processes: workers
+    share their state through a shared state backend, the startup
+    container cleanup runs once here instead of in every worker, and a
+    drain left over from the previous workers is cleared.
+    """
+    if workers > 1 and "STATE_BACKEND" not in os.environ:
+        config = get_config_manager().languages_config
+        if config.get("state_backend", {}).get("type", "memory") == "memory":
+            temp_dir = config.get("compiler_settings", {}).get(
+                "temp_dir", "/tmp/code_execution"
+            )
+            os.environ["STATE_BACKEND"] = f"sqlite:///{temp_dir}/state.sqlite3"
+            print(f"Using {os.environ['STATE_BACKEND']} to share state between workers")
+
+    # Imported here so that development mode does not connect to Docker twice
+    from container_manager import get_container_manager
+    from drain import get_drain_mode
+
+    get_container_manager()
+    os.environ["CONTAINER_STARTUP_CLEANUP"] = "0"
+    # A drain requested before this deploy does not apply to the new workers
+    get_drain_mode().stop()
+
+
+def log_config(uvicorn_log_config):
+    datefmt = "%Y-%m-%d %H:%M:%S"
+    formatters = uvicorn_log_config["formatters"]
+    formatters["default"]["fmt"] = "%(levelprefix)s [%(asctime)s] %(message)s asdf"
+    formatters["default"]["datefmt"] = datefmt
+    formatters["access"][
+        "fmt"
+    ] = '%(levelprefix)s [%(asctime)s] %(client_addr)s - "%(request_line)s" %(status_code)s'
+    formatters["access"]["datefmt"] = datefmt
+    return uvicorn_log_config
+
+
+def run() -> None:
+    """Start the server."""
+    import uvicorn
+    from uvicorn.config import LOGGING_CONFIG
+
+    settings = get_server_settings()
+    production = settings["mode"] == "production"
+    if production:
+        options = production_options(settings)
+        prepare_workers(options["workers"])
+        print(
+            f"🏭 Production mode: {options['workers']} workers, "
+            f"{options['loop']} event loop, {options['http']} HTTP parser"
+        )
+    else:
+        options = {"reload": False}
+
+    # Check for Let's Encrypt certificates first, then fallback to custom certs
+    domain = os.environ.get("DOMAIN", "localhost")
+    letsencrypt_cert_path = f"/etc/letsencrypt/live/{domain}/fullchain.pem"
+    letsencrypt_key_path = f"/etc/letsencrypt/live/{domain}/privkey.pem"
+
+    # Fallback to local SSL directory
+    local_cert_path = os.path.join(os.path.dirname(__file__), "ssl", "server.crt")
+    local_key_path = os.path.join(os.path.dirname(__file__), "ssl", "server.key")
+
+    # Check for Let's Encrypt certificates first
+    if os.path.exists(letsencrypt_cert_path) and os.path.exists(letsencrypt_key_path):
+        print(f"🔐 Starting server with Let's Encrypt HTTPS for domain: {domain}")
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=443,  # Standard HTTPS port
+            ssl_certfile=letsencrypt_cert_path,
+            ssl_keyfile=letsencrypt_key_path,
+            **options,
+        )
+    elif os.path.exists(local_cert_path) and os.path.exists(local_key_path):
+        print("🔐 Starting server with local SSL certificates...")
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8443,  # Custom HTTPS port for local certs
+            ssl_certfile=local_cert_path,
+            ssl_keyfile=local_key_path,
+            **options,
+        )
+    else:
+        print("⚠️  No SSL certificates found. Starting with HTTP...")
+        print(f"   Let's Encrypt: {letsencrypt_cert_path}")
+        print(f"   Local certs:   {local_cert_path}")
+        print("   To setup Let's Encrypt, run: ./scripts/setup_letsencrypt.sh")
+        print("   To generate local certs, run: ./scripts/generate_ssl_certs.sh")
+        if not production:
+            options["reload"] = True
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            log_config=log_config(LOGGING_CONFIG),
+            **options,
+        )
+
+
+if __name__ == "__main__":
+    run()
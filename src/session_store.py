@@ -0,0 +1,209 @@
+"""
+Session Store
+User sessions with idle expiry and a bounded size. Sessions are created on
+first real use (compile, run, library browsing, ...), not for every page
+view, and expire after a period without activity.
+
+Expiry uses a heap with one entry per session, ordered by the expiry time
+the session had when the entry was pushed. Touching a session only updates
+its last-used time; stale heap entries are re-pushed when they surface, so
+expiring never scans all sessions.
+
+With a shared state backend, sessions are also stored there so that every
+worker knows them; a worker adopts sessions created by another worker on
+first sight and checks the shared last-used time before expiring one.
+"""
+
+import heapq
+import json
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from models import UserSession
+from state_backend import StateBackend
+
+_NAMESPACE = "sessions"
+
+
+class SessionStore:
+    """Thread-safe mapping of session ids to sessions with TTL eviction."""
+
+    def __init__(
+        self,
+        ttl: float = 7200,
+        max_sessions: int = 10000,
+        on_evict: Optional[Callable[[str], None]] = None,
+        backend: Optional[StateBackend] = None,
+    ):
+        self.ttl = ttl
+        self.max_sessions = max(1, max_sessions)
+        self.on_evict = on_evict
+        # Only a backend shared with other workers needs to be kept in sync
+        self.backend = backend if backend is not None and backend.shared else None
+        self._sessions: Dict[str, UserSession] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._lock = threading.RLock()
+
+    def create(self) -> str:
+        """Create a session and return its id."""
+        now = time.time()
+        session_id = str(uuid.uuid4())
+        with self._lock:
+            evicted = self._expire_locked(now)
+            while len(self._sessions) >= self.max_sessions:
+                evicted.extend(self._evict_oldest_locked())
+            session = UserSession(created_at=now, last_used=now)
+            self._sessions[session_id] = session
+            heapq.heappush(self._expiry_heap, (now + self.ttl, session_id))
+        self._persist(session_id, session)
+        self._notify(evicted)
+        return session_id
+
+    def restore(self, session_id: str, created_at: float) -> None:
+        """Re-create a known session, e.g. one whose container survived a restart."""
+        now = time.time()
+        with self._lock:
+            if session_id in self._sessions:
+                return
+            session = UserSession(created_at=created_at, last_used=now)
+            self._sessions[session_id] = session
+            heapq.heappush(self._expiry_heap, (now + self.ttl, session_id))
+        self._persist(session_id, session)
+
+    def get(self, session_id: Optional[str]) -> Optional[UserSession]:
+        """Get a live session, or None if it does not exist or has expired."""
+        if not session_id:
+            return None
+        with self._lock:
+            evicted = self._expire_locked(time.time())
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._adopt_locked(session_id)
+        self._notify(evicted)
+        return session
+
+    def touch(self, session_id: Optional[str]) -> bool:
+        """Record activity on a session. Returns False for unknown sessions."""
+        session = self.get(session_id)
+        if session is None:
+            return False
+        session.last_used = time.time()
+        self._persist(session_id, session)
+        return True
+
+    def remove(self, session_id: str) -> bool:
+        """Remove a session without calling the eviction hook."""
+        if self.backend is not None:
+            self.backend.delete(_NAMESPACE, session_id)
+        with self._lock:
+            # Its heap entry is skipped when it surfaces
+            return self._sessions.pop(session_id, None) is not None
+
+    def expire(self) -> List[str]:
+        """Evict all idle sessions now. Returns their ids."""
+        with self._lock:
+            evicted = self._expire_locked(time.time())
+        self._notify(evicted)
+        return evicted
+
+    def _expire_locked(self, now: float) -> List[str]:
+        evicted = []
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, session_id = heapq.heappop(self._expiry_heap)
+            session = self._sessions.get(session_id)
+            if session is None:
+                continue
+            self._refresh_locked(session_id, session)
+            expires_at = session.last_used + self.ttl
+            if expires_at > now:
+                # Touched since the entry was pushed
+                heapq.heappush(self._expiry_heap, (expires_at, session_id))
+                continue
+            self._forget_locked(session_id)
+            evicted.append(session_id)
+        return evicted
+
+    def _evict_oldest_locked(self) -> List[str]:
+        """Evict the least recently used session to make room."""
+        while self._expiry_heap:
+            pushed_expiry, session_id = heapq.heappop(self._expiry_heap)
+            session = self._sessions.get(session_id)
+            if session is None:
+                continue
+            expires_at = session.last_used + self.ttl
+            if expires_at > pushed_expiry:
+                heapq.heappush(self._expiry_heap, (expires_at, session_id))
+                continue
+            self._forget_locked(session_id)
+            return [session_id]
+        return []
+
+    def _forget_locked(self, session_id: str) -> None:
+        del self._sessions[session_id]
+        if self.backend is not None:
+            self.backend.delete(_NAMESPACE, session_id)
+
+    def _persist(self, session_id: str, session: UserSession) -> None:
+        if self.backend is not None:
+            self.backend.set(
+                _NAMESPACE,
+                session_id,
+                json.dumps({"created_at": session.created_at, "last_used": session.last_used}),
+                self.ttl,
+            )
+
+    def _load(self, session_id: str) -> Optional[UserSession]:
+        value = self.backend.get(_NAMESPACE, session_id) if self.backend else None
+        return UserSession(**json.loads(value)) if value else None
+
+    def _adopt_locked(self, session_id: str) -> Optional[UserSession]:
+        """Take over a session another worker created."""
+        session = self._load(session_id)
+        if session is not None:
+            self._sessions[session_id] = session
+            heapq.heappush(self._expiry_heap, (session.last_used + self.ttl, session_id))
+        return session
+
+    def _refresh_locked(self, session_id: str, session: UserSession) -> None:
+        """Pick up activity another worker recorded for a session."""
+        shared = self._load(session_id)
+        if shared is not None and shared.last_used > session.last_used:
+            session.last_used = shared.last_used
+
+    def _notify(self, evicted: List[str]) -> None:
+        if not self.on_evict:
+            return
+        for session_id in evicted:
+            try:
+                self.on_evict(session_id)
+            except Exception as e:
+                print(f"Warning: could not release session {session_id}: {e}")
+
+    # Mapping interface used by the controllers
+
+    def __contains__(self, session_id: object) -> bool:
+        return isinstance(session_id, str) and self.get(session_id) is not None
+
+    def __getitem__(self, session_id: str) -> UserSession:
+        session = self.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        return session
+
+    def __delitem__(self, session_id: str) -> None:
+        if not self.remove(session_id):
+            raise KeyError(session_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._sessions))
+
+    def items(self) -> List[Tuple[str, UserSession]]:
+        with self._lock:
+            return list(self._sessions.items())
@@ -0,0 +1,273 @@
+"""
+Shared State Backend
+Key/value storage for state that several API worker processes (or hosts)
+must agree on: user sessions, execution records, container ownership and
+ID counters.
+
+The in-memory backend keeps everything in the process, which is only
+correct with a single worker. The SQLite backend stores the state in a
+database file shared by all workers on a host.
+
+Select the backend in languages.json ("state_backend": {"type": "sqlite",
+"path": ...}) or with the STATE_BACKEND environment variable ("memory" or
+"sqlite:///<path>"). The path follows the three slashes as is, so
+"sqlite:///state.sqlite3" is relative to the working directory and
+"sqlite:////var/lib/state.sqlite3" is absolute.
+
+Reads never write: expired entries are filtered out and removed by
+purge_expired, which the background cleanup calls periodically.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config_manager import get_config_manager
+
+
+class StateBackend(ABC):
+    """Namespaced string key/value store with expiry and atomic counters."""
+
+    # Whether other processes see the state (i.e. several workers are possible)
+    shared = False
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        """Get a value, or None if it does not exist or has expired."""
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Store a value, optionally expiring after ttl seconds."""
+
+    @abstractmethod
+    def add(self, namespace: str, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Store a value only if the key is absent. Returns whether it was stored."""
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str) -> bool:
+        """Delete a value. Returns whether it existed."""
+
+    @abstractmethod
+    def items(self, namespace: str) -> List[Tuple[str, str]]:
+        """All live (key, value) pairs of a namespace."""
+
+    @abstractmethod
+    def incr(self, name: str) -> int:
+        """Atomically increment a counter and return the new value."""
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Remove the expired entries. Returns the number removed."""
+
+
+class InMemoryStateBackend(StateBackend):
+    """Process-local backend (single worker)."""
+
+    def __init__(self):
+        self._values: Dict[Tuple[str, str], Tuple[str, Optional[float]]] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, entry_key: Tuple[str, str], now: float) -> Optional[str]:
+        entry = self._values.get(entry_key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            del self._values[entry_key]
+            return None
+        return value
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        with self._lock:
+            return self._live((namespace, key), time.time())
+
+    def set(self, namespace: str, key: str, value: str, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._values[(namespace, key)] = (value, expires_at)
+
+    def add(self, namespace: str, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        now = time.time()
+        with self._lock:
+            if self._live((namespace, key), now) is not None:
+                return False
+            self._values[(namespace, key)] = (value, now + ttl if ttl is not None else None)
+            return True
+
+    def delete(self, namespace: str, key: str) -> bool:
+        with self._lock:
+            return self._values.pop((namespace, key), None) is not None
+
+    def items(self, namespace: str) -> List[Tuple[str, str]]:
+        now = time.time()
+        with self._lock:
+            keys = [k for k in self._values if k[0] == namespace]
+            return [
+                (key, value)
+                for (_, key) in keys
+                if (value := self._live((namespace, key), now)) is not None
+            ]
+
+    def incr(self, name: str) -> int:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+            return self._counters[name]
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [
+                entry_key
+                for entry_key, (_, expires_at) in self._values.items()
+                if expires_at is not None and expires_at <= now
+            ]
+            for entry_key in expired:
+                del self._values[entry_key]
+        return len(expired)
+
+
+class SQLiteStateBackend(StateBackend):
+    """Backend stored in a SQLite database shared by the workers of a host."""
+
+    shared = True
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " expires_at REAL, PRIMARY KEY (namespace, key))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters ("
+                " name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        row = self._connection().execute(
+            "SELECT value FROM kv WHERE namespace = ? AND key = ?"
+            " AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, key, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, namespace: str, key: str, value: str, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._connection().execute(
+            "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at)"
+            " VALUES (?, ?, ?, ?)",
+            (namespace, key, value, expires_at),
+        )
+
+    def add(self, namespace: str, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "DELETE FROM kv WHERE namespace = ? AND key = ? AND expires_at <= ?",
+                (namespace, key, now),
+            )
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO kv (namespace, key, value, expires_at)"
+                " VALUES (?, ?, ?, ?)",
+                (namespace, key, value, now + ttl if ttl is not None else None),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+
+    def delete(self, namespace: str, key: str) -> bool:
+        cursor = self._connection().execute(
+            "DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+        )
+        return cursor.rowcount > 0
+
+    def items(self, namespace: str) -> List[Tuple[str, str]]:
+        return self._connection().execute(
+            "SELECT key, value FROM kv WHERE namespace = ?"
+            " AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, time.time()),
+        ).fetchall()
+
+    def incr(self, name: str) -> int:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO counters (name, value) VALUES (?, 1)"
+                " ON CONFLICT(name) DO UPDATE SET value = value + 1",
+                (name,),
+            )
+            value = conn.execute(
+                "SELECT value FROM counters WHERE name = ?", (name,)
+            ).fetchone()[0]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def purge_expired(self) -> int:
+        cursor = self._connection().execute(
+            "DELETE FROM kv WHERE expires_at <= ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+
+def create_state_backend(spec: Optional[str] = None) -> StateBackend:
+    """
+    Create a backend from a specification ("memory", "sqlite:///path") or,
+    if none is given, from the STATE_BACKEND variable or the configuration.
+    """
+    spec = spec or os.environ.get("STATE_BACKEND")
+    if spec is None:
+        config = get_config_manager().languages_config
+        settings = config.get("state_backend", {})
+        if settings.get("type", "memory") == "sqlite":
+            temp_dir = config.get("compiler_settings", {}).get(
+                "temp_dir", "/tmp/code_execution"
+            )
+            spec = "sqlite:///" + settings.get("path", f"{temp_dir}/state.sqlite3")
+        else:
+            spec = "memory"
+
+    if spec == "memory":
+        return InMemoryStateBackend()
+    if spec.startswith("sqlite:///"):
+        return SQLiteStateBackend(Path(spec[len("sqlite:///"):]))
+    raise ValueError(f"Unknown state backend: {spec}")
+
+
+# Global instance for easy access
+_state_backend: Optional[StateBackend] = None
+_state_backend_lock = threading.Lock()
+
+
+def get_state_backend() -> StateBackend:
+    """Get the global state backend instance."""
+    global _state_backend
+    with _state_backend_lock:
+        if _state_backend is None:
+            _state_backend = create_state_backend()
+            print(f"Using {type(_state_backend).__name__} for shared state")
+        return _state_backend
@@ -0,0 +1,242 @@
+"""
+AutoProof Verification Cache
+Remembers per-routine AutoProof outcomes so that re-verifying a project only
+runs the prover on routines whose verification inputs have changed.
+
+A routine's cache key covers its own text, the text of the routines of the
+same class it mentions (their contracts are what modular verification
+assumes), the rest of its class (header, inheritance, invariant), the text
+of the submitted classes it references and the prover settings. Editing a routine therefore
+invalidates the routine itself and its callers, nothing else.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from eiffel_syntax import ClassInfo, analyze_class, content_hash
+
+RoutineId = Tuple[str, str]  # (CLASS_NAME, routine_name)
+
+_ROW_PATTERN = re.compile(r"<tr\b.*?</tr>", re.IGNORECASE | re.DOTALL)
+_CELL_PATTERN = re.compile(r"<t[dh]\b[^>]*>(.*?)</t[dh]>", re.IGNORECASE | re.DOTALL)
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_QUALIFIED_PATTERN = re.compile(r"\b([A-Za-z][A-Za-z0-9_]*)\.([A-Za-z][A-Za-z0-9_]*)\b")
+
+
+class VerificationPlan:
+    """The routines of a submission, split into cached and pending ones."""
+
+    def __init__(
+        self,
+        classes: List[ClassInfo],
+        keys: Dict[RoutineId, str],
+        cached: Dict[RoutineId, str],
+    ):
+        self.classes = classes
+        self.keys = keys
+        self.cached = cached
+        self.pending = [routine for routine in keys if routine not in cached]
+
+    @property
+    def routines(self) -> List[RoutineId]:
+        return list(self.keys)
+
+    @property
+    def frame_key(self) -> str:
+        """Key of the report frame: the exact classes and settings verified."""
+        return content_hash(*sorted(self.keys.values()))
+
+    def autoproof_targets(self) -> List[str]:
+        """
+        AutoProof arguments selecting the pending routines. Classes whose
+        routines are all pending are passed by class name.
+        """
+        targets = []
+        for info in self.classes:
+            class_routines = [r for r in self.keys if r[0] == info.name]
+            pending = [r for r in class_routines if r not in self.cached]
+            if not pending:
+                continue
+            if len(pending) == len(class_routines):
+                targets.append(info.name)
+            else:
+                targets.extend(f"{cls}.{routine}" for cls, routine in pending)
+        return targets
+
+
+class AutoProofReport:
+    """An AutoProof HTML report split into its frame and per-routine rows."""
+
+    def __init__(self, prefix: str, rows: Dict[RoutineId, str], suffix: str):
+        self.prefix = prefix
+        self.rows = rows
+        self.suffix = suffix
+
+    @classmethod
+    def parse(cls, html: str, routines: List[RoutineId]) -> Optional["AutoProofReport"]:
+        """
+        Attribute the table rows of an AutoProof report to routines.
+        Rows that cannot be attributed (e.g. detail rows of a failed check)
+        stay with the routine above them. Returns None if no row could be
+        attributed, in which case the report is not a routine table.
+        """
+        known = {(c.upper(), r.lower()): (c, r) for c, r in routines}
+        rows: Dict[RoutineId, str] = {}
+        prefix_end = None
+        suffix_start = 0
+        current = None
+        for match in _ROW_PATTERN.finditer(html):
+            routine = cls._attribute_row(match.group(0), known)
+            if routine is not None:
+                current = routine
+                if prefix_end is None:
+                    prefix_end = match.start()
+            if current is None:
+                continue
+            rows[current] = rows.get(current, "") + match.group(0)
+            suffix_start = match.end()
+        if prefix_end is None:
+            return None
+        return cls(html[:prefix_end], rows, html[suffix_start:])
+
+    @staticmethod
+    def _attribute_row(row: str, known: Dict[RoutineId, RoutineId]) -> Optional[RoutineId]:
+        cells = [
+            " ".join(_TAG_PATTERN.sub(" ", cell).split())
+            for cell in _CELL_PATTERN.findall(row)
+        ]
+        for cell in cells:
+            for class_name, routine in _QUALIFIED_PATTERN.findall(cell):
+                key = (class_name.upper(), routine.lower())
+                if key in known:
+                    return known[key]
+        words = {cell.upper() for cell in cells} | {cell.lower() for cell in cells}
+        for (class_name, routine), original in known.items():
+            if class_name in words and routine in words:
+                return original
+        return None
+
+    def render(self, routines: List[RoutineId], rows: Dict[RoutineId, str]) -> str:
+        """Render a report frame around the given rows, in routine order."""
+        return self.prefix + "".join(rows.get(r, "") for r in routines) + self.suffix
+
+
+class VerificationCache:
+    """Thread-safe LRU cache of AutoProof outcomes per routine."""
+
+    def __init__(self, max_entries: int = 4096, max_frames: int = 256):
+        self.max_entries = max_entries
+        self.max_frames = max_frames
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._frames: "OrderedDict[str, AutoProofReport]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def plan(self, sources: List[str], settings: str = "") -> Optional[VerificationPlan]:
+        """
+        Work out which routines of the given class texts still need to be
+        verified. Outcomes are only reused for identical prover settings.
+        Returns None if a source could not be analyzed, in which case the
+        caller should fall back to a full verification run.
+        """
+        classes = []
+        for source in sources:
+            info = analyze_class(source)
+            if info is None:
+                return None
+            classes.append(info)
+        if not classes:
+            return None
+
+        keys = self._routine_keys(classes, settings)
+        with self._lock:
+            cached = {}
+            for routine, key in keys.items():
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    cached[routine] = self._entries[key]
+            plan = VerificationPlan(classes, keys, cached)
+            # A fully cached plan is rendered without a fresh report, so it
+            # needs the frame of a report on these very classes
+            if not plan.pending and plan.frame_key not in self._frames:
+                plan = VerificationPlan(classes, keys, {})
+        return plan
+
+    def store(self, plan: VerificationPlan, report: AutoProofReport) -> None:
+        """
+        Remember the outcomes of the pending routines of a plan. Routines the
+        report has no row for (attributes, constants) are remembered as such.
+        """
+        with self._lock:
+            self._frames[plan.frame_key] = AutoProofReport(report.prefix, {}, report.suffix)
+            self._frames.move_to_end(plan.frame_key)
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+            for routine in plan.pending:
+                self._entries[plan.keys[routine]] = report.rows.get(routine, "")
+                self._entries.move_to_end(plan.keys[routine])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def render(self, plan: VerificationPlan, report: Optional[AutoProofReport]) -> str:
+        """Merge cached outcomes with the rows of a fresh report."""
+        rows = dict(plan.cached)
+        if report is not None:
+            rows.update({r: report.rows.get(r, "") for r in plan.pending})
+        with self._lock:
+            frame = report or self._frames.get(plan.frame_key)
+        if frame is None:
+            return ""
+        return frame.render(plan.routines, rows)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._frames.clear()
+
+    @staticmethod
+    def _routine_keys(classes: List[ClassInfo], settings: str = "") -> Dict[RoutineId, str]:
+        class_hashes = {info.name: content_hash(info.text) for info in classes}
+        keys = {}
+        for info in classes:
+            dependency_signature = content_hash(
+                *(
+                    f"{name}:{class_hashes[name]}"
+                    for name in sorted(info.suppliers)
+                    if name in class_hashes
+                )
+            )
+            texts = {}
+            for feature in info.features:
+                for name in feature.names:
+                    texts[name] = feature.text
+            for feature in info.features:
+                callees = sorted(
+                    name
+                    for name in feature.identifiers
+                    if name in texts and name not in feature.names
+                )
+                key = content_hash(
+                    settings,
+                    info.name,
+                    info.context,
+                    dependency_signature,
+                    feature.text,
+                    *(texts[name] for name in callees),
+                )
+                for name in feature.names:
+                    keys[(info.name, name)] = content_hash(key, name)
+        return keys
+
+
+# Global instance for easy access
+_verification_cache: Optional[VerificationCache] = None
+
+
+def get_verification_cache() -> VerificationCache:
+    """Get the global verification cache instance."""
+    global _verification_cache
+    if _verification_cache is None:
+        _verification_cache = VerificationCache()
+    return _verification_cache
@@ -0,0 +1,162 @@
+"""
+Workspace Snapshots
+Compressed archives of the /workspace of session containers removed for
+inactivity. The workspace (sources, EIFGENs and other build outputs) is
+restored into the session's next container, so a returning user does not
+pay for a cold compile.
+
+Snapshots live on the host next to the other caches and are shared by the
+workers of a host. The store is bounded by age and total size; the oldest
+snapshots are dropped first.
+"""
+
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from config_manager import get_config_manager
+
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_-]")
+
+
+class WorkspaceSnapshotStore:
+    """On-disk store of gzip-compressed workspace tar archives by session."""
+
+    def __init__(
+        self,
+        snapshot_dir: Path,
+        max_bytes: int = 1024 * 1024 * 1024,
+        max_snapshot_bytes: int = 256 * 1024 * 1024,
+        ttl: float = 86400,
+    ):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.max_bytes = max_bytes
+        self.max_snapshot_bytes = max_snapshot_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    def save(
+        self,
+        session_id: str,
+        language: str,
+        workspace: Dict[str, str],
+        chunks: Iterable[bytes],
+    ) -> bool:
+        """
+        Store the tar stream of a session's workspace with its language and
+        workspace manifest. Returns False if the snapshot is too large.
+        """
+        archive_path, meta_path = self._paths(session_id)
+        tmp_path = archive_path.with_suffix(".tmp")
+        try:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+            with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            if tmp_path.stat().st_size > self.max_snapshot_bytes:
+                tmp_path.unlink()
+                return False
+            meta_path.write_text(
+                json.dumps({"language": language, "workspace": workspace}),
+                encoding="utf-8",
+            )
+            os.replace(tmp_path, archive_path)
+        except OSError as e:
+            print(f"Warning: could not save the workspace of session {session_id}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return False
+        self.enforce_limits()
+        return True
+
+    def take(self, session_id: str, language: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        """
+        Remove and return the snapshot of a session as (gzip-compressed tar
+        archive, workspace manifest), if there is one for the language.
+        """
+        archive_path, meta_path = self._paths(session_id)
+        with self._lock:
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                expired = time.time() - archive_path.stat().st_mtime > self.ttl
+                data = archive_path.read_bytes() if not expired else None
+            except (OSError, ValueError):
+                return None
+            archive_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+        if data is None or meta.get("language") != language:
+            return None
+        return data, meta.get("workspace", {})
+
+    def discard(self, session_id: str) -> None:
+        """Drop the snapshot of a session (e.g. when the session ends)."""
+        with self._lock:
+            for path in self._paths(session_id):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, int]:
+        snapshots = self._snapshots()
+        return {
+            "snapshots": len(snapshots),
+            "stored_bytes": sum(size for _, _, size in snapshots),
+        }
+
+    def enforce_limits(self) -> int:
+        """Drop expired snapshots and the oldest ones over the size budget."""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            snapshots = sorted(self._snapshots(), key=lambda s: s[1])
+            total = sum(size for _, _, size in snapshots)
+            for path, mtime, size in snapshots:
+                if now - mtime <= self.ttl and total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                path.with_suffix("").with_suffix(".json").unlink(missing_ok=True)
+                total -= size
+                removed += 1
+        return removed
+
+    def _paths(self, session_id: str) -> Tuple[Path, Path]:
+        name = _SAFE_NAME.sub("_", session_id)
+        return (
+            self.snapshot_dir / f"{name}.tar.gz",
+            self.snapshot_dir / f"{name}.json",
+        )
+
+    def _snapshots(self):
+        """(path, mtime, size) of the stored archives."""
+        snapshots = []
+        try:
+            with os.scandir(self.snapshot_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".tar.gz"):
+                        stat = entry.stat()
+                        snapshots.append((Path(entry.path), stat.st_mtime, stat.st_size))
+        except FileNotFoundError:
+            pass
+        return snapshots
+
+
+# Global instance for easy access
+_workspace_snapshots: Optional[WorkspaceSnapshotStore] = None
+
+
+def get_workspace_snapshots() -> WorkspaceSnapshotStore:
+    """Get the global workspace snapshot store instance."""
+    global _workspace_snapshots
+    if _workspace_snapshots is None:
+        config = get_config_manager().languages_config
+        temp_dir = config.get("compiler_settings", {}).get("temp_dir", "/tmp/code_execution")
+        settings = config.get("workspace_snapshots", {})
+        _workspace_snapshots = WorkspaceSnapshotStore(
+            Path(temp_dir) / "workspace_snapshots",
+            max_bytes=settings.get("max_bytes", 1024 * 1024 * 1024),
+            max_snapshot_bytes=settings.get("max_snapshot_bytes", 256 * 1024 * 1024),
+            ttl=settings.get("ttl_seconds", 86400),
+        )
+    return _workspace_snapshots
@@ -112,3 +112,58 @@ int main() {
     assert "Result: 15" in status_data["output"]
     print(f"C execution failed: {status_data['output']}")
     assert compile_data["success"]  # At least compilation worked
+
+
+def test_c_syntax_errors_accompany_compiler_result():
+    """Test that the compile endpoint reports syntax errors with locations."""
+    files = [
+        {
+            "name": "broken.c",
+            "content": """
+#include <stdio.h>
+
+int main() {
+    printf("missing semicolon\\n")
+    return 0;
+}""",
+        },
+    ]
+    session_client = create_session_client()
+    compile_resp = session_client.post(
+        "/compile",
+        json={"language": "c", "files": files, "main_file": "broken.c"},
+    )
+    assert compile_resp.status_code == 422
+    compile_data = compile_resp.json()
+    assert not compile_data["success"]
+    assert compile_data["syntax_errors"]
+    assert compile_data["syntax_errors"][0]["file"] == "broken.c"
+    # The pre-flight is advisory for C: gcc reported the error as well
+    assert "error" in compile_data["output"]
+
+
+def test_c_macro_syntax_is_compiled_despite_preflight():
+    """Test that code the C grammar cannot parse without macros still compiles."""
+    files = [
+        {
+            "name": "macro.c",
+            "content": """
+#include <stdio.h>
+
+#define FOREACH(i, n) for (int i = 0; i < n; i++)
+
+int main() {
+    FOREACH(i, 3) {
+        printf("%d\\n", i);
+    }
+    return 0;
+}""",
+        },
+    ]
+    session_client = create_session_client()
+    compile_resp = session_client.post(
+        "/compile",
+        json={"language": "c", "files": files, "main_file": "macro.c"},
+    )
+    assert compile_resp.status_code == 200
+    assert compile_resp.json()["success"]
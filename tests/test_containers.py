@@ -0,0 +1,270 @@
+"""
+Session container lifecycle tests: adoption, cleanup, idle handling and budgets.
+"""
+
+import json
+import threading
+import time
+
+import docker
+import pytest
+from container_manager import (
+    CREATED_AT_LABEL,
+    LANGUAGE_LABEL,
+    PINNED_LABEL,
+    RESOURCES_LABEL,
+    SESSION_LABEL,
+    get_container_manager,
+)
+from workspace_snapshots import get_workspace_snapshots
+
+
+def test_unlabelled_session_containers_are_cleaned_up():
+    """Test that code-session-* containers from before labelling are removed."""
+    container_mgr = get_container_manager()
+    legacy = container_mgr.client.containers.run(
+        container_mgr.get_image_for_language("python"),
+        name="code-session-legacy-unlabelled",
+        detach=True,
+        command="sleep infinity",
+    )
+    try:
+        listed = {container.id for container in container_mgr._list_session_containers()}
+        assert legacy.id in listed
+
+        _, removed = container_mgr.adopt_existing_containers()
+        assert removed >= 1
+        with pytest.raises(docker.errors.NotFound):
+            container_mgr.client.containers.get(legacy.id)
+    finally:
+        try:
+            legacy.remove(force=True)
+        except docker.errors.NotFound:
+            pass
+
+
+def _run_labelled_container(container_mgr, session_id, created_at):
+    """Start a session container as an earlier process would have left it."""
+    return container_mgr.client.containers.run(
+        container_mgr.get_image_for_language("python"),
+        name=f"code-session-{session_id}",
+        detach=True,
+        command="sleep infinity",
+        labels={
+            SESSION_LABEL: session_id,
+            LANGUAGE_LABEL: "python",
+            CREATED_AT_LABEL: str(created_at),
+            PINNED_LABEL: "0",
+            RESOURCES_LABEL: json.dumps(container_mgr.get_resource_profile("python")),
+        },
+    )
+
+
+def _record_last_used(container_mgr, session_id, container, last_used):
+    """Record a container's last use in the container registry."""
+    record = {
+        "container_id": container.id,
+        "created_at": float(container.labels[CREATED_AT_LABEL]),
+        "name": container.name,
+        "language": "python",
+        "resources": json.loads(container.labels[RESOURCES_LABEL]),
+        "pinned": False,
+        "last_used": last_used,
+    }
+    container_mgr.state_backend.set("containers", session_id, json.dumps(record))
+
+
+def test_labelled_containers_are_adopted_after_restart():
+    """Test that adoption keeps recently active containers, however old they are."""
+    container_mgr = get_container_manager()
+    session_id = "test-adopt-live"
+    assert container_mgr.create_session_container(
+        session_id, "python", resources={"cpu_quota": 50000}
+    )
+    container_id = container_mgr.active_containers[session_id]["container_id"]
+    now = time.time()
+    # Created a day ago but used a minute ago
+    active = _run_labelled_container(container_mgr, "test-adopt-active", now - 86400)
+    _record_last_used(container_mgr, "test-adopt-active", active, now - 60)
+    # Created a minute ago but idle longer than remove_after_seconds
+    idle = _run_labelled_container(container_mgr, "test-adopt-idle", now - 60)
+    _record_last_used(
+        container_mgr, "test-adopt-idle", idle, now - container_mgr.remove_after_seconds - 60
+    )
+    try:
+        # A new process knows neither the container nor its activity
+        container_mgr.active_containers.pop(session_id)
+        container_mgr.state_backend.delete("containers", session_id)
+
+        adopted, removed = container_mgr.adopt_existing_containers()
+        assert adopted >= 2
+        assert removed >= 1
+        container_info = container_mgr.active_containers[session_id]
+        assert container_info["container_id"] == container_id
+        assert container_info["language"] == "python"
+        assert container_info["resources"]["cpu_quota"] == 50000
+        assert not container_info["pinned"]
+        assert container_mgr.has_session_container("test-adopt-active")
+        assert "test-adopt-idle" not in container_mgr.active_containers
+        with pytest.raises(docker.errors.NotFound):
+            container_mgr.client.containers.get(idle.id)
+
+        result = container_mgr.run_command_in_container(session_id, "true")
+        assert result.exit_code == 0
+    finally:
+        for cleanup_id in [session_id, "test-adopt-active", "test-adopt-idle"]:
+            container_mgr.cleanup_session_container(cleanup_id)
+        for container in [active, idle]:
+            try:
+                container.remove(force=True)
+            except docker.errors.NotFound:
+                pass
+
+
+def _make_idle(container_mgr, session_id, seconds):
+    """Pretend a session container was last used the given seconds ago."""
+    container_mgr.active_containers[session_id]["last_used"] -= seconds
+    container_mgr._register_container(session_id)
+    # Let the next reap_idle_containers run even if one just ran
+    container_mgr.state_backend.delete("reaper", "lease")
+
+
+def test_idle_container_is_paused_and_resumed_on_use():
+    """Test that an idle container is paused and resumed by its next command."""
+    container_mgr = get_container_manager()
+    session_id = "test-idle-pause"
+    assert container_mgr.create_session_container(session_id, "python")
+    try:
+        _make_idle(container_mgr, session_id, container_mgr.pause_after_seconds + 1)
+        paused, removed = container_mgr.reap_idle_containers()
+        assert paused >= 1
+        container = container_mgr.active_containers[session_id]["container"]
+        container.reload()
+        assert container.status == "paused"
+
+        result = container_mgr.run_command_in_container(session_id, "echo resumed")
+        assert result.exit_code == 0
+        assert b"resumed" in result.output[0]
+        container.reload()
+        assert container.status == "running"
+    finally:
+        container_mgr.cleanup_session_container(session_id)
+
+
+def test_busy_container_is_never_reaped():
+    """Test that a container running a command is neither paused nor removed."""
+    container_mgr = get_container_manager()
+    session_id = "test-busy-reap"
+    assert container_mgr.create_session_container(session_id, "python")
+    try:
+        container_info = container_mgr.active_containers[session_id]
+        container_info["busy"] += 1
+        _make_idle(container_mgr, session_id, container_mgr.remove_after_seconds + 1)
+        container_mgr.reap_idle_containers()
+        assert session_id in container_mgr.active_containers
+        assert not container_info["paused"]
+
+        # Once the command ends the container counts as just used
+        container_mgr._release_container(session_id, container_info)
+        container_mgr.reap_idle_containers()
+        assert not container_info["paused"]
+    finally:
+        container_mgr.cleanup_session_container(session_id)
+
+
+def test_long_idle_container_is_removed():
+    """Test that an unpinned container idle for remove_after_seconds is removed."""
+    container_mgr = get_container_manager()
+    session_id = "test-idle-remove"
+    assert container_mgr.create_session_container(session_id, "python")
+    container_id = container_mgr.active_containers[session_id]["container_id"]
+    try:
+        _make_idle(container_mgr, session_id, container_mgr.remove_after_seconds + 1)
+        _, removed = container_mgr.reap_idle_containers()
+        assert removed >= 1
+        assert not container_mgr.has_session_container(session_id)
+        with pytest.raises(docker.errors.NotFound):
+            container_mgr.client.containers.get(container_id)
+    finally:
+        container_mgr.cleanup_session_container(session_id)
+        get_workspace_snapshots().discard(session_id)
+
+
+def test_budget_evicts_least_recently_used_idle_container(monkeypatch):
+    """Test that a full budget evicts the LRU idle container, not pinned or busy ones."""
+    container_mgr = get_container_manager()
+    eviction_candidates = container_mgr._eviction_candidates
+
+    def unlocked_eviction_candidates(usage):
+        # Other sessions can be admitted while candidates are looked up
+        assert not container_mgr._budget_lock.locked()
+        return eviction_candidates(usage)
+
+    monkeypatch.setattr(container_mgr, "_eviction_candidates", unlocked_eviction_candidates)
+    session_ids = ["test-budget-old", "test-budget-pinned", "test-budget-busy"]
+    new_session_id = "test-budget-new"
+    max_containers = container_mgr.max_containers
+    busy_info = None
+    try:
+        for session_id in session_ids:
+            assert container_mgr.create_session_container(
+                session_id, "python", pinned=session_id == "test-budget-pinned"
+            )
+        # Older than any other idle container, but newer than the pinned
+        # and busy ones
+        _make_idle(container_mgr, "test-budget-old", 10**6)
+        _make_idle(container_mgr, "test-budget-pinned", 2 * 10**6)
+        busy_info = container_mgr._use_container("test-budget-busy", busy=True, timeout=60)
+        _make_idle(container_mgr, "test-budget-busy", 2 * 10**6)
+        container_mgr.max_containers = container_mgr.budget_status()["containers"]
+
+        assert container_mgr.create_session_container(new_session_id, "python")
+        assert not container_mgr.has_session_container("test-budget-old")
+        assert container_mgr.has_session_container("test-budget-pinned")
+        assert container_mgr.has_session_container("test-budget-busy")
+        assert container_mgr.budget_status()["evictions"] >= 1
+    finally:
+        container_mgr.max_containers = max_containers
+        if busy_info is not None:
+            container_mgr._release_container("test-budget-busy", busy_info)
+        for session_id in session_ids + [new_session_id]:
+            container_mgr.cleanup_session_container(session_id)
+        get_workspace_snapshots().discard("test-budget-old")
+
+
+def _cpu_quota(container):
+    container.reload()
+    return container.attrs["HostConfig"]["CpuQuota"]
+
+
+def test_compile_phase_raises_cpu_quota_until_the_last_compile_ends():
+    """Test that compile commands run with the compile quota, and only they."""
+    container_mgr = get_container_manager()
+    session_id = "test-compile-quota"
+    assert container_mgr.create_session_container(
+        session_id, "python", resources={"cpu_quota": 50000, "compile_cpu_quota": 100000}
+    )
+    try:
+        container = container_mgr.active_containers[session_id]["container"]
+        assert _cpu_quota(container) == 50000
+
+        compiles = [
+            threading.Thread(
+                target=container_mgr.run_command_in_container,
+                args=(session_id, f"sleep {seconds}"),
+                kwargs={"compile_phase": True},
+            )
+            for seconds in (1, 3)
+        ]
+        for compile_thread in compiles:
+            compile_thread.start()
+        compiles[0].join()
+        # The longer compile still runs
+        assert _cpu_quota(container) == 100000
+        compiles[1].join()
+        assert _cpu_quota(container) == 50000
+
+        container_mgr.run_command_in_container(session_id, "true")
+        assert _cpu_quota(container) == 50000
+    finally:
+        container_mgr.cleanup_session_container(session_id)
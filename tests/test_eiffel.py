@@ -318,6 +318,73 @@ end""",
     ), f"Verification should succeed, but got: {status_data.get('output', '')}"
 
 
+def test_eiffel_verification_of_annotated_code_is_not_blocked():
+    """Test that valid AutoProof-annotated code is verified, not rejected up front."""
+    files = [
+        {
+            "name": "account.e",
+            "content": """note
+    description: "Bank account with AutoProof annotations"
+    explicit: wrapping
+
+class
+    ACCOUNT
+
+create
+    make
+
+feature
+
+    balance: INTEGER
+
+    make
+        note
+            status: creator
+        do
+            balance := 0
+        ensure
+            balance = 0
+        end
+
+    deposit (amount: INTEGER)
+        require
+            amount > 0
+            modify_field (["balance"], Current)
+        do
+            balance := balance + amount
+        ensure
+            balance = old balance + amount
+        end
+
+    total (amounts: ARRAY [INTEGER]): INTEGER
+        note
+            status: impure
+        do
+            across amounts as a loop
+                Result := Result + a.item
+            end
+        end
+
+invariant
+    balance >= 0
+
+end""",
+        }
+    ]
+    session_client = create_session_client()
+
+    verify_resp = session_client.post(
+        "/verify",
+        json={"language": "eiffel", "files": files, "main_file": "account.e"},
+    )
+    assert verify_resp.status_code == 200
+    verify_data = verify_resp.json()
+    assert verify_data["started"]
+
+    status_data = wait_for_execution_completion(verify_data["execution_id"])
+    assert "ACCOUNT" in status_data["output"]
+
+
 def test_eiffel_verification_failure():
     """Test Eiffel code verification with a failing check."""
     files = [
@@ -363,6 +430,218 @@ end""",
     print("✅ Verification correctly failed for 'check False'")
 
 
+def test_eiffel_verification_multifile():
+    """Test that verification sees every submitted class, not just the main file."""
+    files = [
+        {
+            "name": "application.e",
+            "content": """class
+    APPLICATION
+
+create
+    make
+
+feature
+    make
+        local
+            c: COUNTER
+        do
+            create c
+            c.increment
+            check c.value = 1 end
+        end
+
+end""",
+        },
+        {
+            "name": "counter.e",
+            "content": """class
+    COUNTER
+
+feature
+    value: INTEGER
+
+    increment
+        do
+            value := value + 1
+        ensure
+            value = old value + 1
+        end
+
+end""",
+        },
+    ]
+    session_client = create_session_client()
+
+    verify_resp = session_client.post(
+        "/verify",
+        json={"language": "eiffel", "files": files, "main_file": "application.e"},
+    )
+    assert verify_resp.status_code == 200
+    verify_data = verify_resp.json()
+    assert verify_data["success"]
+
+    status_data = wait_for_execution_completion(verify_data["execution_id"])
+    assert "COUNTER" in status_data["output"]
+
+
+def test_eiffel_verification_sharded():
+    """Test that a sharded verification merges the results of every shard."""
+    files = [
+        {
+            "name": f"shard_class_{index}.e",
+            "content": f"""class
+    SHARD_CLASS_{index}
+
+feature
+    double (x: INTEGER): INTEGER
+        do
+            Result := x + x
+        ensure
+            Result = 2 * x
+        end
+
+end""",
+        }
+        for index in range(3)
+    ]
+    session_client = create_session_client()
+
+    verify_resp = session_client.post(
+        "/verify",
+        json={
+            "language": "eiffel",
+            "files": files,
+            "main_file": "shard_class_0.e",
+            "shards": 3,
+            "timeout": 120,
+        },
+    )
+    assert verify_resp.status_code == 200
+    status_data = wait_for_execution_completion(
+        verify_resp.json()["execution_id"], max_attempts=120
+    )
+
+    for index in range(3):
+        assert f"SHARD_CLASS_{index}" in status_data["output"]
+
+
+def test_eiffel_verification_reuses_cached_results():
+    """Test that re-verifying unchanged code is served from the verification cache."""
+    files = [
+        {
+            "name": "cached_proof.e",
+            "content": """class
+    CACHED_PROOF
+
+create
+    make
+
+feature
+    make
+        do
+            check False end
+        end
+
+end""",
+        }
+    ]
+    session_client = create_session_client()
+
+    timings = []
+    outputs = []
+    for _ in range(2):
+        start_time = time.time()
+        verify_resp = session_client.post(
+            "/verify",
+            json={"language": "eiffel", "files": files, "main_file": "cached_proof.e"},
+        )
+        assert verify_resp.status_code == 200
+        status_data = wait_for_execution_completion(verify_resp.json()["execution_id"])
+        timings.append(time.time() - start_time)
+        outputs.append(status_data["output"])
+
+    print(f"First verification: {timings[0]:.3f}s, second: {timings[1]:.3f}s")
+    # The cached report must still show the failing check
+    assert "#fdd" in outputs[1]
+    assert timings[1] < timings[0]
+
+
+def test_eiffel_verification_adds_no_prover_options_by_default(monkeypatch):
+    """Test that AutoProof runs without prover options unless they are configured."""
+    from container_manager import get_container_manager
+
+    container_mgr = get_container_manager()
+    run_command = container_mgr.run_command_in_container
+    commands = []
+
+    def record_command(session_id, cmd, *args, **kwargs):
+        commands.append(cmd)
+        return run_command(session_id, cmd, *args, **kwargs)
+
+    monkeypatch.setattr(container_mgr, "run_command_in_container", record_command)
+
+    files = [
+        {
+            "name": "prover_options.e",
+            "content": """class
+    PROVER_OPTIONS
+
+feature
+    sum (a, b: INTEGER): INTEGER
+        require
+            a >= 0 and b >= 0
+        do
+            Result := a + b
+        ensure
+            Result >= 0
+        end
+
+end""",
+        }
+    ]
+    session_client = create_session_client()
+
+    verify_resp = session_client.post(
+        "/verify",
+        json={
+            "language": "eiffel",
+            "files": files,
+            "main_file": "prover_options.e",
+            "prover_cores": 1,
+            "vc_timeout": 7,
+            "timeout": 120,
+        },
+    )
+    assert verify_resp.status_code == 200
+    status_data = wait_for_execution_completion(
+        verify_resp.json()["execution_id"], max_attempts=120
+    )
+
+    autoproof_commands = [cmd for cmd in commands if "-autoproof" in cmd]
+    assert autoproof_commands
+    assert "-boogie" not in autoproof_commands[-1]
+    assert "-timeout" not in autoproof_commands[-1]
+    assert "PROVER_OPTIONS" in status_data["output"]
+
+
+def test_eiffel_prover_options_are_opt_in(monkeypatch):
+    """Test that configured prover option templates receive the requested values."""
+    from config_manager import get_config_manager
+    from language_executor.factory import get_executor_by_name
+
+    executor = get_executor_by_name("eiffel", "")
+    settings = get_config_manager().get_language_config("eiffel")["autoproof"]
+    assert executor._prover_options("test-prover-options", 1, 7) == ""
+
+    monkeypatch.setitem(settings, "prover_cores_option", "-boogie /vcsCores:{cores}")
+    monkeypatch.setitem(settings, "vc_timeout_option", "-timeout {vc_timeout}")
+    assert (
+        executor._prover_options("test-prover-options", 1, 7)
+        == "-boogie /vcsCores:1 -timeout 7"
+    )
+
+
 def test_eiffel_verification_unsupported_language():
     """Test that verification endpoint rejects non-Eiffel languages."""
     files = [{"name": "hello_world.py", "content": """print("Hello, World!")"""}]
@@ -378,3 +657,177 @@ def test_eiffel_verification_unsupported_language():
     print(f"Python verification response: {verify_data}")
     assert "not supported" in verify_data["detail"].lower()
     print("✅ Verification correctly rejected for non-Eiffel language")
+
+
+def test_eiffel_library_class_etag():
+    """Test that library classes carry an ETag and honour If-None-Match."""
+    session_client = create_session_client()
+
+    first_resp = session_client.get("/eiffel/library/STRING")
+    assert first_resp.status_code == 200
+    assert first_resp.json()["mapped_class_name"] == "STRING_8"
+    etag = first_resp.headers["etag"]
+
+    start_time = time.time()
+    cached_resp = session_client.get(
+        "/eiffel/library/STRING", headers={"If-None-Match": etag}
+    )
+    print(f"Cached library lookup took {time.time() - start_time:.3f} seconds")
+    assert cached_resp.status_code == 304
+    assert cached_resp.headers["etag"] == etag
+
+
+def test_eiffel_library_browsing_uses_shared_pool():
+    """Test that browsing the library does not create a session container."""
+    session_client = create_session_client()
+
+    library_resp = session_client.get("/eiffel/library/ARRAYED_LIST")
+    assert library_resp.status_code == 200
+    assert "ARRAYED_LIST" in library_resp.json()["source_code"]
+    session_client.cookies.update(library_resp.cookies)
+
+    info_resp = session_client.get("/session/info")
+    assert info_resp.status_code == 200
+    assert info_resp.json()["container"] is None
+
+
+def test_eiffel_library_rejects_invalid_class_names():
+    """Test that names which are not Eiffel class names are rejected up front."""
+    session_client = create_session_client()
+    for name in ["A-B", "1ABC", "ANY;ls"]:
+        library_resp = session_client.get(f"/eiffel/library/{name}")
+        assert library_resp.status_code == 400
+
+
+def test_eiffel_library_search_and_autocomplete():
+    """Test the library index search and autocomplete endpoints."""
+    session_client = create_session_client()
+
+    # The index is built in the background on first startup
+    for _ in range(120):
+        autocomplete_resp = session_client.get(
+            "/eiffel/library/autocomplete", params={"prefix": "ARRAY"}
+        )
+        if autocomplete_resp.status_code != 503:
+            break
+        time.sleep(1)
+    assert autocomplete_resp.status_code == 200
+    assert "ARRAYED_LIST" in autocomplete_resp.json()["suggestions"]
+
+    search_resp = session_client.get("/eiffel/library/search", params={"q": "STRING"})
+    assert search_resp.status_code == 200
+    classes = search_resp.json()["classes"]
+    assert {"name": "STRING", "alias_of": "STRING_8"} in classes
+
+    feature_resp = session_client.get(
+        "/eiffel/library/search", params={"q": "ARRAYED_LIST.ext"}
+    )
+    assert feature_resp.status_code == 200
+    features = feature_resp.json()["features"]
+    assert any(feature["name"] == "extend" for feature in features)
+
+
+def test_eiffel_incremental_parse_outline():
+    """Test the editor outline endpoint with full and incremental parses."""
+    session_client = create_session_client()
+    code = """class
+    COUNTER
+
+create
+    make
+
+feature
+    make
+        do
+            value := 0
+        end
+
+    value: INTEGER
+
+end"""
+
+    parse_resp = session_client.post(
+        "/eiffel/parse", json={"filename": "counter.e", "content": code}
+    )
+    assert parse_resp.status_code == 200
+    outline = parse_resp.json()
+    assert outline["class_name"] == "COUNTER"
+    assert outline["creation_procedures"] == ["make"]
+    assert [f["names"] for f in outline["features"]] == [["make"], ["value"]]
+    assert outline["errors"] == []
+    session_client.cookies.update(parse_resp.cookies)
+
+    # Insert a new feature before the final "end"
+    edit_resp = session_client.post(
+        "/eiffel/parse/edit",
+        json={
+            "filename": "counter.e",
+            "edits": [
+                {
+                    "start": {"line": 14, "column": 0},
+                    "end": {"line": 14, "column": 0},
+                    "text": "    increment\n        do\n            value := value + 1\n"
+                    "        end\n\n",
+                }
+            ],
+        },
+    )
+    assert edit_resp.status_code == 200
+    outline = edit_resp.json()
+    assert ["increment"] in [f["names"] for f in outline["features"]]
+    assert outline["errors"] == []
+
+    # Break the syntax
+    edit_resp = session_client.post(
+        "/eiffel/parse/edit",
+        json={
+            "filename": "counter.e",
+            "edits": [
+                {
+                    "start": {"line": 8, "column": 8},
+                    "end": {"line": 8, "column": 10},
+                    "text": "",
+                }
+            ],
+        },
+    )
+    assert edit_resp.status_code == 200
+    assert edit_resp.json()["errors"]
+
+    unknown_resp = session_client.post(
+        "/eiffel/parse/edit", json={"filename": "other.e", "edits": []}
+    )
+    assert unknown_resp.status_code == 404
+
+
+def test_eiffel_parse_rejects_oversized_documents():
+    """Test that the editor parse endpoints refuse documents over the size limit."""
+    from eiffel_parse_service import get_parse_service
+
+    max_bytes = get_parse_service().max_document_bytes
+    session_client = create_session_client()
+    parse_resp = session_client.post(
+        "/eiffel/parse",
+        json={"filename": "huge.e", "content": "-- " + "x" * max_bytes},
+    )
+    assert parse_resp.status_code == 413
+
+    parse_resp = session_client.post(
+        "/eiffel/parse", json={"filename": "small.e", "content": "class SMALL end"}
+    )
+    assert parse_resp.status_code == 200
+    session_client.cookies.update(parse_resp.cookies)
+    edit_resp = session_client.post(
+        "/eiffel/parse/edit",
+        json={
+            "filename": "small.e",
+            "edits": [
+                {
+                    "start": {"line": 0, "column": 0},
+                    "end": {"line": 0, "column": 0},
+                    "text": "-- " + "x" * max_bytes + "\n",
+                }
+            ],
+        },
+    )
+    assert edit_resp.status_code == 413
@@ -0,0 +1,60 @@
+"""
+Execution store tests (no containers).
+"""
+
+import time
+
+from execution_store import ExecutionStore
+from models import ActiveProcess
+from state_backend import SQLiteStateBackend
+
+
+def _process(timeout=30, start_time=None):
+    return ActiveProcess(
+        session_id="session-1",
+        start_time=time.time() if start_time is None else start_time,
+        timeout=timeout,
+        language="python",
+    )
+
+
+def test_execution_result_is_readable_until_it_expires():
+    """Test that a finished result is returned on every read, then expires."""
+    store = ExecutionStore(ttl=60)
+    store.add("run-1", _process())
+    assert store.running_ids() == ["run-1"]
+    assert store.complete("run-1", True, "hello", 0, "done")
+
+    for _ in range(2):
+        assert store["run-1"].output == "hello"
+    assert store.running_ids() == []
+    store._finished["run-1"] = time.time() - 1
+    assert "run-1" not in store
+
+
+def test_execution_completed_by_another_worker_is_not_left_running(tmp_path):
+    """Test that losing the completion race finishes and expires the local entry."""
+    backend = SQLiteStateBackend(tmp_path / "state.sqlite3")
+    runner = ExecutionStore(ttl=60, backend=backend)
+    canceller = ExecutionStore(ttl=60, backend=backend)
+    runner.add("run-1", _process())
+
+    assert canceller.complete("run-1", False, "", None, "Cancelled", cancelled=True)
+    assert not runner.complete("run-1", True, "too late", 0, "done")
+    assert runner.running_ids() == []
+    assert runner["run-1"].cancelled
+    assert runner.stats()["finished"] == 1
+
+
+def test_execution_without_runner_is_abandoned():
+    """Test that an execution running past its timeout and grace is finished."""
+    store = ExecutionStore(ttl=60, running_grace=5)
+    store.add("run-1", _process(timeout=10, start_time=time.time() - 20))
+    store.add("run-2", _process(timeout=10))
+
+    assert store.running_ids() == ["run-2"]
+    process = store["run-1"]
+    assert process.completed and not process.success
+    assert "abandoned" in process.message
+    # The runner finishing late changes nothing
+    assert not store.complete("run-1", True, "late", 0, "done")
@@ -14,6 +14,13 @@ def test_root():
     assert "<html" in resp.text
 
 
+def test_home_page_does_not_create_session():
+    """Test that page views without a session do not create one."""
+    resp = client.get("/", cookies={"session_id": ""})
+    assert resp.status_code == 200
+    assert "session_id" not in resp.cookies
+
+
 def test_favicon():
     """Test favicon endpoint."""
     resp = client.get("/favicon.ico")
@@ -137,6 +144,18 @@ def test_examples_file():
     assert "print" in data["content"]
 
 
+def test_examples_etag():
+    """Test that example responses carry ETags and honour If-None-Match."""
+    resp = client.get("/examples/python")
+    assert resp.status_code == 200
+    assert "Hello World" in resp.json()
+    etag = resp.headers["etag"]
+
+    cached_resp = client.get("/examples/python", headers={"If-None-Match": etag})
+    assert cached_resp.status_code == 304
+    assert cached_resp.headers["etag"] == etag
+
+
 def test_admin_get_config():
     """Test configuration retrieval with admin authentication."""
     resp = client.get("/admin/config", headers={"X-API-Key": "supersecretapikey"})
@@ -167,3 +186,58 @@ def test_admin_restart():
         headers={"X-API-Key": "supersecretapikey"},
     )
     assert resp.status_code in (200, 503)  # 503 if not implemented
+
+
+def test_health_reports_container_budget():
+    """Test that the container budget is reported by the health check."""
+    resp = client.get("/health")
+    assert resp.status_code == 200
+    budget = resp.json()["container_budget"]
+    assert budget["containers"] <= budget["max_containers"]
+    assert budget["memory_bytes"] <= budget["max_memory_bytes"]
+
+
+def test_admin_drain_refuses_new_jobs():
+    """Test that a draining server refuses new jobs with Retry-After."""
+    headers = {"X-API-Key": "supersecretapikey"}
+    resp = client.post("/admin/drain", headers=headers)
+    assert resp.status_code == 200
+    assert resp.json()["draining"] is True
+    try:
+        resp = client.post(
+            "/run",
+            json={
+                "language": "python",
+                "files": [{"name": "main.py", "content": "print('hi')"}],
+                "main_file": "main.py",
+            },
+        )
+        assert resp.status_code == 503
+        assert int(resp.headers["Retry-After"]) > 0
+        assert client.get("/health").json()["status"] == "draining"
+    finally:
+        resp = client.post("/admin/drain", params={"resume": True}, headers=headers)
+    assert resp.json()["draining"] is False
+
+
+def test_admin_drain_applies_to_all_workers():
+    """Test that an admin drain is shared through the state backend."""
+    from drain import DrainMode
+    from state_backend import get_state_backend
+
+    headers = {"X-API-Key": "supersecretapikey"}
+    # Another worker sharing the state backend
+    other_worker = DrainMode(backend=get_state_backend())
+    assert not other_worker.draining
+    client.post("/admin/drain", headers=headers)
+    try:
+        assert other_worker.draining
+        assert other_worker.refuses("POST", "/run")
+    finally:
+        client.post("/admin/drain", params={"resume": True}, headers=headers)
+    assert not other_worker.draining
+
+    # A worker shutting down drains only itself
+    other_worker.start(shared=False)
+    assert other_worker.draining
+    assert client.get("/admin/drain", headers=headers).json()["draining"] is False
@@ -0,0 +1,54 @@
+"""
+Library class cache tests (file I/O only, no containers).
+"""
+
+import os
+
+from library_cache import LibraryClassCache
+
+
+def test_library_cache_persists_sources(tmp_path):
+    """Test that a cached class source is served from disk by a new cache."""
+    LibraryClassCache(tmp_path).put("sha256:abc", "ARRAYED_LIST", "class ARRAYED_LIST end")
+    cache = LibraryClassCache(tmp_path)
+    assert cache.get("sha256:abc", "arrayed_list") == (True, "class ARRAYED_LIST end")
+    assert cache.get("sha256:def", "ARRAYED_LIST") == (False, None)
+
+
+def test_library_cache_rejects_invalid_class_names(tmp_path):
+    """Test that names which are not Eiffel class names are never cached."""
+    cache = LibraryClassCache(tmp_path)
+    cache.put("sha256:abc", "A_B", None)
+    for name in ["A-B", "A.B", "../A", "1A", ""]:
+        cache.put("sha256:abc", name, None)
+        assert cache.get("sha256:abc", name) == (False, None)
+    assert cache.get("sha256:abc", "A_B") == (True, None)
+    assert len(list(tmp_path.rglob("*.missing"))) == 1
+
+
+def test_library_cache_missing_entries_expire(tmp_path):
+    """Test that a cached "class not found" expires after missing_ttl."""
+    cache = LibraryClassCache(tmp_path, missing_ttl=60)
+    cache.put("sha256:abc", "NO_SUCH_CLASS", None)
+    assert cache.get("sha256:abc", "NO_SUCH_CLASS") == (True, None)
+
+    (missing_path,) = tmp_path.rglob("*.missing")
+    mtime = missing_path.stat().st_mtime - 120
+    os.utime(missing_path, (mtime, mtime))
+    cache = LibraryClassCache(tmp_path, missing_ttl=60)
+    assert cache.get("sha256:abc", "NO_SUCH_CLASS") == (False, None)
+    assert not missing_path.exists()
+
+
+def test_library_cache_disk_is_bounded(tmp_path):
+    """Test that the disk store drops "not found" entries, then the oldest classes."""
+    cache = LibraryClassCache(tmp_path, max_disk_entries=8)
+    for index in range(4):
+        cache.put("sha256:abc", f"CLASS_{index}", f"class CLASS_{index} end")
+    for index in range(5):
+        cache.put("sha256:abc", f"MISSING_{index}", None)
+
+    stored = {path.name for path in tmp_path.rglob("*") if path.is_file()}
+    assert len(stored - {"request_counts.json"}) <= 4
+    assert not any(name.endswith(".missing") for name in stored)
+    assert cache.get("sha256:abc", "CLASS_3") == (True, "class CLASS_3 end")
@@ -54,6 +54,27 @@ print(f"Result: {result}")
     assert "Result: 15" in result["output"]
 
 
+def test_python_result_can_be_read_again():
+    """Test that a finished result stays readable after the first read."""
+    from conftest import client
+
+    files = [{"name": "hello.py", "content": "print('read me twice')"}]
+    session_client = create_session_client()
+    resp = session_client.post(
+        "/run",
+        json={"language": "python", "files": files, "main_file": "hello.py"},
+    )
+    assert resp.status_code == 200
+    execution_id = resp.json()["execution_id"]
+    result = wait_for_execution_completion(execution_id)
+    assert "read me twice" in result["output"]
+
+    again = client.get(f"/status/{execution_id}")
+    assert again.status_code == 200
+    assert again.json()["output"] == result["output"]
+    assert again.json()["elapsed_time"] == result["elapsed_time"]
+
+
 def test_compile_and_run_python():
     """Test Python compile-then-run workflow."""
     files = [{"name": "hello.py", "content": "print('hello from compile-run')"}]
@@ -85,3 +106,65 @@ def test_compile_and_run_python():
     execution_id = run_data["execution_id"]
     result = wait_for_execution_completion(execution_id)
     assert "hello from compile-run" in result["output"]
+
+
+def test_python_syntax_error_rejected_before_execution():
+    """Test that code with a syntax error is rejected without a container."""
+    files = [{"name": "broken.py", "content": "x = 1\nprint(x\n"}]
+    session_client = create_session_client()
+    resp = session_client.post(
+        "/run",
+        json={"language": "python", "files": files, "main_file": "broken.py"},
+    )
+    assert resp.status_code == 422
+    data = resp.json()
+    assert not data["success"]
+    assert not data["started"]
+    assert data["syntax_errors"][0]["file"] == "broken.py"
+    assert "broken.py:" in data["output"]
+    session_client.cookies.update(resp.cookies)
+
+    info_resp = session_client.get("/session/info")
+    assert info_resp.status_code == 200
+    assert info_resp.json()["container"] is None
+
+
+def test_python_example_warmup_serves_cached_run():
+    """Test that warmed-up examples are answered from the result cache."""
+    import json
+    import time
+    from conftest import client
+    from controllers.shared_utils import decompress_token
+
+    headers = {"X-API-Key": "supersecretapikey"}
+    resp = client.post(
+        "/admin/warmup", params={"languages": ["python"]}, headers=headers
+    )
+    assert resp.status_code in (200, 409)
+    for _ in range(120):
+        status = client.get("/admin/warmup", headers=headers).json()
+        if not status["running"]:
+            break
+        time.sleep(1)
+    assert any(
+        result["name"] == "Hello World" and result["success"]
+        for result in status["results"]
+    )
+
+    example = client.get("/examples/python/Hello%20World").json()
+    data = json.loads(decompress_token(example["url"][4:]))
+    session_client = create_session_client()
+    resp = session_client.post(
+        "/run",
+        json={"language": "python", "files": data["files"], "main_file": data["activeFile"]},
+    )
+    assert resp.status_code == 200
+    result = wait_for_execution_completion(resp.json()["execution_id"])
+    assert result["completed"]
+    assert result["output"]
+    session_client.cookies.update(resp.cookies)
+
+    # Served from the cache: the session never needed a container
+    info_resp = session_client.get("/session/info")
+    assert info_resp.status_code == 200
+    assert info_resp.json()["container"] is None
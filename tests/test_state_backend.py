@@ -0,0 +1,44 @@
+"""
+State backend tests (no containers).
+"""
+
+import time
+
+import pytest
+
+from state_backend import InMemoryStateBackend, SQLiteStateBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryStateBackend()
+    return SQLiteStateBackend(tmp_path / "state.sqlite3")
+
+
+def test_expired_entries_are_hidden(backend):
+    """Test that reads skip expired entries."""
+    backend.set("ns", "live", "1")
+    backend.set("ns", "expiring", "2", ttl=0.05)
+    time.sleep(0.1)
+    assert backend.get("ns", "expiring") is None
+    assert backend.items("ns") == [("live", "1")]
+
+
+def test_purge_expired_removes_expired_entries(backend):
+    """Test that purge_expired removes expired entries and keeps live ones."""
+    backend.set("ns", "live", "1", ttl=60)
+    backend.set("ns", "expiring", "2", ttl=0.05)
+    time.sleep(0.1)
+    assert backend.purge_expired() == 1
+    assert backend.purge_expired() == 0
+    assert backend.items("ns") == [("live", "1")]
+
+
+def test_add_replaces_only_expired_entries(backend):
+    """Test that add inserts if absent or expired, but never over a live entry."""
+    assert backend.add("ns", "lease", "a", ttl=0.05)
+    assert not backend.add("ns", "lease", "b")
+    time.sleep(0.1)
+    assert backend.add("ns", "lease", "c")
+    assert backend.get("ns", "lease") == "c"
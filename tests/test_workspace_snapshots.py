@@ -0,0 +1,85 @@
+"""
+Workspace snapshot store tests (file I/O only, no containers).
+"""
+
+import gzip
+import os
+
+from workspace_snapshots import WorkspaceSnapshotStore
+
+
+def _age(store, session_id, seconds):
+    """Make a stored snapshot look the given seconds older."""
+    archive_path, _ = store._paths(session_id)
+    mtime = archive_path.stat().st_mtime - seconds
+    os.utime(archive_path, (mtime, mtime))
+
+
+def test_snapshot_save_and_take(tmp_path):
+    """Test that a snapshot is returned once, with its workspace manifest."""
+    store = WorkspaceSnapshotStore(tmp_path)
+    assert store.save("session-1", "eiffel", {"main.e": "abc"}, [b"tar ", b"data"])
+    assert store.stats()["snapshots"] == 1
+
+    data, workspace = store.take("session-1", "eiffel")
+    assert gzip.decompress(data) == b"tar data"
+    assert workspace == {"main.e": "abc"}
+    # Taking a snapshot removes it
+    assert store.take("session-1", "eiffel") is None
+    assert store.stats()["snapshots"] == 0
+
+
+def test_snapshot_of_other_language_is_not_restored(tmp_path):
+    """Test that a snapshot is not restored into a container of another language."""
+    store = WorkspaceSnapshotStore(tmp_path)
+    store.save("session-1", "python", {}, [b"data"])
+    assert store.take("session-1", "eiffel") is None
+    # and is dropped, since the session moved on to another language
+    assert store.take("session-1", "python") is None
+
+
+def test_snapshot_discard(tmp_path):
+    """Test that a discarded snapshot is gone."""
+    store = WorkspaceSnapshotStore(tmp_path)
+    store.save("session-1", "eiffel", {}, [b"data"])
+    store.discard("session-1")
+    assert store.take("session-1", "eiffel") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_snapshot_too_large_is_not_kept(tmp_path):
+    """Test that a snapshot over max_snapshot_bytes is not stored."""
+    store = WorkspaceSnapshotStore(tmp_path, max_snapshot_bytes=64)
+    assert not store.save("session-1", "eiffel", {}, [os.urandom(4096)])
+    assert store.take("session-1", "eiffel") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_expired_snapshots_are_dropped(tmp_path):
+    """Test that snapshots older than the TTL are neither restored nor kept."""
+    store = WorkspaceSnapshotStore(tmp_path, ttl=60)
+    store.save("old", "eiffel", {}, [b"data"])
+    store.save("new", "eiffel", {}, [b"data"])
+    _age(store, "old", 120)
+
+    assert store.take("old", "eiffel") is None
+    store.save("old", "eiffel", {}, [b"data"])
+    _age(store, "old", 120)
+    assert store.enforce_limits() == 1
+    assert store.stats()["snapshots"] == 1
+    assert store.take("new", "eiffel") is not None
+
+
+def test_oldest_snapshots_are_dropped_over_the_size_budget(tmp_path):
+    """Test that the oldest snapshots are dropped first when over max_bytes."""
+    store = WorkspaceSnapshotStore(tmp_path)
+    for index in range(3):
+        store.save(f"session-{index}", "eiffel", {}, [os.urandom(1024)])
+        _age(store, f"session-{index}", 30 - index * 10)
+    size = store.stats()["stored_bytes"] // 3
+    store.max_bytes = 2 * size
+
+    assert store.enforce_limits() == 1
+    assert store.take("session-0", "eiffel") is None
+    assert store.take("session-1", "eiffel") is not None
+    assert store.take("session-2", "eiffel") is not None